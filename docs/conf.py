@@ -38,7 +38,6 @@ autodoc_mock_imports = [
     'time',
     'ubinascii',
     'ujson',
-    'urequests',
 ]
 
 templates_path = ['_templates']
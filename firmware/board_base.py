@@ -119,11 +119,12 @@ class BoardBase:
         """
         raise NotImplementedError
 
-    def http_get(self, url: str) -> ResponseBase:
+    def http_get(self, url: str, headers: dict | None = None) -> ResponseBase:
         """
-        Attempts to dispatch an HTTP GET request to the specified URL.
+        Attempts to dispatch an HTTP GET request to the specified URL, with optional headers.
 
         :param url: The url to request
+        :param headers: Optional additional headers, such as data mime type, authentication, etc.
         :return: A Response object, including status code and response data.
         """
         raise NotImplementedError
@@ -139,6 +140,36 @@ class BoardBase:
         """
         raise NotImplementedError
 
+    def http_post(self, url: str, headers: dict, json: dict) -> ResponseBase:
+        """
+        Attempts to dispatch an HTTP POST request to the specified URL, with given headers and JSON payload.
+
+        :param url: The url to request
+        :param headers: Additional data, which could include data mime type, authentication, etc.
+        :param json: A dict payload to submit with the POST request
+        :return: A Response object, including status code and response data.
+        """
+        raise NotImplementedError
+
+    def http_patch(self, url: str, headers: dict, json: dict) -> ResponseBase:
+        """
+        Attempts to dispatch an HTTP PATCH request to the specified URL, with given headers and JSON payload.
+
+        :param url: The url to request
+        :param headers: Additional data, which could include data mime type, authentication, etc.
+        :param json: A dict payload to submit with the PATCH request
+        :return: A Response object, including status code and response data.
+        """
+        raise NotImplementedError
+
+    def close_connections(self) -> None:
+        """
+        Closes any HTTP connections kept open between requests, such as at the end of a push to GitHub.
+
+        :return: Nothing
+        """
+        raise NotImplementedError
+
     def rtc_datetime(self, timestamp: tuple[int, int, int, int, int, int, int, int]) -> None:
         """
         Attempts to set the Real Time Clock (RTC) to the specified timestamp.
@@ -218,6 +249,14 @@ class BoardBase:
         """
         raise NotImplementedError
 
+    def time(self) -> int:
+        """
+        Returns the current time as a Linux timestamp, which is only meaningful once the clock has been synchronized.
+
+        :return: Number of seconds since the Epoch
+        """
+        raise NotImplementedError
+
     def ticks_ms(self) -> int:
         """
         Returns an increasing millisecond counter, used for checking durations, not absolute time. It may overflow.
@@ -274,6 +313,15 @@ class BoardBase:
         """
         raise NotImplementedError
 
+    def storage_path(self, file_name: str) -> str:
+        """
+        Returns where a file that must persist across reboots, such as the buffer of unsent readings, should be kept.
+
+        :param file_name: The name of the file
+        :return: The path to the file, in flash on actual hardware
+        """
+        raise NotImplementedError
+
     def print(self, message: str) -> None:
         """
         Prints the given message to the console provided by the controller implementation.
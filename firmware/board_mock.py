@@ -1,5 +1,10 @@
 from datetime import datetime
+from json import dumps, loads
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
 from time import time
+from weakref import finalize
 from typing import Any
 
 from firmware.board_base import BoardBase, ResponseBase, PinBase
@@ -11,19 +16,20 @@ class ResponseMock(ResponseBase):
     """
 
     # noinspection PyMissingConstructor
-    def __init__(self, throw: bool = False, bad_status: bool = False) -> None:
+    def __init__(self, throw: bool = False, bad_status: bool = False, raw: bytes = b"") -> None:
         """
         Constructor of the mock response class
 
         :param throw: If true, then this constructor will throw, simulating an error during HTTP response creation.
         :param bad_status: If true, then this response will have an erroneous (400) status code.
+        :param raw: The response body, which is empty unless the mocked request returns JSON content.
         """
         if throw:
             raise Exception()
         #: The status_code can be overridden by passing a bad_status
         self.status_code = 400 if bad_status else 200
         self.text = ""
-        self.raw = b""
+        self.raw = raw
 
     def close(self) -> None:
         """
@@ -83,6 +89,7 @@ class BoardMock(BoardBase):
     # noinspection PyUnusedLocal
     def __init__(self, watchdog_enabled: bool = True, verbose: bool = False, throw_rtc: bool = False,
                  throw_http: bool = False, bad_http_get_status: bool = False, bad_http_put_status: bool = False,
+                 bad_http_post_status: bool = False, bad_http_patch_status: bool = False,
                  wifi_connect: bool = True, ds18x20_read_failure: bool = False,
                  continue_running_after_first_iteration: bool = False, fixed_temperature_c: float = 1000,
                  convert_temp_failure: bool = False, bad_ntp_timestamp: bool = False,
@@ -97,6 +104,8 @@ class BoardMock(BoardBase):
         :param throw_http: Controls whether the HTTP operation should raise an exception
         :param bad_http_get_status: Controls whether the HTTP GET should return 400 error code
         :param bad_http_put_status: Controls whether the HTTP PUT should return 400 error code
+        :param bad_http_post_status: Controls whether the HTTP POST should return 400 error code
+        :param bad_http_patch_status: Controls whether the HTTP PATCH should return 400 error code
         :param wifi_connect: Controls whether the board should successfully connect to Wi-Fi
         :param ds18x20_read_failure: Controls whether a failure occurs when reading ds18x20 temperature
         :param fixed_temperature_c: Overrides the Celsius temperature sensed by the temperature sensor
@@ -115,6 +124,8 @@ class BoardMock(BoardBase):
         self.throw_http = throw_http
         self.bad_http_get_status = bad_http_get_status
         self.bad_http_put_status = bad_http_put_status
+        self.bad_http_post_status = bad_http_post_status
+        self.bad_http_patch_status = bad_http_patch_status
         self.wifi_connect = wifi_connect
         self.ds18x20_read_failure = ds18x20_read_failure
         self.fixed_temperature_c = fixed_temperature_c
@@ -133,6 +144,16 @@ class BoardMock(BoardBase):
         self.watchdog_watching = False
         self.pins: dict = {}
         self.clock = time() * 1000
+        self.put_urls_for_testing: list[str] = []
+        self.post_urls_for_testing: list[str] = []
+        self.post_payloads_for_testing: list[dict] = []
+        self.patch_urls_for_testing: list[str] = []
+        self.patch_payloads_for_testing: list[dict] = []
+        self.open_hosts_for_testing: set[str] = set()
+        self.connections_opened_for_testing = 0
+        self.connections_reused_for_testing = 0
+        self.storage_folder = mkdtemp()
+        finalize(self, rmtree, self.storage_folder, True)
 
     def developer_mode(self) -> bool:
         """
@@ -206,16 +227,32 @@ class BoardMock(BoardBase):
             self.pw = pw
             self.ip = '127.0.0.1'
 
-    def http_get(self, url: str) -> ResponseBase:
+    def _use_connection(self, url: str) -> None:
+        # tracks the kept alive connections of a real board, by counting whether a request's host was already open
+        host = url.split('/')[2] if '://' in url else url
+        if host in self.open_hosts_for_testing:
+            self.connections_reused_for_testing += 1
+        else:
+            self.open_hosts_for_testing.add(host)
+            self.connections_opened_for_testing += 1
+
+    def http_get(self, url: str, headers: dict | None = None) -> ResponseBase:
         """
         Mocks an HTTP GET by creating a response object sensitive to control flags.
         If throw_http is active, it will result in an exception.  If bad_http_get_status
-        is active, it will return an erroneous status code.
+        is active, it will return an erroneous status code.  A request for a GitHub branch
+        returns a made up head commit and tree as JSON content.
 
         :param url: The URL to mock a GET request
+        :param headers: Not used in this mock class
         :return: A ResponseBase object
         """
-        return ResponseMock(self.throw_http, self.bad_http_get_status)
+        self._use_connection(url)
+        raw = b""
+        if '/branches/' in url:
+            branch = {'commit': {'sha': 'mock_head_commit_sha', 'commit': {'tree': {'sha': 'mock_head_tree_sha'}}}}
+            raw = dumps(branch).encode()
+        return ResponseMock(self.throw_http, self.bad_http_get_status, raw)
 
     def http_put(self, url: str, headers: dict, json: dict) -> ResponseBase:
         """
@@ -228,8 +265,52 @@ class BoardMock(BoardBase):
         :param json: A dict payload to submit with the PUT request
         :return: A ResponseBase object
         """
+        self._use_connection(url)
+        self.put_urls_for_testing.append(url)
         return ResponseMock(self.throw_http, self.bad_http_put_status)
 
+    def http_post(self, url: str, headers: dict, json: dict) -> ResponseBase:
+        """
+        Mocks an HTTP POST by creating a response object sensitive to control flags.
+        If throw_http is active, it will result in an exception.  If bad_http_post_status
+        is active, it will return an erroneous status code.  The response content is JSON
+        holding a made up sha, like the GitHub API returns for a created object.
+
+        :param url: The url to request
+        :param headers: Additional data, which could include data mime type, authentication, etc.
+        :param json: A dict payload to submit with the POST request
+        :return: A ResponseBase object
+        """
+        self._use_connection(url)
+        self.post_urls_for_testing.append(url)
+        self.post_payloads_for_testing.append(json)
+        raw = dumps({'sha': f"mock_sha_{len(self.post_urls_for_testing)}"}).encode()
+        return ResponseMock(self.throw_http, self.bad_http_post_status, raw)
+
+    def http_patch(self, url: str, headers: dict, json: dict) -> ResponseBase:
+        """
+        Mocks an HTTP PATCH by creating a response object sensitive to control flags.
+        If throw_http is active, it will result in an exception.  If bad_http_patch_status
+        is active, it will return an erroneous status code.
+
+        :param url: The url to request
+        :param headers: Additional data, which could include data mime type, authentication, etc.
+        :param json: A dict payload to submit with the PATCH request
+        :return: A ResponseBase object
+        """
+        self._use_connection(url)
+        self.patch_urls_for_testing.append(url)
+        self.patch_payloads_for_testing.append(json)
+        return ResponseMock(self.throw_http, self.bad_http_patch_status, dumps({'object': json}).encode())
+
+    def close_connections(self) -> None:
+        """
+        Mocks closing the kept alive HTTP connections, so that the next request to each host counts as a new connection.
+
+        :return: Nothing
+        """
+        self.open_hosts_for_testing.clear()
+
     # noinspection PyUnusedLocal
     def rtc_datetime(self, timestamp: tuple[int, int, int, int, int, int, int, int]) -> None:
         """
@@ -311,25 +392,33 @@ class BoardMock(BoardBase):
 
     def load_json(self, json_readable_bytes) -> dict:  # type: ignore[no-untyped-def]
         """
-        Mocks the JSON reading function by simply returning a premade dictionary.
+        Mocks the JSON reading function by simply returning a premade dictionary, unless the mocked
+        response carried its own JSON content, in which case that content is parsed and returned.
         If label_missing_from_rom_hex_map is active, there will be a missing ROM in the
         hex map.  If the label_missing_from_sensors flag is active, there will be a missing
         sensor in the sensors map.
 
-        :param json_readable_bytes: Not used in this mock class
-        :return: A dictionary mimicking the configuration found on the repo
+        :param json_readable_bytes: The raw content of a mocked response, which is empty for the config request
+        :return: A dictionary mimicking the configuration found on the repo, or the parsed response content
         """
+        if json_readable_bytes:
+            return loads(json_readable_bytes)
         base_data: dict[str, Any] = {
             "sensors": {
                 "03": {
                     "hex": "2893645b000000b4",
                     "active": False,
                     "short_name": "Em Garage Fridge",
+                    "maximum_temp": 70.0,
+                    "type": "fridge",
+                    "upload_policy": {"heartbeat_minutes": 120},
                 },
                 "13": {
                     "hex": "28a70f46d438683a",
                     "active": True,
                     "short_name": "Em Garage Freezer",
+                    "maximum_temp": 70.0,
+                    "type": "freezer",
                 },
                 "98": {
                     "hex": "someHexCodeHere",
@@ -341,6 +430,10 @@ class BoardMock(BoardBase):
                 "28a70f46d438683a": "13",
                 "someHexCodeHere": "98"
             },
+            "upload_policy": {
+                "defaults": {"deadband": 1.0, "heartbeat_minutes": 240, "excursion_minutes": 15, "min_minutes": 1},
+                "types": {"freezer": {"deadband": 3.0}},
+            },
         }
         if self.label_missing_from_rom_hex_map:
             base_data["rom_hex_to_cable_number"].pop("2893645b000000b4")
@@ -359,6 +452,14 @@ class BoardMock(BoardBase):
         dt = datetime.now() if linux_time_seconds is None else datetime.fromtimestamp(linux_time_seconds)
         return dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.weekday()
 
+    def time(self) -> int:
+        """
+        Mocks the time function by returning the current Linux timestamp of the host.
+
+        :return: Number of seconds since the Epoch
+        """
+        return int(time())
+
     def ticks_ms(self) -> int:
         """
         Mocks the ticks_ms function by keeping an internal clock and reporting the ms since it was created.
@@ -408,6 +509,15 @@ class BoardMock(BoardBase):
         """
         return False
 
+    def storage_path(self, file_name: str) -> str:
+        """
+        Mocks the flash storage with a temporary directory, which is created with the board and removed along with it.
+
+        :param file_name: The name of the file
+        :return: The path to the file in the temporary directory
+        """
+        return join(self.storage_folder, file_name)
+
     def print(self, message: str) -> None:
         """
         Mocks the print functionality by tracking the printed messages in a variable.
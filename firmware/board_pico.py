@@ -10,19 +10,19 @@ from network import WLAN, STA_IF
 # noinspection PyPackageRequirements
 from onewire import OneWire
 # noinspection PyPackageRequirements
-from ujson import load as load_json
-# noinspection PyPackageRequirements
-from urequests import get, put
+from ujson import loads
 
 try:
-    from time import ticks_ms, ticks_diff, localtime, sleep
+    from time import ticks_ms, ticks_diff, localtime, sleep, time
 except ImportError:  # pragma: only needed when parsing this file with sphinx
     ticks_ms = None
     ticks_diff = None
     localtime = None
     sleep = None
+    time = None
 
 from firmware.board_base import BoardBase
+from firmware.http_client import KeepAliveClient
 
 
 class BoardPico(BoardBase):
@@ -52,6 +52,7 @@ class BoardPico(BoardBase):
         self.pins = {}
         ow = OneWire(Pin(BoardPico.ONE_WIRE_SENSOR_PIN))
         self.ds18x20 = DS18X20(ow)
+        self.http = KeepAliveClient()
 
     def developer_mode(self) -> bool:
         """
@@ -114,26 +115,60 @@ class BoardPico(BoardBase):
         """
         return self.wlan.connect(ssid, pw)
 
-    def http_get(self, url: str):
+    def http_get(self, url: str, headers: dict | None = None):
         """
-        Attempts to dispatch an HTTP GET request to the specified URL using the urequests library.
+        Attempts to dispatch an HTTP GET request to the specified URL, with optional headers, reusing the open
+        connection to the host if there is one.
 
         :param url: The url to request
+        :param headers: Optional additional headers, such as data mime type, authentication, etc.
         :return: A Response object, including status code and response data.
         """
-        return get(url)
+        return self.http.request('GET', url, headers)
 
     def http_put(self, url: str, headers: dict, json: dict):
         """
-        Attempts to dispatch an HTTP PUT request to the specified URL using the urequests library,
-        with given headers and JSON payload.
+        Attempts to dispatch an HTTP PUT request to the specified URL, with given headers and JSON payload,
+        reusing the open connection to the host if there is one.
 
         :param url: The url to request
         :param headers: Additional data, which could include branch name, data mime type, authentication, etc.
         :param json: A dict payload to submit with the PUT request
         :return: A Response object, including status code and response data.
         """
-        return put(url, headers=headers, json=json)
+        return self.http.request('PUT', url, headers, json)
+
+    def http_post(self, url: str, headers: dict, json: dict):
+        """
+        Attempts to dispatch an HTTP POST request to the specified URL, with given headers and JSON payload,
+        reusing the open connection to the host if there is one.
+
+        :param url: The url to request
+        :param headers: Additional data, which could include data mime type, authentication, etc.
+        :param json: A dict payload to submit with the POST request
+        :return: A Response object, including status code and response data.
+        """
+        return self.http.request('POST', url, headers, json)
+
+    def http_patch(self, url: str, headers: dict, json: dict):
+        """
+        Attempts to dispatch an HTTP PATCH request to the specified URL, with given headers and JSON payload,
+        reusing the open connection to the host if there is one.
+
+        :param url: The url to request
+        :param headers: Additional data, which could include data mime type, authentication, etc.
+        :param json: A dict payload to submit with the PATCH request
+        :return: A Response object, including status code and response data.
+        """
+        return self.http.request('PATCH', url, headers, json)
+
+    def close_connections(self) -> None:
+        """
+        Closes the connections kept open by the HTTP client, freeing the memory of their TLS sessions between pushes.
+
+        :return: Nothing
+        """
+        self.http.close_all()
 
     # noinspection PyUnusedLocal
     def rtc_datetime(self, timestamp: tuple[int, int, int, int, int, int, int, int]) -> None:
@@ -224,12 +259,13 @@ class BoardPico(BoardBase):
 
     def load_json(self, json_readable_bytes) -> dict:
         """
-        Reads from the provided JSON bytes read-able object using the ujson library, and provides a Python dict.
+        Parses the provided JSON content bytes, such as the raw content of an HTTP response, using the ujson library,
+        and provides a Python dict.
 
-        :param json_readable_bytes: A read-able object of JSON content bytes, such as a file opened with 'rb'
+        :param json_readable_bytes: JSON content bytes, such as the raw content of an HTTP response
         :return: A Python dict representing the JSON content
         """
-        return load_json(json_readable_bytes)
+        return loads(json_readable_bytes)
 
     def localtime(self, linux_time_seconds: int = None):
         """
@@ -242,6 +278,14 @@ class BoardPico(BoardBase):
             return localtime()
         return localtime(linux_time_seconds)
 
+    def time(self) -> int:
+        """
+        Returns the current time from the RTC as a Linux timestamp, which is only meaningful once it has been synced.
+
+        :return: Number of seconds since the Epoch
+        """
+        return time()
+
     def ticks_ms(self) -> int:
         """
         Returns an increasing millisecond counter, used for checking durations, not absolute time. It may overflow.
@@ -310,6 +354,15 @@ class BoardPico(BoardBase):
         """
         return True
 
+    def storage_path(self, file_name: str) -> str:
+        """
+        Returns the path to a file at the root of the Pico's flash filesystem, next to the saved configuration.
+
+        :param file_name: The name of the file
+        :return: The path to the file in flash
+        """
+        return f"/{file_name}"
+
     def print(self, message: str):
         """
         Prints the given message to the console, if connected, otherwise this just goes to sys.stdout, which
@@ -0,0 +1,194 @@
+from json import dumps
+from socket import getaddrinfo, socket, SOCK_STREAM
+from ssl import SSLContext, PROTOCOL_TLS_CLIENT, CERT_NONE
+
+from firmware.board_base import ResponseBase
+
+
+def open_tls_stream(host: str, port: int = 443):  # type: ignore[no-untyped-def]  # pragma: no cover
+    """
+    Opens a TLS connection to the given host, the same way the urequests library does, without verifying the server
+    certificate, since the device has no certificate store.
+
+    :param host: The host name to connect to
+    :param port: The port to connect to
+    :return: A stream over the TLS connection, with read, readline, write, and close methods
+    """
+    address = getaddrinfo(host, port, 0, SOCK_STREAM)[0][-1]
+    s = socket()
+    try:
+        s.settimeout(15)
+        s.connect(address)
+        context = SSLContext(PROTOCOL_TLS_CLIENT)
+        context.verify_mode = CERT_NONE
+        return context.wrap_socket(s, server_hostname=host)
+    except Exception:
+        s.close()
+        raise
+
+
+class HttpResponse(ResponseBase):
+    """
+    This response class holds a response which has already been read off of a kept alive connection in full, so that
+    the connection is ready for the next request as soon as the response is returned.
+    """
+
+    # noinspection PyMissingConstructor
+    def __init__(self, status_code: int, body: bytes) -> None:
+        """
+        Constructs a response from the status code and the body read off of the connection.
+
+        :param status_code: The HTTP status code, like 200 or 401
+        :param body: The response body
+        """
+        self.status_code = status_code
+        self.text = body.decode()
+        self.raw = body
+
+    def close(self) -> None:
+        """
+        The connection belongs to the client and stays open for the next request, so this does nothing.
+
+        :return: Nothing
+        """
+        return
+
+
+class KeepAliveClient:
+    """
+    This class is a small HTTP/1.1 client that keeps one TLS connection per host open across requests.
+    The urequests library opens a new socket, with a new TLS handshake, for every request, and speaks HTTP/1.0, so the
+    server closes the connection after each response.  On the Pico, each handshake takes seconds of CPU and a large
+    spike of heap, so a push of several requests to the same host pays for it once here instead of on every request.
+
+    A connection which the server has closed in the meantime, such as after sitting idle between pushes, is detected
+    when the request cannot be sent or no response comes back, and the request is sent once more on a new connection.
+    Only that case is retried, before any of a response has been read, and every request the sensor box makes is safe
+    to repeat: the Git Data API objects are addressed by their content, and the ref update names the commit to move to.
+    """
+
+    def __init__(self, opener=open_tls_stream) -> None:  # type: ignore[no-untyped-def]
+        """
+        Constructs a client with no open connections.
+
+        :param opener: A function of the host name that opens a stream to it, which is replaced in unit tests
+        """
+        self.opener = opener
+        self.streams: dict = {}
+        #: The number of connections opened, and so the number of TLS handshakes made, since the client was created
+        self.connections_opened = 0
+        #: The number of requests sent, where each one sent on an already open connection saved a handshake
+        self.requests_sent = 0
+
+    def request(self, method: str, url: str, headers: dict | None = None, json: dict | None = None) -> HttpResponse:
+        """
+        Sends a request, reusing the open connection to the host if there is one, and reads the whole response.
+
+        :param method: The HTTP method, like GET or POST
+        :param url: The https url to request
+        :param headers: Optional additional headers, such as data mime type, authentication, etc.
+        :param json: An optional dict payload to send as the JSON body of the request
+        :return: The response, already read in full
+        """
+        if not url.startswith("https://"):
+            raise ValueError(f"Only https urls are supported: {url}")
+        host, _, path = url[8:].partition('/')
+        body = b"" if json is None else dumps(json).encode()
+        lines = [f"{method} /{path} HTTP/1.1", f"Host: {host}", f"Content-Length: {len(body)}"]
+        if json is not None:
+            lines.append("Content-Type: application/json")
+        for key, value in (headers or {}).items():
+            lines.append(f"{key}: {value}")
+        message = ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+        reused = host in self.streams
+        try:
+            return self._exchange(host, message)
+        except OSError:
+            self.close(host)
+            if not reused:
+                raise
+        return self._exchange(host, message)  # the server had closed the idle connection, so try a new one
+
+    def _exchange(self, host: str, message: bytes) -> HttpResponse:
+        stream = self.streams.get(host)
+        if stream is None:
+            stream = self.opener(host)
+            self.streams[host] = stream
+            self.connections_opened += 1
+        self.requests_sent += 1
+        stream.write(message)
+        status_line = stream.readline()
+        if not status_line:
+            raise OSError("The connection was closed by the server")
+        try:
+            status_code = int(status_line.split(None, 2)[1])
+            content_length = -1
+            chunked = False
+            keep_alive = True
+            while True:
+                line = stream.readline()
+                if not line or line == b"\r\n":
+                    break
+                key, _, value = line.decode().partition(':')
+                key = key.strip().lower()
+                value = value.strip().lower()
+                if key == 'content-length':
+                    content_length = int(value)
+                elif key == 'transfer-encoding':
+                    chunked = 'chunked' in value
+                elif key == 'connection':
+                    keep_alive = value != 'close'
+            if chunked:
+                body = b""
+                while True:
+                    size = int(stream.readline().split(b';')[0].strip().decode(), 16)
+                    if not size:
+                        while stream.readline() not in (b"\r\n", b""):
+                            pass  # skip any trailer headers
+                        break
+                    body += self._read(stream, size)
+                    stream.readline()
+            elif content_length >= 0:
+                body = self._read(stream, content_length)
+            else:
+                body = stream.read()  # without a length, the body runs until the server closes the connection
+                keep_alive = False
+        except Exception:
+            self.close(host)  # a response that was not read in full leaves the connection in an unknown state
+            raise ValueError("Could not read the HTTP response") from None
+        if not keep_alive:
+            self.close(host)
+        return HttpResponse(status_code, body)
+
+    @staticmethod
+    def _read(stream, size: int) -> bytes:  # type: ignore[no-untyped-def]
+        data = b""
+        while len(data) < size:
+            chunk = stream.read(size - len(data))
+            if not chunk:
+                raise OSError("The connection was closed part way through the response")
+            data += chunk
+        return data
+
+    def close(self, host: str) -> None:
+        """
+        Closes the open connection to a host, if there is one.
+
+        :param host: The host name
+        :return: Nothing
+        """
+        stream = self.streams.pop(host, None)
+        if stream is not None:
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    def close_all(self) -> None:
+        """
+        Closes every open connection, which frees the memory held by their TLS sessions.
+
+        :return: Nothing
+        """
+        for host in list(self.streams):
+            self.close(host)
@@ -0,0 +1,157 @@
+from struct import calcsize, pack, unpack_from
+
+from firmware.reading_records import ReadingRecords
+
+
+class ReadingBuffer:
+    """
+    This class holds the readings that have not been pushed to GitHub yet, in a fixed size ring buffer kept in a file.
+    Since the file lives in flash on the hardware, the readings survive a Wi-Fi outage, and even a reboot, and are
+    pushed once the device is connected again.
+
+    The file is a small header followed by a fixed number of record slots, so it never grows.
+    The records are the compact 7 byte records of :class:`ReadingRecords`, copied between the file and memory as they
+    are, and their sensor index refers to a table of sensor ROMs kept in the header.
+    New records are written into the slot after the newest record, and once every slot is full, the oldest record is
+    overwritten.  Acknowledged records are dropped from the oldest end by just moving the head in the header.
+    The header is always written after the records, so a power loss part way through an append only loses that append.
+    """
+
+    #: Identifies a buffer file, so a missing, truncated, or foreign file is started over instead of being misread
+    MAGIC = b'RBF2'
+    #: The header is the magic bytes, the number of slots, the slot of the oldest record, the record count, and the
+    #: number of sensor ROMs in the table that follows
+    HEADER_FORMAT = '<4sIIIB'
+    #: The most sensor ROMs the table can hold; a box would need to see more than this in a single outage to fill it
+    MAX_SENSORS = 16
+
+    def __init__(self, path: str, capacity: int = 2048) -> None:
+        """
+        Opens the buffer file at the given path, creating an empty one if it does not exist or cannot be used.
+
+        :param path: The path to the buffer file, which should be in flash on the hardware
+        :param capacity: The number of record slots, which bounds both the file size and the readings kept
+        """
+        self.path = path
+        self.capacity = capacity
+        self.header_size = calcsize(ReadingBuffer.HEADER_FORMAT) + 8 * ReadingBuffer.MAX_SENSORS
+        self.head = 0
+        self.count = 0
+        self.roms: list[bytes] = []
+        try:
+            with open(self.path, 'rb') as f:
+                header = f.read(self.header_size)
+            magic, capacity, head, count, num_roms = unpack_from(ReadingBuffer.HEADER_FORMAT, header)
+            if magic == ReadingBuffer.MAGIC and capacity == self.capacity and head < capacity and count <= capacity \
+                    and num_roms <= ReadingBuffer.MAX_SENSORS:
+                self.head = head
+                self.count = count
+                table = calcsize(ReadingBuffer.HEADER_FORMAT)
+                self.roms = [header[table + 8 * i:table + 8 * i + 8] for i in range(num_roms)]
+                return
+        except Exception:  # a missing or truncated file is simply started over
+            pass
+        with open(self.path, 'wb') as f:
+            f.write(self._header())
+            f.write(bytes(ReadingRecords.RECORD_SIZE * self.capacity))
+
+    def __len__(self) -> int:
+        """
+        Returns the number of readings waiting in the buffer.
+
+        :return: The number of readings
+        """
+        return self.count
+
+    def _header(self) -> bytes:
+        header = pack(ReadingBuffer.HEADER_FORMAT, ReadingBuffer.MAGIC, self.capacity, self.head, self.count,
+                      len(self.roms))
+        return header + b''.join(self.roms) + bytes(8 * (ReadingBuffer.MAX_SENSORS - len(self.roms)))
+
+    def _offset(self, slot: int) -> int:
+        return self.header_size + slot * ReadingRecords.RECORD_SIZE
+
+    def sensor_indexes(self, roms: list[bytes]) -> list[int]:
+        """
+        Finds the index of each sensor ROM in the table, adding any that are missing, to use in the records appended
+        next.  Every index of a batch must come from a single call, so that they all refer to the same table.
+        The table is started over whenever the buffer is emptied.  If the batch still does not fit in it, the readings
+        waiting in the buffer are discarded to start it over, since they could no longer be told apart.
+
+        :param roms: The sensor ROMs of the records about to be appended
+        :return: The index of each sensor, in the same order
+        """
+        missing = [rom for rom in set(roms) if rom not in self.roms]
+        if len(self.roms) + len(missing) > ReadingBuffer.MAX_SENSORS:
+            self.head = 0
+            self.count = 0
+            self.roms = []
+        for rom in roms:
+            if rom not in self.roms:
+                self.roms.append(rom)
+        return [self.roms.index(rom) for rom in roms]
+
+    def rom(self, sensor_index: int) -> bytes | None:
+        """
+        Looks up the sensor ROM of a sensor index found in the records.
+
+        :param sensor_index: The index of the sensor
+        :return: The sensor ROM, or None if the index is not in the table, which only a damaged file could hold
+        """
+        return self.roms[sensor_index] if sensor_index < len(self.roms) else None
+
+    def append(self, records: ReadingRecords) -> None:
+        """
+        Adds records to the newest end of the buffer, overwriting the oldest readings if the buffer is full.
+        The sensor index of each record must come from :meth:`sensor_indexes`.
+
+        :param records: The records to add
+        :return: Nothing
+        """
+        with open(self.path, 'r+b') as f:
+            done = 0
+            while done < len(records):
+                slot = (self.head + self.count) % self.capacity
+                run = min(len(records) - done, self.capacity - slot)
+                f.seek(self._offset(slot))
+                records.write_to(f, done, done + run)
+                done += run
+                overwritten = max(0, self.count + run - self.capacity)
+                self.count = min(self.capacity, self.count + run)
+                self.head = (self.head + overwritten) % self.capacity
+            f.seek(0)
+            f.write(self._header())
+
+    def peek(self, records: ReadingRecords) -> None:
+        """
+        Reads the oldest readings in the buffer into the given records, without removing them from the buffer.
+        The records are emptied first, then filled up to their capacity, or with every waiting reading if fewer.
+
+        :param records: The records to fill
+        :return: Nothing
+        """
+        records.clear()
+        wanted = min(records.capacity, self.count)
+        with open(self.path, 'rb') as f:
+            while len(records) < wanted:
+                slot = (self.head + len(records)) % self.capacity
+                f.seek(self._offset(slot))
+                read_before = len(records)
+                records.read_from(f, min(wanted - len(records), self.capacity - slot))
+                if len(records) == read_before:
+                    break  # the file was cut short, so there is nothing more to read
+
+    def drop(self, count: int) -> None:
+        """
+        Removes the oldest readings from the buffer, once they have been acknowledged.
+
+        :param count: The number of readings to remove
+        :return: Nothing
+        """
+        count = min(count, self.count)
+        self.head = (self.head + count) % self.capacity
+        self.count -= count
+        if not self.count:
+            self.roms = []  # nothing refers to the table anymore
+        with open(self.path, 'r+b') as f:
+            f.write(self._header())
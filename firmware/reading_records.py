@@ -0,0 +1,129 @@
+from struct import pack_into
+
+
+class ReadingRecords:
+    """
+    This class holds a number of temperature readings compactly, as fixed width records in a single bytearray.
+    Each record is 7 bytes: the sensor index as an unsigned byte, the measurement time in epoch seconds as an unsigned
+    32-bit integer, and the temperature in hundredths of a degree Fahrenheit as a signed 16-bit integer, little endian.
+    That is a few KB for days of readings, where a float and a tuple per reading would cost dozens of bytes each.
+
+    The bytearray is allocated once, at the full capacity, and the fields are read back out of it with plain byte
+    arithmetic, so iterating over the records does not create a tuple or a float per record.  The records also
+    serialize as they are: writing them to a file, or reading them back, copies bytes straight from or into the
+    bytearray through a memoryview, without building anything per record.
+    """
+
+    #: The struct format of a single record, which is only used for writing, the fields are read back byte by byte
+    RECORD_FORMAT = '<BIh'
+    #: The size of a single record, in bytes
+    RECORD_SIZE = 7
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Allocates the storage for a fixed number of records, which starts out empty.
+
+        :param capacity: The maximum number of records that can be held
+        """
+        self.capacity = capacity
+        self.data = bytearray(capacity * ReadingRecords.RECORD_SIZE)
+        self.view = memoryview(self.data)
+        self.count = 0
+
+    def __len__(self) -> int:
+        """
+        Returns the number of records being held.
+
+        :return: The number of records
+        """
+        return self.count
+
+    def clear(self) -> None:
+        """
+        Empties the records, keeping the storage to be filled again.
+
+        :return: Nothing
+        """
+        self.count = 0
+
+    def append(self, sensor_index: int, epoch: int, temperature_f: float) -> None:
+        """
+        Adds a record after the last one.  The temperature is rounded to the nearest hundredth of a degree, and clamped
+        to the range of the record, which is far beyond what the sensors can measure.
+
+        :param sensor_index: The index of the sensor, from 0 to 255
+        :param epoch: The measurement time, in epoch seconds
+        :param temperature_f: The temperature, in degrees Fahrenheit
+        :return: Nothing
+        """
+        if self.count == self.capacity:
+            raise IndexError("The reading records are full")
+        centi_degrees = min(max(round(temperature_f * 100), -32768), 32767)
+        pack_into(ReadingRecords.RECORD_FORMAT, self.data, self.count * ReadingRecords.RECORD_SIZE,
+                  sensor_index, epoch, centi_degrees)
+        self.count += 1
+
+    def sensor_index(self, index: int) -> int:
+        """
+        Reads the sensor index of a record.
+
+        :param index: The position of the record
+        :return: The index of the sensor
+        """
+        return self.data[index * ReadingRecords.RECORD_SIZE]
+
+    def epoch(self, index: int) -> int:
+        """
+        Reads the measurement time of a record.
+
+        :param index: The position of the record
+        :return: The measurement time, in epoch seconds
+        """
+        o = index * ReadingRecords.RECORD_SIZE + 1
+        d = self.data
+        return d[o] | (d[o + 1] << 8) | (d[o + 2] << 16) | (d[o + 3] << 24)
+
+    def centi_degrees(self, index: int) -> int:
+        """
+        Reads the temperature of a record, as stored.
+
+        :param index: The position of the record
+        :return: The temperature, in hundredths of a degree Fahrenheit
+        """
+        o = index * ReadingRecords.RECORD_SIZE + 5
+        value = self.data[o] | (self.data[o + 1] << 8)
+        return value - 65536 if value >= 32768 else value
+
+    def temperature_f(self, index: int) -> float:
+        """
+        Reads the temperature of a record.
+
+        :param index: The position of the record
+        :return: The temperature, in degrees Fahrenheit
+        """
+        return self.centi_degrees(index) / 100
+
+    def write_to(self, stream, start: int = 0, stop: int | None = None) -> None:  # type: ignore[no-untyped-def]
+        """
+        Writes a run of records to a binary stream, such as an open file, straight from the storage.
+
+        :param stream: The stream to write to, at its current position
+        :param start: The position of the first record to write
+        :param stop: The position after the last record to write, which defaults to the end of the records
+        :return: Nothing
+        """
+        stop = self.count if stop is None else stop
+        stream.write(self.view[start * ReadingRecords.RECORD_SIZE:stop * ReadingRecords.RECORD_SIZE])
+
+    def read_from(self, stream, count: int) -> None:  # type: ignore[no-untyped-def]
+        """
+        Reads records from a binary stream, such as an open file, straight into the storage after the last record.
+
+        :param stream: The stream to read from, at its current position
+        :param count: The number of records to read, which is limited by the remaining capacity
+        :return: Nothing
+        """
+        count = min(count, self.capacity - self.count)
+        start = self.count * ReadingRecords.RECORD_SIZE
+        read = stream.readinto(self.view[start:start + count * ReadingRecords.RECORD_SIZE])
+        self.count += (read or 0) // ReadingRecords.RECORD_SIZE
@@ -1,11 +1,14 @@
-from binascii import b2a_base64
-
 from firmware.board_base import BoardBase
 from firmware.screen_base import ScreenBase
 from firmware.config_base import ConfigBase
+from firmware.reading_buffer import ReadingBuffer
+from firmware.reading_records import ReadingRecords
 
 __version__ = 3
-__revision__ = 7
+__revision__ = 9
+
+#: The upload policy used until the sensor config is retrieved, which pushes every reading hourly, like a heartbeat
+DEFAULT_UPLOAD_POLICY = {'deadband': 1.0, 'heartbeat_minutes': 60, 'excursion_minutes': 15, 'min_minutes': 1}
 
 
 class Sensor:
@@ -15,6 +18,10 @@ class Sensor:
         self.temperature_f: float = -1000
         self.name = "UNKNOWN_NAME"
         self.active = False
+        self.maximum_temp: float | None = None
+        self.upload_policy = DEFAULT_UPLOAD_POLICY
+        self.last_recorded_f: float | None = None
+        self.last_recorded_ms = 0
 
 
 class SensorBox:
@@ -40,13 +47,13 @@ class SensorBox:
         self.last_temp_stamp: tuple = ()
         self.last_push_stamp: tuple = ()
         self.last_push_had_errors = False
-        self.last_push_ms = 0
         self.time_synced = False
         self.retrieved_sensor_info = False
         self.developer_mode = False
         self.ip = ""
         self.ssid = ""
         self.sensors: list[Sensor] = list()
+        self.unsent = ReadingBuffer(self.board.storage_path("unsent_readings.bin"))
 
         # always try to make the watchdog, the board setup will decide whether to actually do it.  Then POST
         self.board.create_watchdog(8000)
@@ -203,24 +210,24 @@ class SensorBox:
 
     def phase_push(self, first_time: bool) -> None:
         """
-        "Push" run phase, which is basically waiting until connected and enough time has passed, then pushing data
-        up to GitHub, and logging the time.
+        "Push" run phase, which is basically recording the readings that the upload policy of each sensor calls for
+        into the buffer of unsent readings, and whenever connected, pushing the buffered readings up to GitHub, and
+        logging the time.  The readings are recorded even while disconnected, so that none are lost during an outage,
+        as long as the clock was synced at some point to give them a time.
 
-        :param first_time: If True, it forces an attempted GitHub push, regardless of time passed
+        :param first_time: If True, it forces the readings of every sensor to be recorded, regardless of the policy
         :return: Nothing
         """
-        if not self.board.isconnected():
-            return
         if not self.time_synced:
             return
-        interval = self.board.ticks_diff(self.board.ticks_ms(), self.last_push_ms)
-        github_push_interval_ms = 3_600_000
-        reached_push_time = interval > github_push_interval_ms
-        if not (first_time or reached_push_time):
+        self.record_readings(first_time)
+        if not self.board.isconnected():
+            return
+        if not len(self.unsent):
             return
-        success = self.push_to_github()
+        success = self.push_unsent_readings()
+        self.board.close_connections()
         if success:
-            self.last_push_ms = self.board.ticks_ms()
             self.last_push_stamp = self.board.localtime()
             self.last_push_had_errors = False
         else:
@@ -454,8 +461,11 @@ class SensorBox:
                     any_issues = True
                     continue
                 if label in data['sensors']:
-                    sensor.name = data['sensors'][label].get('short_name', '???')
-                    sensor.active = data['sensors'][label].get('active', False)
+                    entry = data['sensors'][label]
+                    sensor.name = entry.get('short_name', '???')
+                    sensor.active = entry.get('active', False)
+                    sensor.maximum_temp = entry.get('maximum_temp')
+                    sensor.upload_policy = self.upload_policy(data.get('upload_policy', {}), entry)
                 else:
                     sensor.name = "UNKNOWN SENSOR"
                     sensor.active = False
@@ -467,47 +477,196 @@ class SensorBox:
         finally:
             if response:
                 response.close()
+            self.board.close_connections()
 
-    def push_to_github(self) -> bool:
+    def github_api(self, method: str, url: str, json: dict | None = None) -> dict | None:
         """
-        This function is responsible for pushing updated temperature results to GitHub for all connected sensors.
-        The content is a simple YAML file header with a few variables at the top and no body HTML content beneath ---.
-        The push is actually a "put" http action where it will live at the repo's gh-pages branch at:
-        /_posts/romHexAbc123Def/2026-02-24-10-30-02_romHexAbc123Def_Sensor_Name_Here.html.
-        If any fail, it will return False, and the sensor box can alert that the last push failed.
-        Also, if this keeps failing for any reason, the periodic sensor responsiveness check will alert us.
+        This function sends one request to the GitHub REST API and parses the JSON response.
+        Any failure, whether an exception or an unexpected status code, is printed and results in None being returned,
+        so that the caller can simply give up on the current push and let the next push try again.
+        The watchdog is fed after each request, since a single request can take a few seconds on the hardware.
 
-        :return: True if successful, False otherwise
+        :param method: The HTTP method, which is one of GET, POST, or PATCH
+        :param url: The API url to request
+        :param json: A dict payload to submit with a POST or PATCH request
+        :return: The parsed JSON response if successful, otherwise None
         """
-        all_success = True
-        t = self.board.localtime()
-        current = f"{t[0]}-{t[1]:02d}-{t[2]:02d}-{t[3]:02d}-{t[4]:02d}-{t[5]:02d}"
-        for sensor in self.sensors:
+        headers = {'Accept': 'application/vnd.github+json', 'User-Agent': 'Temp Sensor',
+                   'Authorization': f'Token {self.github_token}'}
+        response = None
+        try:
+            if method == 'GET':
+                response = self.board.http_get(url, headers=headers)
+            elif method == 'POST':
+                response = self.board.http_post(url, headers=headers, json=json or {})
+            else:
+                response = self.board.http_patch(url, headers=headers, json=json or {})
+            if response.status_code not in (200, 201):
+                self.board.print(f"{method} Error: {response.status_code} {response.text}")
+                return None
+            return self.board.load_json(response.raw)
+        except Exception as e:
+            self.board.print(f"Could not send request, reason={e}, skipping this report, checks will continue")
+            return None
+        finally:
+            if response:
+                response.close()
+            self.board.feed_watchdog()
+
+    def should_record(self, sensor: Sensor, now_ms: int) -> bool:
+        """
+        This function applies the upload policy of a sensor, from the upload_policy section of the sensor config, to
+        decide whether its current reading should be recorded to be pushed, which is when:
+        - Nothing was recorded for the sensor yet since boot.
+        - The reading moved more than the deadband since the last recorded reading, or crossed the maximum temperature,
+          in either direction, so that an excursion is reported right away, and so is the return to normal.
+        - The reading is over the maximum temperature and excursion_minutes passed, so the alert checks keep seeing it.
+        - The heartbeat_minutes passed, so that a quiet sensor still shows it is alive.
+        In any case, nothing is recorded until min_minutes passed, so a noisy reading cannot flood the push.
+
+        :param sensor: The sensor, with its latest reading
+        :param now_ms: The current ticks_ms
+        :return: True if the reading should be recorded, False otherwise
+        """
+        if sensor.last_recorded_f is None:
+            return True
+        policy = sensor.upload_policy
+        minutes = self.board.ticks_diff(now_ms, sensor.last_recorded_ms) / 60_000
+        if minutes < policy['min_minutes']:
+            return False
+        if minutes >= policy['heartbeat_minutes']:
+            return True
+        if abs(sensor.temperature_f - sensor.last_recorded_f) > policy['deadband']:
+            return True
+        if sensor.maximum_temp is None:
+            return False
+        over = sensor.temperature_f > sensor.maximum_temp
+        if over != (sensor.last_recorded_f > sensor.maximum_temp):
+            return True
+        return over and minutes >= policy['excursion_minutes']
+
+    def record_readings(self, force: bool = False) -> None:
+        """
+        This function records the current temperature of each connected sensor whose upload policy calls for it into
+        the buffer of unsent readings, stamped with the current time.  The buffer lives in flash, so the readings are
+        kept until they are pushed.
+
+        :param force: If True, the readings of every sensor are recorded, regardless of the upload policy
+        :return: Nothing
+        """
+        now_ms = self.board.ticks_ms()
+        due = [sensor for sensor in self.sensors if force or self.should_record(sensor, now_ms)]
+        if not due:
+            return
+        epoch = self.board.time()
+        records = ReadingRecords(len(due))
+        indexes = self.unsent.sensor_indexes([sensor.rom for sensor in due])
+        for sensor, sensor_index in zip(due, indexes):
+            records.append(sensor_index, epoch, sensor.temperature_f)
+            sensor.last_recorded_f = sensor.temperature_f
+            sensor.last_recorded_ms = now_ms
+        self.unsent.append(records)
+
+    def push_unsent_readings(self) -> bool:
+        """
+        This function drains the buffer of unsent readings up to GitHub, oldest first, in bounded batches.
+        Each batch is a single push, and is only dropped from the buffer once the push succeeds, so a failed push
+        leaves the readings in place to be tried again on the next pass.  The number of batches in one pass is also
+        bounded, so that a long backlog after an outage is worked off over several passes of the run loop instead of
+        holding up the sensing and the display.  The watchdog is fed between the batches.
+        The board keeps its connection to GitHub open across all the requests of the pass, and the caller closes it.
+
+        :return: True if every batch pushed in this pass was successful, False otherwise
+        """
+        batch_size = 24
+        batches_per_pass = 4
+        batch = ReadingRecords(batch_size)
+        for _ in range(batches_per_pass):
+            self.unsent.peek(batch)
+            if not len(batch):
+                break
+            if not self.push_to_github(batch):
+                return False
+            self.unsent.drop(len(batch))
+            self.board.feed_watchdog()
+        return True
+
+    @staticmethod
+    def upload_policy(upload_policy: dict, entry: dict) -> dict:
+        """
+        This function layers the upload policy of a sensor from the upload_policy section of the sensor config:
+        the built-in defaults, then the section's defaults, then those for the sensor's type, then the sensor's own.
+
+        :param upload_policy: The upload_policy section of the sensor config
+        :param entry: The sensor's entry in the sensors section of the sensor config
+        :return: A dict holding every upload policy setting for the sensor
+        """
+        policy = dict(DEFAULT_UPLOAD_POLICY)
+        policy.update(upload_policy.get('defaults', {}))
+        policy.update(upload_policy.get('types', {}).get(entry.get('type'), {}))
+        policy.update(entry.get('upload_policy', {}))
+        return policy
+
+    def push_to_github(self, readings: ReadingRecords) -> bool:
+        """
+        This function is responsible for pushing a batch of temperature readings to GitHub.
+        The content is a simple YAML file header with a few variables at the top and no body HTML content beneath ---.
+        Each file will live at the repo's sensor_data branch, in a folder per sensor and day:
+        /data/romHexAbc123Def/2026/02/24/2026-02-24-10-30-02_romHexAbc123Def_Sensor_Name_Here.html.
+        All the files are pushed together as a single commit using the Git Data API, so the number of requests, and
+        the number of commits on the branch, does not grow with the number of readings in the batch:
+        - Get the sensor_data branch, which gives the head commit and its tree.
+        - Post a new tree on top of the head tree, with the content of every file inline, creating the blobs.
+        - Post a new commit of that tree, whose parent is the head commit.
+        - Patch the branch ref to point at the new commit, which fails if the branch moved since it was read.
+        If any step fails, it will return False, and the sensor box can alert that the last push failed.
+        Also, if this keeps failing for any reason, the periodic sensor alert check will notice the stale readings.
+
+        :param readings: The readings, whose sensor indexes refer to the buffer of unsent readings
+        :return: True if successful, or if there was nothing to push, False otherwise
+        """
+        if not readings:
+            return True
+        names = {sensor.rom: sensor.name for sensor in self.sensors}
+        tree = []
+        for i in range(len(readings)):
+            rom = self.unsent.rom(readings.sensor_index(i))
+            if rom is None:
+                continue  # a damaged record cannot be attributed to a sensor, so it is dropped with the rest
+            t = self.board.localtime(readings.epoch(i))
+            measured = f"{t[0]}-{t[1]:02d}-{t[2]:02d}-{t[3]:02d}-{t[4]:02d}-{t[5]:02d}"
+            name = names.get(rom, "UNKNOWN_NAME")
             file_content = f"""---
-sensor_id: {sensor.rom.hex()}
-sensor_name: {sensor.name}
-temperature: {sensor.temperature_f}
-measurement_time: {current}
+sensor_id: {rom.hex()}
+sensor_name: {name}
+temperature: {readings.temperature_f(i)}
+measurement_time: {measured}
 ---
 {{}}
 """
-            sensor_name_cleaned = sensor.name.replace(" ", "_")
-            file_name = f"{current}_{sensor.rom.hex()}_{sensor_name_cleaned}.html"
-            file_path = f"data/{sensor.rom.hex()}/{file_name}"
-            url = f"https://api.github.com/repos/okielife/TempSensors/contents/{file_path}"
-            headers = {'Accept': 'application/vnd.github+json', 'User-Agent': 'Temp Sensor',
-                       'Authorization': f'Token {self.github_token}'}
-            encoded_content = b2a_base64(file_content.encode()).decode().strip()
-            data = {'message': f"Updating {file_path}", 'content': encoded_content, 'branch': 'sensor_data'}
-            try:
-                response = self.board.http_put(url, headers=headers, json=data)
-                if response.status_code not in (200, 201):
-                    self.board.print(f"PUT Error: {response.text}")
-                    all_success = False
-            except Exception as e:
-                self.board.print(f"Could not send request, reason={e}, skipping this report, checks will continue")
-                all_success = False
-        return all_success
+            sensor_name_cleaned = name.replace(" ", "_")
+            file_name = f"{measured}_{rom.hex()}_{sensor_name_cleaned}.html"
+            file_path = f"data/{rom.hex()}/{t[0]}/{t[1]:02d}/{t[2]:02d}/{file_name}"
+            tree.append({'path': file_path, 'mode': '100644', 'type': 'blob', 'content': file_content})
+        if not tree:
+            return True  # nothing in the batch could be attributed, so let the caller drop it rather than retry it
+        api = "https://api.github.com/repos/okielife/TempSensors"
+        branch = self.github_api('GET', f"{api}/branches/sensor_data")
+        if branch is None:
+            return False
+        new_tree = self.github_api('POST', f"{api}/git/trees", {
+            'base_tree': branch['commit']['commit']['tree']['sha'], 'tree': tree
+        })
+        if new_tree is None:
+            return False
+        new_commit = self.github_api('POST', f"{api}/git/commits", {
+            'message': f"Adding {len(tree)} readings measured up to {measured}", 'tree': new_tree['sha'],
+            'parents': [branch['commit']['sha']]
+        })
+        if new_commit is None:
+            return False
+        ref = self.github_api('PATCH', f"{api}/git/refs/heads/sensor_data", {'sha': new_commit['sha'], 'force': False})
+        return ref is not None
 
 
 if __name__ == "__main__":  # pragma: no cover
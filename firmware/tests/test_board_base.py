@@ -51,6 +51,12 @@ class TestBoardBase(TestCase):
             b.http_get("https://url")
         with self.assertRaises(NotImplementedError):
             b.http_put("url", {'header': 'value'}, {'data': 'value'})
+        with self.assertRaises(NotImplementedError):
+            b.http_post("url", {'header': 'value'}, {'data': 'value'})
+        with self.assertRaises(NotImplementedError):
+            b.http_patch("url", {'header': 'value'}, {'data': 'value'})
+        with self.assertRaises(NotImplementedError):
+            b.close_connections()
         with self.assertRaises(NotImplementedError):
             b.rtc_datetime((2020, 1, 21, 2, 10, 32, 36, 0))
         with self.assertRaises(NotImplementedError):
@@ -69,6 +75,8 @@ class TestBoardBase(TestCase):
             b.load_json(b'{}')
         with self.assertRaises(NotImplementedError):
             b.localtime()
+        with self.assertRaises(NotImplementedError):
+            b.time()
         with self.assertRaises(NotImplementedError):
             b.ticks_ms()
         with self.assertRaises(NotImplementedError):
@@ -79,5 +87,7 @@ class TestBoardBase(TestCase):
             b.sleep(1)
         with self.assertRaises(NotImplementedError):
             b.run_forever()
+        with self.assertRaises(NotImplementedError):
+            b.storage_path("file.bin")
         with self.assertRaises(NotImplementedError):
             b.print("message")
@@ -29,3 +29,25 @@ class TestBoardMock(TestCase):
         b.system_hang(1)  # should pass fine
         with self.assertRaises(Exception):
             b.system_hang()
+
+    def test_json_responses(self) -> None:
+        b = BoardMock()
+        self.assertIn("sensors", b.load_json(b.http_get("https://url").raw))
+        branch = b.load_json(b.http_get("https://api/branches/sensor_data").raw)
+        self.assertEqual("mock_head_commit_sha", branch['commit']['sha'])
+        self.assertEqual("mock_sha_1", b.load_json(b.http_post("url", {}, {'data': 'value'}).raw)['sha'])
+        b.http_patch("url", {}, {'sha': 'value'})
+        self.assertEqual([{'data': 'value'}], b.post_payloads_for_testing)
+        self.assertEqual(["url"], b.patch_urls_for_testing)
+
+    def test_connection_reuse_stats(self) -> None:
+        b = BoardMock()
+        b.http_get("https://api.github.com/a")
+        b.http_post("https://api.github.com/b", {}, {})
+        b.http_patch("https://api.github.com/c", {}, {})
+        b.http_put("https://other.host/d", {}, {})
+        self.assertEqual(2, b.connections_opened_for_testing)
+        self.assertEqual(2, b.connections_reused_for_testing)
+        b.close_connections()
+        b.http_get("https://api.github.com/a")
+        self.assertEqual(3, b.connections_opened_for_testing)
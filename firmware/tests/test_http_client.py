@@ -0,0 +1,116 @@
+from unittest import TestCase
+
+from firmware.http_client import KeepAliveClient
+
+
+class FakeStream:
+    """A connection to a fake server, which answers each request with the next of its canned responses."""
+
+    def __init__(self, responses: list[bytes]) -> None:
+        self.responses = responses
+        self.pending = b""
+        self.sent: list[bytes] = []
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        if not self.responses and not self.pending:
+            raise OSError("Broken pipe")  # the server has nothing more to say, as if it closed the connection
+        self.sent.append(data)
+        if self.responses:
+            self.pending += self.responses.pop(0)
+
+    def readline(self) -> bytes:
+        line, sep, self.pending = self.pending.partition(b"\n")
+        return line + sep
+
+    def read(self, size: int = -1) -> bytes:
+        size = len(self.pending) if size < 0 else size
+        data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def ok(body: bytes, extra: bytes = b"") -> bytes:
+    return b"HTTP/1.1 200 OK\r\nContent-Length: " + str(len(body)).encode() + b"\r\n" + extra + b"\r\n" + body
+
+
+class TestKeepAliveClient(TestCase):
+
+    def setUp(self) -> None:
+        self.streams: list[FakeStream] = []
+        self.canned: list[list[bytes]] = []
+
+    def opener(self, host: str) -> FakeStream:
+        stream = FakeStream(self.canned.pop(0))
+        self.streams.append(stream)
+        return stream
+
+    def test_connection_is_reused(self) -> None:
+        self.canned = [[ok(b'{"sha": "a"}'), ok(b'{"sha": "b"}'), ok(b'{}')]]
+        client = KeepAliveClient(self.opener)
+        r = client.request('GET', "https://api.github.com/repos/x/branches/y", {'Authorization': 'Token t'})
+        self.assertEqual(200, r.status_code)
+        self.assertEqual('{"sha": "a"}', r.text)
+        self.assertEqual(b'{"sha": "a"}', r.raw)
+        r.close()
+        r = client.request('POST', "https://api.github.com/repos/x/git/trees", {}, {'tree': []})
+        self.assertEqual('{"sha": "b"}', r.text)
+        client.request('PATCH', "https://api.github.com/repos/x/git/refs/heads/y", json={'sha': 'b'})
+        self.assertEqual(1, client.connections_opened)
+        self.assertEqual(3, client.requests_sent)
+        sent = self.streams[0].sent
+        self.assertTrue(sent[0].startswith(b"GET /repos/x/branches/y HTTP/1.1\r\nHost: api.github.com\r\n"))
+        self.assertIn(b"Authorization: Token t\r\n", sent[0])
+        self.assertTrue(sent[1].endswith(b'\r\n\r\n{"tree": []}'))
+        self.assertIn(b"Content-Length: 12\r\nContent-Type: application/json\r\n", sent[1])
+        client.close_all()
+        self.assertTrue(self.streams[0].closed)
+
+    def test_reconnects_when_server_closed_connection(self) -> None:
+        self.canned = [[ok(b'one')], [ok(b'two')]]
+        client = KeepAliveClient(self.opener)
+        self.assertEqual('one', client.request('GET', "https://host/a").text)
+        self.assertEqual('two', client.request('GET', "https://host/b").text)  # the first stream is used up
+        self.assertEqual(2, client.connections_opened)
+        self.assertTrue(self.streams[0].closed)
+
+    def test_new_connection_failure_is_raised(self) -> None:
+        self.canned = [[]]
+        client = KeepAliveClient(self.opener)
+        with self.assertRaises(OSError):
+            client.request('GET', "https://host/a")
+        self.assertEqual(1, client.connections_opened)
+
+    def test_chunked_response(self) -> None:
+        chunked = b"HTTP/1.1 201 Created\r\nTransfer-Encoding: chunked\r\n\r\n"
+        chunked += b"5\r\nhello\r\n6;x=y\r\n world\r\n0\r\n\r\n"
+        self.canned = [[chunked, ok(b'next')]]
+        client = KeepAliveClient(self.opener)
+        r = client.request('POST', "https://host/a", json={})
+        self.assertEqual(201, r.status_code)
+        self.assertEqual("hello world", r.text)
+        self.assertEqual("next", client.request('GET', "https://host/b").text)
+        self.assertEqual(1, client.connections_opened)
+
+    def test_connection_close_and_unknown_length(self) -> None:
+        self.canned = [[ok(b'bye', b"Connection: close\r\n")], [b"HTTP/1.0 200 OK\r\n\r\nuntil the end"], [ok(b'')]]
+        client = KeepAliveClient(self.opener)
+        self.assertEqual('bye', client.request('GET', "https://host/a").text)
+        self.assertTrue(self.streams[0].closed)
+        self.assertEqual('until the end', client.request('GET', "https://host/b").text)
+        self.assertTrue(self.streams[1].closed)
+        self.assertEqual('', client.request('GET', "https://host/c").text)
+        self.assertEqual(3, client.connections_opened)
+
+    def test_bad_responses(self) -> None:
+        self.canned = [[b"garbage\r\n\r\n"], [b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\nshort"]]
+        client = KeepAliveClient(self.opener)
+        with self.assertRaises(ValueError):
+            client.request('GET', "https://host/a")
+        with self.assertRaises(ValueError):
+            client.request('GET', "https://host/b")
+        self.assertTrue(all(stream.closed for stream in self.streams))
+        with self.assertRaises(ValueError):
+            client.request('GET', "http://host/a")
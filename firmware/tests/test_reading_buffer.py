@@ -0,0 +1,95 @@
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from firmware.reading_buffer import ReadingBuffer
+from firmware.reading_records import ReadingRecords
+
+
+class TestReadingBuffer(TestCase):
+
+    def setUp(self) -> None:
+        self.folder = TemporaryDirectory()
+        self.path = join(self.folder.name, "unsent.bin")
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    @staticmethod
+    def records(buffer: ReadingBuffer, rom: bytes, epochs: list[int], temperature_f: float = 0.0) -> ReadingRecords:
+        r = ReadingRecords(len(epochs))
+        for epoch, sensor_index in zip(epochs, buffer.sensor_indexes([rom] * len(epochs))):
+            r.append(sensor_index, epoch, temperature_f)
+        return r
+
+    @staticmethod
+    def epochs(buffer: ReadingBuffer, limit: int) -> list[int]:
+        r = ReadingRecords(limit)
+        buffer.peek(r)
+        return [r.epoch(i) for i in range(len(r))]
+
+    def test_append_peek_drop(self) -> None:
+        b = ReadingBuffer(self.path, capacity=8)
+        self.assertEqual(0, len(b))
+        self.assertEqual([], self.epochs(b, 5))
+        b.append(self.records(b, b'\x28' * 8, [1000], 1.5))
+        b.append(self.records(b, b'\x29' * 8, [1000, 1060], -2.25))
+        self.assertEqual(3, len(b))
+        r = ReadingRecords(2)
+        b.peek(r)
+        self.assertEqual([b'\x28' * 8, b'\x29' * 8], [b.rom(r.sensor_index(i)) for i in range(2)])
+        self.assertEqual([1.5, -2.25], [r.temperature_f(i) for i in range(2)])
+        b.drop(2)
+        self.assertEqual([1060], self.epochs(b, 5))
+        b.drop(5)
+        self.assertEqual(0, len(b))
+        self.assertEqual([0], b.sensor_indexes([b'\x29' * 8]))  # the table starts over once the buffer is empty
+
+    def test_full_buffer_overwrites_oldest(self) -> None:
+        b = ReadingBuffer(self.path, capacity=4)
+        b.append(self.records(b, b'\x28' * 8, list(range(10))))
+        self.assertEqual(4, len(b))
+        self.assertEqual([6, 7, 8, 9], self.epochs(b, 10))
+        b.drop(3)
+        b.append(self.records(b, b'\x28' * 8, [10, 11]))
+        self.assertEqual([9, 10, 11], self.epochs(b, 10))  # read across the end of the file
+        self.assertEqual([9, 10], self.epochs(b, 2))
+
+    def test_buffer_persists(self) -> None:
+        b = ReadingBuffer(self.path, capacity=4)
+        b.append(self.records(b, b'\x28' * 8, list(range(6)), 20.5))
+        b.drop(1)
+        reopened = ReadingBuffer(self.path, capacity=4)
+        self.assertEqual(3, len(reopened))
+        self.assertEqual([3, 4, 5], self.epochs(reopened, 4))
+        self.assertEqual(b'\x28' * 8, reopened.rom(0))
+
+    def test_sensor_table_overflow_starts_over(self) -> None:
+        b = ReadingBuffer(self.path, capacity=64)
+        for i in range(ReadingBuffer.MAX_SENSORS):
+            b.append(self.records(b, bytes([i]) * 8, [i]))
+        self.assertEqual(ReadingBuffer.MAX_SENSORS, len(b))
+        self.assertEqual([5, 0], b.sensor_indexes([b'\x05' * 8, b'\x00' * 8]))  # known sensors fit as they are
+        self.assertEqual([0], b.sensor_indexes([b'\xff' * 8]))
+        self.assertEqual(0, len(b))
+        self.assertIsNone(b.rom(1))
+
+    def test_sensor_table_overflow_keeps_batch_consistent(self) -> None:
+        b = ReadingBuffer(self.path, capacity=64)
+        for i in range(ReadingBuffer.MAX_SENSORS - 1):
+            b.append(self.records(b, bytes([i]) * 8, [i]))
+        roms = [b'\x00' * 8, b'\xfe' * 8, b'\xff' * 8]  # a known sensor first, then two new ones that do not fit
+        indexes = b.sensor_indexes(roms)
+        self.assertEqual(0, len(b))
+        self.assertEqual(roms, [b.rom(i) for i in indexes])
+
+    def test_unusable_file_starts_over(self) -> None:
+        b = ReadingBuffer(self.path, capacity=4)
+        b.append(self.records(b, b'\x28' * 8, [1]))
+        self.assertEqual(0, len(ReadingBuffer(self.path, capacity=8)))  # a different capacity is not misread
+        with open(self.path, 'wb') as f:
+            f.write(b'junk')
+        b = ReadingBuffer(self.path, capacity=8)
+        self.assertEqual(0, len(b))
+        b.append(self.records(b, b'\x28' * 8, [1]))
+        self.assertEqual(1, len(ReadingBuffer(self.path, capacity=8)))
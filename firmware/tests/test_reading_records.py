@@ -0,0 +1,55 @@
+from io import BytesIO
+from unittest import TestCase
+
+from firmware.reading_records import ReadingRecords
+
+
+class TestReadingRecords(TestCase):
+
+    def test_append_and_read_fields(self) -> None:
+        r = ReadingRecords(4)
+        self.assertEqual(0, len(r))
+        r.append(3, 1_776_000_000, -16.8)
+        r.append(255, 4_294_967_295, 68.125)
+        self.assertEqual(2, len(r))
+        self.assertEqual(14, len(r.data) // 2)  # seven bytes per record
+        self.assertEqual(3, r.sensor_index(0))
+        self.assertEqual(1_776_000_000, r.epoch(0))
+        self.assertEqual(-1680, r.centi_degrees(0))
+        self.assertEqual(-16.8, r.temperature_f(0))
+        self.assertEqual(255, r.sensor_index(1))
+        self.assertEqual(4_294_967_295, r.epoch(1))
+        self.assertEqual(68.12, r.temperature_f(1))
+
+    def test_temperatures_are_clamped(self) -> None:
+        r = ReadingRecords(2)
+        r.append(0, 0, -1000)  # an unread sensor
+        r.append(0, 0, 1000)
+        self.assertEqual(-32768, r.centi_degrees(0))
+        self.assertEqual(32767, r.centi_degrees(1))
+
+    def test_full_and_clear(self) -> None:
+        r = ReadingRecords(1)
+        r.append(0, 0, 0.0)
+        with self.assertRaises(IndexError):
+            r.append(0, 0, 0.0)
+        r.clear()
+        self.assertEqual(0, len(r))
+        r.append(1, 2, 3.0)
+        self.assertEqual(1, r.sensor_index(0))
+
+    def test_serialization_round_trip(self) -> None:
+        r = ReadingRecords(3)
+        for i in range(3):
+            r.append(i, 1000 + i, 20.5 + i)
+        stream = BytesIO()
+        r.write_to(stream, 1)
+        self.assertEqual(14, len(stream.getvalue()))
+        stream.seek(0)
+        copy = ReadingRecords(5)
+        copy.append(9, 9, 9.0)
+        copy.read_from(stream, 10)
+        self.assertEqual(3, len(copy))
+        self.assertEqual([9, 1, 2], [copy.sensor_index(i) for i in range(3)])
+        self.assertEqual([9, 1001, 1002], [copy.epoch(i) for i in range(3)])
+        self.assertEqual([9.0, 21.5, 22.5], [copy.temperature_f(i) for i in range(3)])
@@ -3,8 +3,9 @@ from unittest import TestCase
 
 from firmware.board_mock import BoardMock
 from firmware.screen_mock import ScreenMock
-from firmware.sensing import SensorBox
+from firmware.sensing import DEFAULT_UPLOAD_POLICY, SensorBox
 from firmware.config_mock import ConfigMock
+from firmware.reading_records import ReadingRecords
 
 
 class TestSensing(TestCase):
@@ -77,8 +78,10 @@ class TestSensing(TestCase):
         self.assertEqual(previous_push_time_stamp, s.last_push_stamp)
         self.assertFalse(s.last_push_had_errors)
         s.time_synced = True
-        s.last_push_ms = int(time()) * 1000
-        s.phase_push(False)  # not the first time, and not enough time passed, so it shouldn't have pushed yet
+        for sensor in s.sensors:
+            sensor.last_recorded_f = sensor.temperature_f
+            sensor.last_recorded_ms = int(time()) * 1000
+        s.phase_push(False)  # not the first time, and no sensor is due to be recorded, so it shouldn't have pushed yet
         self.assertEqual(previous_push_time_stamp, s.last_push_stamp)
         self.assertFalse(s.last_push_had_errors)
         # in an http throw, there should be errors
@@ -155,11 +158,182 @@ class TestSensing(TestCase):
         s = SensorBox(board, self.screen, self.config)
         self.assertFalse(s.retrieved_sensor_info)
 
-    def test_put_to_github_handling(self) -> None:
-        board = BoardMock(watchdog_enabled=True, bad_http_put_status=True)
+    def test_push_to_github_handling(self) -> None:
+        for flag in ('bad_http_get_status', 'bad_http_post_status', 'bad_http_patch_status'):
+            board = BoardMock(watchdog_enabled=True)
+            s = SensorBox(board, self.screen, self.config)
+            setattr(board, flag, True)
+            s.record_readings(True)
+            self.assertFalse(s.push_unsent_readings())
+            self.assertEqual(2, len(s.unsent))  # the readings stay buffered for the next try
+            self.assertIn("Error", s.board.printed_messages_for_testing)
+
+    def test_push_to_github_without_sensors(self) -> None:
+        board = BoardMock(empty_ds18x20_roms=True)
         s = SensorBox(board, self.screen, self.config)
-        s.push_to_github()
-        self.assertIn("PUT Error", s.board.printed_messages_for_testing)
+        s.record_readings(True)
+        self.assertEqual(0, len(s.unsent))
+        self.assertTrue(s.push_unsent_readings())
+        self.assertTrue(s.push_to_github(ReadingRecords(1)))
+        self.assertFalse(board.post_urls_for_testing)
+
+    def test_push_to_github_drops_unattributed_records(self) -> None:
+        s = SensorBox(self.board, self.screen, self.config)
+        damaged = ReadingRecords(2)
+        damaged.append(15, 1_700_000_000, 1.0)  # no sensor ROM has been given index 15
+        damaged.append(15, 1_700_000_060, 2.0)
+        self.assertTrue(s.push_to_github(damaged))
+        self.assertFalse(self.board.post_urls_for_testing)
+        s.unsent.append(damaged)
+        self.assertTrue(s.push_unsent_readings())
+        self.assertEqual(0, len(s.unsent))  # dropped, rather than tried again on every pass
+        self.assertFalse(self.board.post_urls_for_testing)
+
+    def test_push_to_github_commit_time_comes_from_the_last_kept_record(self) -> None:
+        s = SensorBox(self.board, self.screen, self.config)
+        index = s.unsent.sensor_indexes([s.sensors[0].rom])[0]
+        mixed = ReadingRecords(2)
+        mixed.append(index, 1_700_000_000, 1.0)
+        mixed.append(15, 1_700_000_060, 2.0)
+        self.assertTrue(s.push_to_github(mixed))
+        tree_payload, commit_payload = self.board.post_payloads_for_testing
+        self.assertEqual(1, len(tree_payload['tree']))
+        t = self.board.localtime(1_700_000_000)
+        measured = f"{t[0]}-{t[1]:02d}-{t[2]:02d}-{t[3]:02d}-{t[4]:02d}-{t[5]:02d}"
+        self.assertEqual(f"Adding 1 readings measured up to {measured}", commit_payload['message'])
+
+    def test_push_to_github_is_one_commit(self) -> None:
+        s = SensorBox(self.board, self.screen, self.config)
+        s.record_readings(True)
+        self.assertTrue(s.push_unsent_readings())
+        self.assertEqual(0, len(s.unsent))
+        self.assertEqual(2, len(self.board.post_urls_for_testing))
+        self.assertTrue(self.board.post_urls_for_testing[0].endswith("/git/trees"))
+        self.assertTrue(self.board.post_urls_for_testing[1].endswith("/git/commits"))
+        tree_payload, commit_payload = self.board.post_payloads_for_testing
+        self.assertEqual("mock_head_tree_sha", tree_payload['base_tree'])
+        self.assertEqual("mock_sha_1", commit_payload['tree'])
+        self.assertEqual(["mock_head_commit_sha"], commit_payload['parents'])
+        self.assertEqual(1, len(self.board.patch_urls_for_testing))
+        self.assertTrue(self.board.patch_urls_for_testing[0].endswith("/git/refs/heads/sensor_data"))
+        self.assertEqual({'sha': "mock_sha_2", 'force': False}, self.board.patch_payloads_for_testing[0])
+        self.assertFalse(self.board.put_urls_for_testing)
+
+    def test_push_to_github_uses_day_partitions(self) -> None:
+        s = SensorBox(self.board, self.screen, self.config)
+        s.record_readings(True)
+        self.assertTrue(s.push_unsent_readings())
+        t = self.board.localtime()
+        day_folder = f"/{t[0]}/{t[1]:02d}/{t[2]:02d}/{t[0]}-{t[1]:02d}-{t[2]:02d}-"
+        tree = self.board.post_payloads_for_testing[0]['tree']
+        self.assertEqual(len(s.sensors), len(tree))
+        for sensor, entry in zip(s.sensors, tree):
+            self.assertTrue(entry['path'].startswith(f"data/{sensor.rom.hex()}{day_folder}"))
+            self.assertIn(f"sensor_id: {sensor.rom.hex()}", entry['content'])
+            self.assertIn(f"sensor_name: {sensor.name}", entry['content'])
+
+    def test_readings_are_kept_while_disconnected(self) -> None:
+        s = SensorBox(self.board, self.screen, self.config)
+        self.board.connected = False
+        s.phase_push(True)
+        s.phase_push(True)
+        self.assertEqual(4, len(s.unsent))
+        self.assertFalse(self.board.post_urls_for_testing)
+        self.board.connected = True
+        s.phase_push(False)  # not time to record new readings, but the buffered ones still get pushed
+        self.assertEqual(0, len(s.unsent))
+        self.assertEqual(4, len(self.board.post_payloads_for_testing[0]['tree']))
+        self.assertFalse(s.last_push_had_errors)
+
+    def test_readings_survive_a_reboot(self) -> None:
+        s = SensorBox(self.board, self.screen, self.config)
+        self.board.throw_http = True
+        s.phase_push(True)
+        self.assertTrue(s.last_push_had_errors)
+        self.board.throw_http = False
+        rebooted = SensorBox(self.board, self.screen, self.config)
+        self.assertEqual(2, len(rebooted.unsent))
+        self.assertTrue(rebooted.push_unsent_readings())
+        self.assertEqual(0, len(rebooted.unsent))
+
+    def test_sensor_details_set_upload_policy(self) -> None:
+        s = SensorBox(self.board, self.screen, self.config)
+        fridge, freezer = s.sensors
+        self.assertEqual(70.0, fridge.maximum_temp)
+        self.assertEqual({'deadband': 1.0, 'heartbeat_minutes': 120, 'excursion_minutes': 15, 'min_minutes': 1},
+                         fridge.upload_policy)
+        self.assertEqual(3.0, freezer.upload_policy['deadband'])
+        self.assertEqual(240, freezer.upload_policy['heartbeat_minutes'])
+        self.assertEqual(DEFAULT_UPLOAD_POLICY, SensorBox.upload_policy({}, {'type': None}))
+
+    def test_should_record(self) -> None:
+        s = SensorBox(self.board, self.screen, self.config)
+        minutes_passed = [0.0]
+        setattr(self.board, 'ticks_diff', lambda a, b: int(minutes_passed[0] * 60_000))
+        sensor = s.sensors[0]  # maximum 70, deadband 1, heartbeat 120 minutes
+        sensor.temperature_f = 60.0
+        self.assertTrue(s.should_record(sensor, 0))  # nothing recorded yet
+        sensor.last_recorded_f = 60.0
+        cases = [
+            (0.5, 65.0, False),  # a big move, but too soon after the last one
+            (30, 60.5, False),  # within the deadband
+            (30, 61.5, True),  # outside the deadband
+            (119, 60.0, False),
+            (120, 60.0, True),  # heartbeat
+        ]
+        for minutes, temperature_f, expected in cases:
+            minutes_passed[0] = minutes
+            sensor.temperature_f = temperature_f
+            self.assertEqual(expected, s.should_record(sensor, 0), (minutes, temperature_f))
+        sensor.last_recorded_f = 69.5
+        for minutes, temperature_f, expected in [(2, 70.2, True), (10, 70.2, False), (15, 70.2, True)]:
+            minutes_passed[0] = minutes
+            sensor.temperature_f = temperature_f
+            self.assertEqual(expected, s.should_record(sensor, 0), (minutes, temperature_f))
+            sensor.last_recorded_f = 70.1  # now over the maximum, so a small move back under it is a crossing too
+        minutes_passed[0] = 2
+        sensor.temperature_f = 69.6
+        self.assertTrue(s.should_record(sensor, 0))
+        sensor.maximum_temp = None  # a sensor without a configured maximum is only pushed on the deadband or heartbeat
+        self.assertFalse(s.should_record(sensor, 0))
+
+    def test_quiet_sensors_are_not_pushed_again(self) -> None:
+        s = SensorBox(self.board, self.screen, self.config)
+        s.phase_sensing()
+        s.phase_push(True)
+        pushes = len(self.board.patch_urls_for_testing)
+        s.phase_sensing()
+        s.phase_push(False)
+        self.assertEqual(pushes, len(self.board.patch_urls_for_testing))
+        self.board.fixed_temperature_c = 21  # 69.8 F, a 1.8 F move, outside the fridge's deadband only
+        s.phase_sensing()
+        s.phase_push(False)
+        self.assertEqual(pushes + 1, len(self.board.patch_urls_for_testing))
+        tree = self.board.post_payloads_for_testing[-2]['tree']
+        self.assertEqual(1, len(tree))
+        self.assertIn(s.sensors[0].rom.hex(), tree[0]['path'])
+        self.assertIn("temperature: 69.8", tree[0]['content'])
+
+    def test_push_reuses_one_connection(self) -> None:
+        s = SensorBox(self.board, self.screen, self.config)
+        self.assertFalse(self.board.open_hosts_for_testing)  # the config download closed its connection
+        self.board.connections_opened_for_testing = 0
+        for _ in range(13):
+            s.record_readings(True)  # 26 readings, two batches
+        s.phase_push(False)
+        self.assertEqual(1, self.board.connections_opened_for_testing)
+        self.assertEqual(7, self.board.connections_reused_for_testing)
+        self.assertFalse(self.board.open_hosts_for_testing)
+
+    def test_unsent_readings_drain_in_bounded_batches(self) -> None:
+        s = SensorBox(self.board, self.screen, self.config)
+        for _ in range(100):
+            s.record_readings(True)
+        self.assertTrue(s.push_unsent_readings())
+        self.assertEqual(4, len(self.board.patch_urls_for_testing))
+        self.assertEqual(200 - 4 * 24, len(s.unsent))
+        for tree_payload in self.board.post_payloads_for_testing[::2]:
+            self.assertEqual(24, len(tree_payload['tree']))
 
     # TODO: Think about turning these unit tests into operational issues:
     # def test_wifi_is_down_at_boot(self):
@@ -0,0 +1,302 @@
+# this module is the NumPy analytics engine for the scripts in this folder
+# readings are held as a struct of arrays (sensor index, epoch seconds, temperature), sorted by sensor and then time,
+# and every statistic is computed for all sensors (or all sensor/time buckets) at once with vectorized group-by
+# operations, rather than with Python loops over individual floats
+
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+import numpy as np
+
+from reading_archive import PACKED_SUFFIX, SensorArchive
+from reading_index import ReadingIndex
+from robust_stats import RESOLUTION, TRIM_PROPORTION, TemperatureSketch
+from series_codec import decode_numpy
+
+#: The epoch fell on a Thursday, so shifting weekly buckets by four days starts them on Monday at midnight UTC
+WEEK_OFFSET = 4 * 86400
+
+
+class GroupStats(NamedTuple):
+    """Per-group statistics, as parallel arrays with one entry per group, in ascending key order."""
+
+    #: The group keys
+    keys: np.ndarray
+    #: The number of readings in each group
+    num_readings: np.ndarray
+    #: The lowest reading in each group
+    minimum: np.ndarray
+    #: The highest reading in each group
+    maximum: np.ndarray
+    #: The plain mean of each group
+    mean: np.ndarray
+    #: The mean of each group after trimming the proportion of readings from each end
+    trimmed_mean: np.ndarray
+    #: The requested quantiles of each group, as an array of shape (number of quantiles, number of groups)
+    quantiles: np.ndarray
+
+
+def group_stats(keys: np.ndarray, temperatures: np.ndarray, proportion: float = TRIM_PROPORTION,
+                quantiles: tuple[float, ...] = (0.5, 0.95)) -> GroupStats:
+    """
+    Computes statistics for every group of readings sharing a key, using one sort and cumulative sums.
+
+    Quantiles use the nearest rank, the smallest reading with at least that fraction of the group at or below it, and
+    the trim drops a whole number of readings from each end of a group, both the same way as TemperatureSketch, so the
+    two agree up to the sketch's quantization.
+
+    :param keys: An integer group key per reading
+    :param temperatures: A temperature per reading, in degrees F
+    :param proportion: The fraction of readings to drop from each end of a group for the trimmed mean
+    :param quantiles: The quantiles to find for each group, from 0 to 1
+    :return: The statistics, with one entry per distinct key
+    """
+    order = np.lexsort((temperatures, keys))
+    sorted_keys = keys[order]
+    values = temperatures[order].astype(np.float64)
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]) if len(values) else np.zeros(0, int)
+    counts = np.diff(np.r_[starts, len(values)])
+    ends = starts + counts
+    sums = np.r_[0.0, np.cumsum(values)]
+    trim = np.floor(counts * proportion).astype(np.int64)
+    return GroupStats(
+        keys=sorted_keys[starts],
+        num_readings=counts,
+        minimum=values[starts],
+        maximum=values[ends - 1],
+        mean=(sums[ends] - sums[starts]) / counts,
+        trimmed_mean=(sums[ends - trim] - sums[starts + trim]) / (counts - 2 * trim),
+        quantiles=np.array([values[starts + np.clip(np.ceil(q * counts).astype(np.int64) - 1, 0, counts - 1)]
+                            for q in quantiles]),
+    )
+
+
+class Resampled(NamedTuple):
+    """Per sensor, per time bucket statistics, as parallel arrays sorted by sensor and then bucket start."""
+
+    #: The sensor ROM hex string of each bucket
+    sensor_ids: list[str]
+    #: The start of each bucket, in epoch seconds
+    bucket_start: np.ndarray
+    #: The bucket statistics, which include the median and 95th percentile as quantiles
+    stats: GroupStats
+
+
+class ReadingFrame:
+    """
+    A struct of arrays holding readings for any number of sensors, sorted by sensor and then by time, so that each
+    sensor's readings are one contiguous run of rows.
+    """
+
+    def __init__(self, sensor_ids: list[str], sensor_index: np.ndarray, epoch: np.ndarray,
+                 temperature: np.ndarray) -> None:
+        """
+        Builds a frame from parallel arrays, sorting them by sensor and time.
+
+        :param sensor_ids: The sensor ROM hex strings that sensor_index refers to
+        :param sensor_index: An index into sensor_ids per reading
+        :param epoch: A measurement time per reading, in epoch seconds
+        :param temperature: A temperature per reading, in degrees F
+        """
+        order = np.lexsort((epoch, sensor_index))
+        #: The sensor ROM hex strings that the sensor_index column refers to
+        self.sensor_ids = sensor_ids
+        #: The int32 sensor index column
+        self.sensor_index = np.asarray(sensor_index, dtype=np.int32)[order]
+        #: The int64 epoch seconds column
+        self.epoch = np.asarray(epoch, dtype=np.int64)[order]
+        #: The float64 temperature column, in degrees F
+        self.temperature = np.asarray(temperature, dtype=np.float64)[order]
+
+    def __len__(self) -> int:
+        return len(self.epoch)
+
+    @staticmethod
+    def from_readings(readings: Iterable[tuple[str, str, float]]) -> 'ReadingFrame':
+        """
+        Builds a frame from (sensor_id, measurement_time, temperature) tuples, as returned by the reading index.
+
+        :param readings: The readings, in any order
+        :return: A new frame
+        """
+        positions: dict[str, int] = {}
+        sensor_index = []
+        epoch = []
+        temperature = []
+        for sensor_id, measurement_time, reading in readings:
+            sensor_index.append(positions.setdefault(sensor_id, len(positions)))
+            epoch.append(measurement_time)
+            temperature.append(reading)
+        return ReadingFrame(list(positions), np.array(sensor_index), _to_epoch(epoch), np.array(temperature))
+
+    @staticmethod
+    def from_index(index: ReadingIndex, since: str = '') -> 'ReadingFrame':
+        """
+        Builds a frame from every reading in the index newer than the given measurement time.
+
+        :param index: An up-to-date reading index
+        :param since: A YYYY-MM-DD-HH-MM-SS string, or an empty string to load every reading
+        :return: A new frame
+        """
+        return ReadingFrame.from_readings(index.readings_since(since))
+
+    @staticmethod
+    def from_archive(archive_root: Path, sensor_ids: list[str], start_epoch: int = 0,
+                     end_epoch: int = 2 ** 62) -> 'ReadingFrame':
+        """
+        Builds a frame from the columnar archive, which avoids parsing any text at all.  A time range is found by
+        bisecting each sensor's time column, so only the rows inside it are copied out of the map.
+
+        :param archive_root: The folder holding the archive column files
+        :param sensor_ids: The sensor ROM hex strings to load
+        :param start_epoch: The first epoch second to include
+        :param end_epoch: The first epoch second to exclude
+        :return: A new frame
+        """
+        sensor_index = []
+        epoch = []
+        temperature = []
+        for position, sensor_id in enumerate(sensor_ids):
+            with SensorArchive(archive_root, sensor_id) as archive:
+                epoch_view, temperature_view = archive.window(start_epoch, end_epoch)
+                epochs = np.frombuffer(epoch_view, dtype='<i8')
+                temperatures = np.frombuffer(temperature_view.cast('B'), dtype='<f4')  # NumPy takes a byte view
+                sensor_index.append(np.full(len(epochs), position, dtype=np.int32))
+                epoch.append(epochs.copy())  # copy out of the map so the archive can be closed
+                temperature.append(temperatures.astype(np.float64))
+                del epochs, temperatures, epoch_view, temperature_view
+        return ReadingFrame(
+            sensor_ids,
+            np.concatenate(sensor_index) if sensor_index else np.zeros(0, np.int32),
+            np.concatenate(epoch) if epoch else np.zeros(0, np.int64),
+            np.concatenate(temperature) if temperature else np.zeros(0, np.float64),
+        )
+
+    @staticmethod
+    def from_packed(packed_root: Path, sensor_ids: list[str]) -> 'ReadingFrame':
+        """
+        Builds a frame from packed <rom>.tsc series files, decoded without a Python loop over readings.
+
+        :param packed_root: The folder holding the packed series files
+        :param sensor_ids: The sensor ROM hex strings to load; a sensor with no packed file just has no readings
+        :return: A new frame
+        """
+        sensor_index = []
+        epoch = []
+        temperature = []
+        for position, sensor_id in enumerate(sensor_ids):
+            packed_file = packed_root / f"{sensor_id}{PACKED_SUFFIX}"
+            if not packed_file.exists():
+                continue
+            epochs, temperatures = decode_numpy(packed_file.read_bytes())
+            sensor_index.append(np.full(len(epochs), position, dtype=np.int32))
+            epoch.append(epochs)
+            temperature.append(temperatures)
+        return ReadingFrame(
+            sensor_ids,
+            np.concatenate(sensor_index) if sensor_index else np.zeros(0, np.int32),
+            np.concatenate(epoch) if epoch else np.zeros(0, np.int64),
+            np.concatenate(temperature) if temperature else np.zeros(0, np.float64),
+        )
+
+    def _positions_in_group(self) -> tuple[np.ndarray, np.ndarray]:
+        # for each row, its position within its sensor's run of rows, and the length of that run
+        if not len(self):
+            return np.zeros(0, np.int64), np.zeros(0, np.int64)
+        starts = np.flatnonzero(np.r_[True, self.sensor_index[1:] != self.sensor_index[:-1]])
+        counts = np.diff(np.r_[starts, len(self)])
+        run = np.repeat(np.arange(len(starts)), counts)
+        return np.arange(len(self)) - starts[run], counts[run]
+
+    def tail(self, count: int) -> 'ReadingFrame':
+        """
+        Keeps only the most recent readings of each sensor.
+
+        :param count: The maximum number of readings to keep per sensor
+        :return: A new frame
+        """
+        position, length = self._positions_in_group()
+        keep = position >= length - count
+        return ReadingFrame(self.sensor_ids, self.sensor_index[keep], self.epoch[keep], self.temperature[keep])
+
+    def summary(self, proportion: float = TRIM_PROPORTION, quantiles: tuple[float, ...] = (0.5, 0.95)) -> GroupStats:
+        """
+        Computes per-sensor statistics; the group keys index into sensor_ids.
+
+        :param proportion: The fraction of readings to drop from each end for the trimmed mean
+        :param quantiles: The quantiles to find for each sensor
+        :return: The statistics, with one entry per sensor that has readings
+        """
+        return group_stats(self.sensor_index, self.temperature, proportion, quantiles)
+
+    def sketches(self) -> dict[str, TemperatureSketch]:
+        """
+        Builds a TemperatureSketch per sensor, counting the quantized readings in one vectorized pass.
+
+        :return: A dict keyed by sensor ROM hex string
+        """
+        quantized = np.rint(self.temperature / RESOLUTION).astype(np.int64)
+        pairs, counts = np.unique(np.stack([self.sensor_index.astype(np.int64), quantized]), axis=1,
+                                  return_counts=True)
+        sketches: dict[str, TemperatureSketch] = {}
+        for position, key, count in zip(pairs[0].tolist(), pairs[1].tolist(), counts.tolist()):
+            sketch = sketches.setdefault(self.sensor_ids[position], TemperatureSketch())
+            sketch.counts[key] = count
+            sketch.count += count
+        return sketches
+
+    def excursion_seconds(self, limits: dict[str, float], max_gap_seconds: int = 7200) -> dict[str, int]:
+        """
+        Totals the time each sensor spent above its limit.  Each reading above the limit counts the time until that
+        sensor's next reading, capped at max_gap_seconds so that an outage does not count as one long excursion.
+
+        :param limits: The maximum temperature per sensor ROM hex string; sensors not in here are skipped
+        :param max_gap_seconds: The longest interval a single reading can account for
+        :return: A dict of seconds above the limit, keyed by sensor ROM hex string
+        """
+        if not len(self):
+            return {s: 0 for s in self.sensor_ids if s in limits}
+        limit_per_sensor = np.array([limits.get(s, np.inf) for s in self.sensor_ids], dtype=np.float64)
+        gaps = np.diff(self.epoch, append=self.epoch[-1])
+        same_sensor = np.r_[self.sensor_index[1:] == self.sensor_index[:-1], False]
+        gaps = np.where(same_sensor, np.minimum(gaps, max_gap_seconds), 0)
+        above = self.temperature > limit_per_sensor[self.sensor_index]
+        totals = np.bincount(self.sensor_index, weights=gaps * above, minlength=len(self.sensor_ids))
+        return {s: int(totals[i]) for i, s in enumerate(self.sensor_ids) if s in limits}
+
+    def resample(self, period_seconds: int, proportion: float = TRIM_PROPORTION,
+                 quantiles: tuple[float, ...] = (0.5, 0.95), offset_seconds: int = 0) -> Resampled:
+        """
+        Computes statistics per sensor per fixed time bucket, such as hourly (3600) or daily (86400).  Buckets are
+        aligned to the epoch, so daily buckets run from midnight to midnight UTC, unless shifted by an offset.
+
+        :param period_seconds: The bucket length in seconds
+        :param proportion: The fraction of readings to drop from each end for the trimmed mean
+        :param quantiles: The quantiles to find for each bucket
+        :param offset_seconds: Shifts the bucket boundaries, for example by WEEK_OFFSET to start weeks on Monday
+        :return: The statistics, with one entry per sensor and bucket that has readings
+        """
+        keys = (self.sensor_index.astype(np.int64) << 32) | ((self.epoch - offset_seconds) // period_seconds)
+        stats = group_stats(keys, self.temperature, proportion, quantiles)
+        return Resampled(
+            sensor_ids=[self.sensor_ids[i] for i in (stats.keys >> 32).tolist()],
+            bucket_start=(stats.keys & 0xFFFFFFFF) * period_seconds + offset_seconds,
+            stats=stats,
+        )
+
+
+def _to_epoch(measurement_times: list[str]) -> np.ndarray:
+    # measurement times look like 2026-02-24-10-30-02; rewrite them as ISO 8601 so NumPy can parse them in bulk
+    iso = [f"{t[:10]}T{t[11:13]}:{t[14:16]}:{t[17:19]}" for t in measurement_times]
+    return np.array(iso, dtype='datetime64[s]').astype(np.int64) if iso else np.zeros(0, np.int64)
+
+
+def epoch_to_measurement_time(epoch: int) -> str:
+    """
+    Converts epoch seconds back into the posted measurement time format.
+
+    :param epoch: Integer seconds since the epoch
+    :return: A UTC time string like 2026-02-24-10-30-02
+    """
+    return datetime.fromtimestamp(epoch, UTC).strftime('%Y-%m-%d-%H-%M-%S')
@@ -1,58 +1,305 @@
 # this file will scan the _posts folder and append a representative "average" temperature value for each sensor to
-# the dashboard/_data/history.json file
+# the append-only history log, see history_log.py; running history_log.py afterwards regenerates the dashboard's
+# dashboard/_data/history.json view from the log
+# new readings are loaded into a NumPy ReadingFrame and counted into a bounded memory TemperatureSketch per sensor, and
+# the history value is the trimmed mean of that sketch
+# if a --state file is given, the scan is incremental: the state file carries over a sketch per sensor per UTC day of
+# the readings gathered since the last history entry, and of the readings of that entry, and each run recomputes the
+# days that the posts still in the folder fall into; a day is only replaced when it holds more readings than before,
+# so a day whose posts were cleaned up keeps what was gathered, and a reading posted late still lands in its day,
+# which rewrites the last history entry if the reading belongs to it
+# posts that are not yet in the reading index are parsed across --workers processes, sharded by sensor directory
+# with --backfill FIRST LAST, past entries are recomputed instead, from the columnar reading archive, which is rebuilt
+# from the monthly packed files kept in the repo by the weekly workflow plus the posts folder, so it reaches back past
+# the few days of posts, to when the monthly files were first kept (see reading_archive.py); each entry dated on a
+# Sunday in that range averages the readings measured in the seven days before that Sunday, the same week a scheduled
+# run on that day covers, the weeks are spread across --workers processes, and the entries are appended in date order,
+# replacing any for the same dates
 
-from datetime import datetime, timezone
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 from json import dumps, loads
 from pathlib import Path
-from sys import argv
+from typing import TypedDict
 
-data_root = Path(argv[1])  # pass path to the sensor_data/data folder in a standalone clone
+import numpy as np
+
+from analytics import ReadingFrame, epoch_to_measurement_time
+from history_log import LOG_FILE, append_entry
+from reading_archive import build_archive, load_months, measurement_epoch
+from reading_index import ReadingIndex
+from robust_stats import TemperatureSketch
 
-# read the current config and history from the dashboard folder in the main branch
 this_file_path = Path(__file__).resolve()
 repo_root = this_file_path.parent.parent
-config_file = repo_root / 'dashboard' / '_data' / 'config.json'
-config = loads(config_file.read_text())
-history_file = repo_root / 'dashboard' / '_data' / 'history.json'
-current_history = loads(history_file.read_text())
-
-# loop over every post, appending temperatures to create large lists
-all_posts = data_root.glob('**/*.html')
-all_posts_list = list(all_posts)
-current_temperature_history = dict()
-for post in all_posts_list:
-    sensor_id = None
-    temperature = None
-    contents = post.read_text()
-    for line in contents.split('\n'):
-        if 'sensor_id' in line:
-            sensor_id = line.split(':')[1].strip()
-        elif 'temperature' in line:
-            temperature = float(line.split(':')[1].strip())
-    if sensor_id is None or temperature is None:
-        print(f"Bad sensor data in file {post}; sensor_id = {sensor_id} temperature = {temperature}")
-        continue
-    if sensor_id not in current_temperature_history:
-        current_temperature_history[sensor_id] = []
-    current_temperature_history[sensor_id].append(temperature)
-
-# calculate average values for each sensor over the known reporting period
-average_values = {}
-for sensor_id, temperature_list in current_temperature_history.items():
-    sensor_label = config['rom_hex_to_cable_number'][sensor_id]
-    sensor_nice_name = config['sensors'][sensor_label]['nice_name']
-    sorted_temps = sorted(temperature_list)
-    if len(sorted_temps) > 10:
-        sorted_temps = sorted_temps[4:-4]  # get rid of any random outliers
-    average_temp = sum(sorted_temps) / len(sorted_temps)  # it _will_ have at least one based on logic above
-    average_values[sensor_nice_name] = average_temp
-
-# grab a nice timestamp to represent the current reading
-current_utc_datetime = datetime.now(timezone.utc)
-utc_string = current_utc_datetime.strftime('%Y-%m-%d')
-
-# save the new history to file
-current_history[utc_string] = average_values
-with open(history_file, 'w') as outfile:
-    outfile.write(dumps(current_history, indent=2))
-print(f"dashboard/_data/history.json updated, next `git add -A`, `git commit -m MSG` and `git push origin main")
+
+
+class Period(TypedDict):
+    """The readings gathered for one history entry, as kept in the --state file."""
+
+    #: Readings measured strictly after this YYYY-MM-DD-HH-MM-SS time belong to the period, or every reading if ''
+    start: str
+    #: Readings measured at or before this time belong to the period, or '' while the period is still open
+    end: str
+    #: The YYYY-MM-DD date of the history entry written for the period, or '' while the period is still open
+    date: str
+    #: The sketch JSON of each sensor's readings on each UTC day, keyed by sensor ROM hex string and then YYYY-MM-DD
+    days: dict[str, dict[str, dict[str, int]]]
+
+
+class HistoryState(TypedDict):
+    """The contents of the --state file."""
+
+    #: The newest measurement time gathered so far, like 2026-02-24-10-30-02
+    watermark: str
+    #: The period of the last history entry, if there is one, followed by the open period
+    periods: list[Period]
+
+
+def open_period(start: str) -> Period:
+    """
+    Starts a period for the readings measured after the given time, with no readings gathered yet.
+
+    :param start: A YYYY-MM-DD-HH-MM-SS string, or an empty string to take every reading
+    :return: The new period
+    """
+    return {'start': start, 'end': '', 'date': '', 'days': {}}
+
+
+def load_state(state_file: Path | None) -> HistoryState:
+    """
+    Reads the --state file, or starts a new state if there is none yet.
+
+    :param state_file: The state file, or None to run without one
+    :return: The state
+    """
+    if state_file is None or not state_file.exists():
+        return {'watermark': '', 'periods': [open_period('')]}
+    data = loads(state_file.read_text())
+    if 'sketches' in data:
+        # a state file from before the sketches were kept per day: carry its sketches over as a day that no reading
+        # falls on, so they are never recomputed, and only read what was measured after its watermark
+        period = open_period(data['watermark'])
+        period['days'] = {sensor_id: {'': sketch} for sensor_id, sketch in data['sketches'].items()}
+        return {'watermark': data['watermark'], 'periods': [period]}
+    return {'watermark': data['watermark'], 'periods': data['periods']}
+
+
+def gather_readings(periods: list[Period], frame: ReadingFrame) -> list[int]:
+    """
+    Recomputes the day sketches of each period from the readings that fall in it, keeping a stored day sketch unless
+    the readings now hold more of that day.
+
+    :param periods: The periods, updated in place
+    :param frame: The readings, such as every reading still in the posts folder
+    :return: The number of day sketches replaced in each period
+    """
+    day_number = frame.epoch // 86400
+    replaced = []
+    for period in periods:
+        in_period = frame.epoch > (measurement_epoch(period['start']) if period['start'] else -1)
+        if period['end']:
+            in_period &= frame.epoch <= measurement_epoch(period['end'])
+        count = 0
+        for day in np.unique(day_number[in_period]).tolist():
+            keep = in_period & (day_number == day)
+            day_frame = ReadingFrame(frame.sensor_ids, frame.sensor_index[keep], frame.epoch[keep],
+                                     frame.temperature[keep])
+            day_key = epoch_to_measurement_time(day * 86400)[:10]
+            for sensor_id, sketch in day_frame.sketches().items():
+                stored = period['days'].setdefault(sensor_id, {}).get(day_key)
+                if stored is None or sketch.count > sum(stored.values()):
+                    period['days'][sensor_id][day_key] = sketch.to_json()
+                    count += 1
+        replaced.append(count)
+    return replaced
+
+
+def period_sketches(period: Period) -> dict[str, TemperatureSketch]:
+    """
+    Merges the day sketches of a period into one sketch per sensor.
+
+    :param period: The period
+    :return: The sketch of each sensor's readings in the period, keyed by sensor ROM hex string
+    """
+    sketches = {}
+    for sensor_id, days in period['days'].items():
+        sketch = TemperatureSketch()
+        for data in days.values():
+            sketch.merge(TemperatureSketch.from_json(data))
+        if sketch.count:
+            sketches[sensor_id] = sketch
+    return sketches
+
+
+def nice_name_averages(config: dict, sketches: dict[str, TemperatureSketch]) -> dict[str, float]:
+    """
+    Calculates the history value of each sensor, the mean of its readings after trimming outliers from both ends.
+
+    :param config: The contents of dashboard/_data/config.json
+    :param sketches: The sketch of each sensor's readings, keyed by sensor ROM hex string
+    :return: The average of each sensor, keyed by its nice name
+    """
+    average_values = {}
+    for sensor_id, sketch in sketches.items():
+        sensor_label = config['rom_hex_to_cable_number'][sensor_id]
+        sensor_nice_name = config['sensors'][sensor_label]['nice_name']
+        average_values[sensor_nice_name] = sketch.trimmed_mean()
+    return average_values
+
+
+def week_entry_dates(first_day: str, last_day: str) -> list[str]:
+    """
+    Lists the dates history entries fall on within a range, which are Sundays, the day the weekly workflow runs.
+
+    :param first_day: The first YYYY-MM-DD day of the range
+    :param last_day: The last YYYY-MM-DD day of the range, included
+    :return: The YYYY-MM-DD dates, in order
+    """
+    day = date.fromisoformat(first_day)
+    day += timedelta(days=(6 - day.weekday()) % 7)
+    entry_dates = []
+    while day <= date.fromisoformat(last_day):
+        entry_dates.append(day.isoformat())
+        day += timedelta(days=7)
+    return entry_dates
+
+
+def week_sketches(archive_root: Path, sensor_ids: list[str], entry_date: str) -> dict[str, TemperatureSketch]:
+    """
+    Sketches the readings of the week a history entry covers, which is the seven days up to midnight UTC of its date.
+
+    :param archive_root: The folder holding the archive column files
+    :param sensor_ids: The sensor ROM hex strings to include
+    :param entry_date: The YYYY-MM-DD date of the history entry
+    :return: The sketch of each sensor with readings in that week, keyed by sensor ROM hex string
+    """
+    end_epoch = measurement_epoch(f"{entry_date}-00-00-00")
+    return ReadingFrame.from_archive(archive_root, sensor_ids, end_epoch - 7 * 86400, end_epoch).sketches()
+
+
+def backfill(config: dict, archive_root: Path, first_day: str, last_day: str, workers: int) -> list[str]:
+    """
+    Recomputes the history entries for every week in a range from the archive, and appends them to the log.
+
+    :param config: The contents of dashboard/_data/config.json
+    :param archive_root: The folder holding the archive column files
+    :param first_day: The first YYYY-MM-DD day of the range
+    :param last_day: The last YYYY-MM-DD day of the range, included
+    :param workers: The number of processes to compute the weeks with
+    :return: The dates of the entries appended, in order; weeks with no readings get no entry
+    """
+    sensor_ids = sorted(epoch_file.stem for epoch_file in archive_root.glob('*.epoch'))
+    entry_dates = week_entry_dates(first_day, last_day)
+    arguments = ([archive_root] * len(entry_dates), [sensor_ids] * len(entry_dates), entry_dates)
+    if workers > 1 and len(entry_dates) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            weeks = list(pool.map(week_sketches, *arguments))
+    else:
+        weeks = list(map(week_sketches, *arguments))
+    appended = []
+    for entry_date, sketches in zip(entry_dates, weeks):
+        if sketches:
+            append_entry(LOG_FILE, entry_date, nice_name_averages(config, sketches))
+            appended.append(entry_date)
+    return appended
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Append a weekly average temperature for each sensor to the history log")
+    parser.add_argument('data_root', type=Path, help="path to the sensor_data/data folder in a standalone clone")
+    parser.add_argument('--state', type=Path, default=None,
+                        help="incremental state file holding the parse watermark and the partial per-sensor sketches")
+    parser.add_argument('--index', type=Path, default=repo_root / 'reading_index.sqlite',
+                        help="SQLite reading index shared by the scripts; only posts missing from it are read")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of processes used to parse posts that are not yet in the index")
+    parser.add_argument('--ingest-only', action='store_true',
+                        help="only fold new posts into the --state file, without appending a history entry")
+    parser.add_argument('--backfill', nargs=2, metavar=('FIRST_DAY', 'LAST_DAY'), default=None,
+                        help="recompute the entries for the Sundays from FIRST_DAY to LAST_DAY (YYYY-MM-DD) instead")
+    parser.add_argument('--archive', type=Path, default=repo_root / 'archive',
+                        help="columnar reading archive that --backfill reads, brought up to date from data_root first")
+    parser.add_argument('--months', type=Path, default=repo_root / 'archive_months',
+                        help="packed monthly archive files kept in the repo, merged into the archive for --backfill")
+    args = parser.parse_args()
+    if args.ingest_only and args.state is None:
+        parser.error("--ingest-only requires a --state file")
+
+    # read the current config from the dashboard folder in the main branch
+    config_file = repo_root / 'dashboard' / '_data' / 'config.json'
+    config = loads(config_file.read_text())
+
+    if args.backfill is not None:
+        if args.months.exists():
+            load_months(args.months, args.archive)
+        index = ReadingIndex(args.index)
+        build_archive(args.data_root, args.archive, index)
+        index.close()
+        first_day, last_day = args.backfill
+        appended = backfill(config, args.archive, first_day, last_day, args.workers)
+        print(f"Backfilled {len(appended)} history entries: {', '.join(appended) or 'none had readings'}")
+        print("history.jsonl updated, next run scripts/history_log.py to regenerate dashboard/_data/history.json")
+        return
+
+    # the watermark is the newest measurement time gathered so far, like 2026-02-24-10-30-02
+    # these timestamps are fixed width and zero padded, so plain string comparison orders them correctly
+    state = load_state(args.state)
+    periods = state['periods']
+
+    # bring the shared reading index up to date from the day partitions of the oldest period kept on, then recompute
+    # the days of each period from every reading in it, which includes readings that were posted late
+    index = ReadingIndex(args.index)
+    num_new_files = index.ingest(args.data_root, args.workers, since=periods[0]['start'])
+    readings = ReadingFrame.from_index(index, periods[0]['start'])
+    index.close()
+    replaced = gather_readings(periods, readings)
+    if len(readings):
+        state['watermark'] = max(state['watermark'], epoch_to_measurement_time(int(readings.epoch.max())))
+    print(f"Indexed {num_new_files} new file(s), updated {sum(replaced)} sensor day(s); "
+          f"watermark is {state['watermark']}")
+
+    # late readings of the last history entry's period are folded into it, and the entry is appended again, which
+    # replaces the earlier line for that date
+    for period, count in zip(periods, replaced):
+        if period['date'] and count:
+            append_entry(LOG_FILE, period['date'], nice_name_averages(config, period_sketches(period)))
+            print(f"History entry {period['date']} updated with late readings")
+
+    if args.ingest_only:
+        args.state.write_text(dumps(state))
+        print(f"{args.state} updated, no history entry was appended")
+        return
+
+    sketches = period_sketches(periods[-1])
+    if not sketches:
+        if args.state is not None:
+            args.state.write_text(dumps(state))
+        print("No temperature readings were found, the history log was not modified")
+        return
+
+    # calculate average values for each sensor over the known reporting period, trimming outliers from both ends
+    average_values = nice_name_averages(config, sketches)
+
+    # grab a nice timestamp to represent the current reading
+    current_utc_datetime = datetime.now(timezone.utc)
+    utc_string = current_utc_datetime.strftime('%Y-%m-%d')
+
+    # add the new entry to the end of the log, leaving every earlier entry untouched
+    append_entry(LOG_FILE, utc_string, average_values)
+
+    # the readings are now represented in history, so the period is closed at the watermark and kept for any late
+    # readings, in place of the one before it, and the next period starts empty from the watermark
+    if args.state is not None:
+        periods[-1]['end'] = state['watermark']
+        periods[-1]['date'] = utc_string
+        state['periods'] = [periods[-1], open_period(state['watermark'])]
+        args.state.write_text(dumps(state))
+        print(f"{args.state} updated with watermark {state['watermark']}")
+    print("history.jsonl updated, next run scripts/history_log.py to regenerate dashboard/_data/history.json, "
+          "then `git add -A`, `git commit -m MSG` and `git push origin main")
+
+
+if __name__ == "__main__":
+    main()
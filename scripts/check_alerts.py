@@ -0,0 +1,191 @@
+# this file will check every alert rule for every active sensor in one pass, and fail if any rule is broken
+# the readings come from the latest/<rom>.json ring of each active sensor, one small file each, so it is cheap enough to
+# run every few minutes
+# the rules are declared under "alert_rules" in dashboard/_data/config.json: the "defaults" apply to every sensor, the
+# entry under "types" matching a sensor's "type" overrides them, and a sensor's own "alert_rules" override both; the
+# parameters of a rule are merged key by key through these layers, and setting a rule to null turns it off
+# the rules are:
+#  - max_temp: the newest reading is over the sensor's maximum_temp plus "margin" degrees
+#  - consecutive_excursions: each of the newest "count" readings is at or over the sensor's maximum_temp
+#  - rate_of_change: the newest reading is more than "degrees" over the lowest reading in the "hours" before it
+#  - staleness: the newest reading is older than "hours", or the sensor has no readings at all
+
+from argparse import ArgumentParser
+from datetime import datetime, timedelta, UTC
+from json import loads
+from pathlib import Path
+from sys import exit
+from typing import Callable, NamedTuple
+
+from git_posts import GitPostReader
+from latest_readings import read_rings
+from posts import TIME_FORMAT, Reading
+
+
+RED = '\033[91m'
+GREEN = '\033[92m'
+YELLOW = '\033[93m'
+ENDC = '\033[0m'
+
+this_file_path = Path(__file__).resolve()
+repo_root = this_file_path.parent.parent
+
+
+class Alert(NamedTuple):
+    """One broken rule for one sensor."""
+
+    #: The label on the sensor's wire, which keys the sensor in the config
+    cable_num: str
+    #: The sensor ROM hex string
+    sensor_rom: str
+    #: The name of the broken rule
+    rule: str
+    #: What was found
+    message: str
+
+
+def _reading_time(reading: Reading) -> datetime:
+    return datetime.strptime(reading.measurement_time, TIME_FORMAT).replace(tzinfo=UTC)
+
+
+def check_max_temp(sensor: dict, ring: list[Reading], params: dict, now: datetime) -> str | None:
+    """The newest reading is over the sensor's maximum_temp plus the margin."""
+    limit = float(sensor['maximum_temp']) + float(params.get('margin', 0))
+    if ring and ring[0].temperature > limit:
+        return f"Latest reading {ring[0].temperature:.1f} at {_reading_time(ring[0])} UTC is over {limit}"
+    return None
+
+
+def check_consecutive_excursions(sensor: dict, ring: list[Reading], params: dict, now: datetime) -> str | None:
+    """Each of the newest readings is at or over the sensor's maximum_temp."""
+    max_temp = float(sensor['maximum_temp'])
+    recent = [reading.temperature for reading in ring[:int(params.get('count', 3))]]
+    if recent and min(recent) >= max_temp:
+        return f"Latest {len(recent)} reading(s) all over {max_temp}; Temp History: {recent}"
+    return None
+
+
+def check_rate_of_change(sensor: dict, ring: list[Reading], params: dict, now: datetime) -> str | None:
+    """The newest reading rose too far over the lowest reading in the hours before it."""
+    if not ring:
+        return None
+    window_start = _reading_time(ring[0]) - timedelta(hours=float(params['hours']))
+    lowest = min(reading.temperature for reading in ring if _reading_time(reading) >= window_start)
+    rise = ring[0].temperature - lowest
+    if rise > float(params['degrees']):
+        return f"Rose {rise:.1f} degrees within {params['hours']} hour(s), to {ring[0].temperature:.1f}"
+    return None
+
+
+def check_staleness(sensor: dict, ring: list[Reading], params: dict, now: datetime) -> str | None:
+    """The newest reading is too old, or there are no readings."""
+    if not ring:
+        return "No data - typo?"
+    cutoff = now - timedelta(hours=float(params.get('hours', 18)))
+    latest = _reading_time(ring[0])
+    if latest < cutoff:
+        return f"Latest Update {latest} UTC, before the cutoff of {cutoff} UTC"
+    return None
+
+
+#: The check for each rule name, each returning a message if the rule is broken, or None if not
+RULE_CHECKS: dict[str, Callable[[dict, list[Reading], dict, datetime], str | None]] = {
+    'max_temp': check_max_temp,
+    'consecutive_excursions': check_consecutive_excursions,
+    'rate_of_change': check_rate_of_change,
+    'staleness': check_staleness,
+}
+
+
+def sensor_rules(alert_rules: dict, sensor: dict) -> dict[str, dict]:
+    """
+    Resolves the rules that apply to one sensor, through the defaults, the sensor's type, and the sensor itself.
+
+    :param alert_rules: The "alert_rules" entry of the config
+    :param sensor: The sensor's entry of the config
+    :return: The parameters of each rule that is turned on, keyed by rule name
+    """
+    layers = (
+        alert_rules.get('defaults', {}),
+        alert_rules.get('types', {}).get(sensor.get('type'), {}),
+        sensor.get('alert_rules', {}),
+    )
+    rules: dict[str, dict | None] = {}
+    for layer in layers:
+        for rule, params in layer.items():
+            if rule.startswith('readme'):
+                continue
+            if rule not in RULE_CHECKS:
+                raise ValueError(f"Unknown alert rule \"{rule}\" for sensor {sensor.get('nice_name')}")
+            rules[rule] = None if params is None else {**(rules.get(rule) or {}), **params}
+    return {rule: params for rule, params in rules.items() if params is not None}
+
+
+def evaluate(config: dict, rings: dict[str, list[Reading]], now: datetime) -> tuple[list[Alert], list[str]]:
+    """
+    Checks every rule of every active sensor against its latest readings.
+
+    :param config: The contents of dashboard/_data/config.json
+    :param rings: The latest readings of each active sensor, newest first, keyed by sensor ROM hex string
+    :param now: The current time, in UTC
+    :return: A tuple of the broken rules, and the cable numbers of the sensors that broke none
+    """
+    alert_rules = config.get('alert_rules', {})
+    alerts = []
+    passing = []
+    for cable_num, sensor in config['sensors'].items():
+        if cable_num.startswith('readme') or not sensor.get('active', False):
+            continue
+        ring = rings.get(sensor['hex'], [])
+        broken = []
+        for rule, params in sensor_rules(alert_rules, sensor).items():
+            message = RULE_CHECKS[rule](sensor, ring, params, now)
+            if message is not None:
+                broken.append(Alert(cable_num, sensor['hex'], rule, message))
+        alerts.extend(broken)
+        if not broken:
+            passing.append(cable_num)
+    return alerts, passing
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Fail if any active sensor breaks any of the alert rules in the config")
+    parser.add_argument('--latest-root', type=Path, default=repo_root / 'dashboard' / '_data' / 'latest',
+                        help="folder holding the latest/<rom>.json rings, as synced from the sensor_data branch")
+    parser.add_argument('--git-ref', default=None,
+                        help="read the rings from this ref (like origin/sensor_data) in the git objects instead")
+    args = parser.parse_args()
+    now = datetime.now(UTC)
+    print(f"Checking alerts\n - Current time: {now} UTC")
+
+    config_file = repo_root / 'dashboard' / '_data' / 'config.json'
+    config = loads(config_file.read_text())
+    sensors = config['sensors']
+    active_roms = [
+        sensor['hex'] for cable_num, sensor in sensors.items()
+        if not cable_num.startswith('readme') and sensor.get('active', False)
+    ]
+    if args.git_ref is None:
+        rings = read_rings(active_roms, args.latest_root)
+    else:
+        with GitPostReader(repo_root, args.git_ref) as reader:
+            rings = read_rings(active_roms, args.latest_root, reader)
+    alerts, passing = evaluate(config, rings, now)
+
+    def describe(cable_num: str) -> str:
+        return f"{sensors[cable_num].get('nice_name', 'Unassigned')} ({cable_num}: {sensors[cable_num]['hex']})"
+
+    alert_string = ''.join([f"\n{RED} - {describe(a.cable_num)}; {a.rule}: {a.message}{ENDC}" for a in alerts])
+    passing_string = ''.join([f"\n{GREEN} - {describe(cable_num)}{ENDC}" for cable_num in passing])
+    ignored = [k for k, sensor in sensors.items() if not k.startswith('readme') and not sensor.get('active', False)]
+    ignored_string = ''.join([f"\n{YELLOW} - {describe(cable_num)}{ENDC}" for cable_num in ignored])
+    if alerts:
+        print(f"At least one alert rule was broken!\nAlerts listed here:{alert_string}\n"
+              f"Sensors Passing:{passing_string}\nSensors Ignored:{ignored_string}")
+        exit(1)
+    else:
+        print(f"{GREEN}All Sensors Passing!{ENDC}\nSensors Passing:{passing_string}\nSensors Ignored:{ignored_string}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,103 @@
-# this file will scan the _posts folder and Git stage the deletion of old files
-# the max_age_days variable at the top of the file defines how old of files we will keep
+# this file will scan the sensor_data/data folder and delete the posts and segments older than the retention period,
+# leaving the deletions to be staged and committed with `git add -A`
+# the expired files are found in one pass over the day partitions up to the cutoff day, by the times in their names;
+# a file whose name carries no time falls back to the newest measurement time inside it, and then to the day folder
+# it sits in, and a file with no usable time at all is reported and kept, rather than silently kept forever
+# the deletions are plain os.unlink calls spread across a thread pool, and day, month and year folders left empty
+# are removed afterwards; --dry-run reports the files and bytes that would be reclaimed without deleting anything
 
-from datetime import datetime, timedelta
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, UTC
+from os import unlink
 from pathlib import Path
-from subprocess import check_call
-from sys import argv
-
-data_root = Path(argv[1])  # pass path to the sensor_data/data folder in a standalone clone
-
-max_age_days = 10
-
-current_time = datetime.now()
-cutoff_date = current_time - timedelta(days=max_age_days)
-
-all_posts = data_root.glob('**/*.html')
-all_posts_list = list(all_posts)
-num_to_delete = 0
-for post in all_posts_list:
-    measurement_time = datetime.now()
-    try:
-        file_name = post.name
-        time_string = file_name.split('_')[0]
-        measurement_time = datetime.strptime(time_string, '%Y-%m-%d-%H-%M-%S')
-    except Exception as e:
-        print(f"Could not create timestamp for file: \"{post}\"; Reason: {e}")
-    if measurement_time < cutoff_date:
-        check_call(['rm', post])
-        num_to_delete += 1
-if num_to_delete > 0:
-    print(f"{num_to_delete} file(s) deleted, next `git add -A`, `git commit -m MSG` and `git push origin sensor_data")
-else:
-    print("No files were staged for deletion, nothing to do")
+
+from posts import TIME_FORMAT, file_time, is_measurement_time, list_files, read_file
+
+
+def expiry_time(data_root: Path, post: Path) -> str | None:
+    """
+    Finds the time after which a post or segment no longer holds anything newer.
+
+    :param data_root: The folder holding one subdirectory per sensor ROM
+    :param post: A post or segment file in that folder
+    :return: A YYYY-MM-DD-HH-MM-SS string, or None if the file has no usable time in its name, contents or folder
+    """
+    name_time = file_time(post.name)
+    if is_measurement_time(name_time):
+        return name_time
+    readings = read_file(post)
+    if readings:
+        return max(reading.measurement_time for reading in readings)
+    parts = post.relative_to(data_root).parts
+    if len(parts) == 5:  # <rom>/<YYYY>/<MM>/<DD>/<file>
+        folder_time = f"{parts[1]}-{parts[2]}-{parts[3]}-23-59-59"
+        if is_measurement_time(folder_time):
+            return folder_time
+    return None
+
+
+def find_expired(data_root: Path, cutoff: str) -> tuple[list[Path], list[Path]]:
+    """
+    Finds every file older than the cutoff, listing only the day partitions up to the cutoff day.
+
+    :param data_root: The folder holding one subdirectory per sensor ROM
+    :param cutoff: A YYYY-MM-DD-HH-MM-SS string; files holding nothing newer than this are expired
+    :return: A tuple of the expired files, and the files whose age could not be determined
+    """
+    expired = []
+    unknown = []
+    for post in list_files(data_root, end=cutoff):
+        newest = expiry_time(data_root, post)
+        if newest is None:
+            unknown.append(post)
+        elif newest < cutoff:
+            expired.append(post)
+    return sorted(expired), sorted(unknown)
+
+
+def delete_files(data_root: Path, files: list[Path], workers: int) -> None:
+    """
+    Deletes the files across a thread pool, then removes any partition folders left empty.
+
+    :param data_root: The folder holding one subdirectory per sensor ROM
+    :param files: The files to delete
+    :param workers: The number of threads to delete with
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(unlink, files))
+    folders = {folder for post in files for folder in post.parents if data_root in folder.parents}
+    for folder in sorted(folders, key=lambda f: len(f.parts), reverse=True):
+        if len(folder.relative_to(data_root).parts) > 1 and not any(folder.iterdir()):
+            folder.rmdir()  # the sensor folder itself is kept, so the sensor is still listed
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Delete sensor posts and segments older than the retention period")
+    parser.add_argument('data_root', type=Path, help="path to the sensor_data/data folder in a standalone clone")
+    parser.add_argument('--max-age-days', type=int, default=10, help="number of days of data to keep")
+    parser.add_argument('--workers', type=int, default=8, help="number of threads used to delete files")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="only report the files and bytes that would be reclaimed, without deleting anything")
+    args = parser.parse_args()
+
+    cutoff = (datetime.now(UTC) - timedelta(days=args.max_age_days)).strftime(TIME_FORMAT)
+    expired, unknown = find_expired(args.data_root, cutoff)
+    for post in unknown:
+        print(f"Could not find a timestamp for file: \"{post}\", keeping it; rename or remove it by hand")
+    num_bytes = sum(post.stat().st_size for post in expired)
+    if args.dry_run:
+        for post in expired:
+            print(f" - {post}")
+        print(f"Dry run: {len(expired)} file(s) older than {cutoff} UTC would be deleted, reclaiming {num_bytes} bytes")
+        return
+    delete_files(args.data_root, expired, args.workers)
+    if expired:
+        print(f"{len(expired)} file(s) deleted ({num_bytes} bytes), "
+              "next `git add -A`, `git commit -m MSG` and `git push origin sensor_data")
+    else:
+        print("No files were staged for deletion, nothing to do")
+
+
+if __name__ == "__main__":
+    main()
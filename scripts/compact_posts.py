@@ -0,0 +1,104 @@
+# this file will rewrite the posts of each sensor into one segment file per day, and delete the compacted posts
+# a segment is named <YYYY-MM-DD>_<rom>.jsonl, sits in the day partition folder of its day, and holds one JSON object
+# per reading, with the same four keys as a post, in time order; posts still sitting directly in a sensor folder, from
+# before the partitioned layout, are compacted into the segment in their day partition too
+# only days older than --keep-days are compacted: posts for the recent days are still arriving, today's as they are
+# measured and earlier days' when a box pushes the readings it buffered in flash during an outage, so leaving those
+# days as posts means each day's segment is written once its posts have stopped coming, not rewritten every week
+# it is safe to run repeatedly, or after an interrupted run: readings already in a segment are merged by measurement
+# time, the segment is replaced atomically, and posts are only deleted once the segment holding them is written
+
+from argparse import ArgumentParser
+from datetime import datetime, timedelta, UTC
+from json import dumps
+from os import replace
+from pathlib import Path
+
+from posts import POST_SUFFIX, SEGMENT_SUFFIX, Reading, list_files, partition_folder, read_file, read_post
+
+
+def write_segment(segment: Path, readings: dict[str, Reading]) -> None:
+    """
+    Replaces a segment file atomically with the given readings, in time order.
+
+    :param segment: The segment file to write
+    :param readings: The readings, keyed by measurement time
+    """
+    lines = [dumps(readings[measurement_time]._asdict()) for measurement_time in sorted(readings)]
+    partial = segment.with_name(segment.name + '.partial')
+    partial.write_text(''.join(f"{line}\n" for line in lines))
+    replace(partial, segment)
+
+
+def compact_day(folder: Path, sensor_id: str, day: str, posts: list[Path]) -> int:
+    """
+    Merges the given posts into the sensor's segment for the day, then deletes them.
+
+    :param folder: The day partition folder, where the segment is written
+    :param sensor_id: The sensor ROM hex string
+    :param day: The YYYY-MM-DD day being compacted
+    :param posts: The posts of that day; malformed posts are reported and left in place
+    :return: The number of posts compacted
+    """
+    segment = folder / f"{day}_{sensor_id}{SEGMENT_SUFFIX}"
+    readings: dict[str, Reading] = {}
+    if segment.exists():
+        existing = read_file(segment)
+        if existing is None:
+            print(f"Bad segment file {segment}, leaving this day alone")
+            return 0
+        readings.update((reading.measurement_time, reading) for reading in existing)
+    compacted = []
+    for post in posts:
+        reading = read_post(post)
+        if reading is None:
+            print(f"Bad sensor data in file {post}, leaving it in place")
+            continue
+        readings[reading.measurement_time] = reading
+        compacted.append(post)
+    if not compacted:
+        return 0
+    folder.mkdir(parents=True, exist_ok=True)
+    write_segment(segment, readings)
+    for post in compacted:
+        post.unlink()
+    return len(compacted)
+
+
+def compact_posts(data_root: Path, keep_days: int) -> int:
+    """
+    Compacts every day older than the given number of days, for every sensor; newer day partitions are not listed.
+
+    :param data_root: The folder holding one subdirectory of posts per sensor ROM
+    :param keep_days: The number of most recent days (in UTC) to leave as posts
+    :return: The number of posts compacted
+    """
+    last_day_to_compact = (datetime.now(UTC) - timedelta(days=keep_days + 1)).strftime('%Y-%m-%d')
+    posts_by_day: dict[tuple[Path, str, str], list[Path]] = {}
+    for post in list_files(data_root, end=last_day_to_compact):
+        if post.suffix == POST_SUFFIX:
+            sensor_id = post.relative_to(data_root).parts[0]
+            day = post.name[:10]
+            posts_by_day.setdefault((data_root / partition_folder(sensor_id, day), sensor_id, day), []).append(post)
+    num_compacted = 0
+    for folder, sensor_id, day in sorted(posts_by_day):
+        num_compacted += compact_day(folder, sensor_id, day, sorted(posts_by_day[(folder, sensor_id, day)]))
+    return num_compacted
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Compact older posts into one segment file per sensor per day")
+    parser.add_argument('data_root', type=Path, help="path to the sensor_data/data folder in a standalone clone")
+    parser.add_argument('--keep-days', type=int, default=5,
+                        help="number of most recent days, which may still get posts, to leave as individual posts")
+    args = parser.parse_args()
+    num_compacted = compact_posts(args.data_root, args.keep_days)
+    if num_compacted > 0:
+        print(f"{num_compacted} post(s) compacted, "
+              "next `git add -A`, `git commit -m MSG` and `git push origin sensor_data")
+    else:
+        print("No posts were old enough to compact, nothing to do")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# this file exports the state of every active sensor in the OpenMetrics text format, for Prometheus to scrape
+# the metrics are the latest temperature, the seconds since the latest reading, the margin below the maximum
+# temperature, and the number of readings pushed over the last day, each labelled with the sensor's ROM, cable number,
+# name, location and type
+# every export first brings the shared reading index up to date, which only reads the posts it has not seen before,
+# and only lists the day partitions of the last day
+# the metrics are either written atomically to a textfile for the node_exporter textfile collector:
+#   python scripts/export_metrics.py sensor_data/data --textfile /var/lib/node_exporter/textfile/tempsensors.prom
+# or served over HTTP, recomputed on each scrape:
+#   python scripts/export_metrics.py sensor_data/data --serve 9477
+# no timestamps are attached to the samples, since the textfile collector does not accept them
+
+from argparse import ArgumentParser
+from datetime import datetime, timedelta, UTC
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from json import loads
+from os import replace
+from pathlib import Path
+
+from posts import TIME_FORMAT
+from reading_index import ReadingIndex
+
+this_file_path = Path(__file__).resolve()
+repo_root = this_file_path.parent.parent
+
+#: The content type of the OpenMetrics text format
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+#: The metric families, as (name, unit, help text)
+METRICS = (
+    ('tempsensors_temperature_fahrenheit', 'fahrenheit', "The latest temperature reading."),
+    ('tempsensors_reading_age_seconds', 'seconds', "The time since the latest reading was measured."),
+    ('tempsensors_threshold_margin_fahrenheit', 'fahrenheit',
+     "The maximum temperature minus the latest reading; negative when over the maximum."),
+    ('tempsensors_readings_last_day', '', "The number of readings pushed over the last day."),
+)
+
+
+def _label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_metrics(config: dict, index: ReadingIndex, now: datetime) -> str:
+    """
+    Renders the metrics of every active sensor from an up-to-date reading index.
+
+    :param config: The contents of dashboard/_data/config.json
+    :param index: The reading index, holding at least the last day of readings
+    :param now: The current time, in UTC
+    :return: The exposition, in the OpenMetrics text format
+    """
+    counts = index.counts_since((now - timedelta(days=1)).strftime(TIME_FORMAT))
+    samples: dict[str, list[str]] = {name: [] for name, _, _ in METRICS}
+    for cable_num, sensor in config['sensors'].items():
+        if cable_num.startswith('readme') or not sensor.get('active', False):
+            continue
+        labels = ','.join(f'{key}="{_label_value(value)}"' for key, value in (
+            ('sensor', sensor['hex']), ('cable', cable_num), ('name', sensor.get('nice_name', '')),
+            ('location', sensor.get('sensor_location', '')), ('type', sensor.get('type') or ''),
+        ))
+        samples['tempsensors_readings_last_day'].append(f"{{{labels}}} {counts.get(sensor['hex'], 0)}")
+        latest = index.latest(sensor['hex'], 1)
+        if not latest:
+            continue  # a sensor that never reported has no latest reading to describe
+        measurement_time, temperature = latest[0]
+        age = now - datetime.strptime(measurement_time, TIME_FORMAT).replace(tzinfo=UTC)
+        samples['tempsensors_temperature_fahrenheit'].append(f"{{{labels}}} {temperature!r}")
+        samples['tempsensors_reading_age_seconds'].append(f"{{{labels}}} {int(age.total_seconds())}")
+        margin = float(sensor['maximum_temp']) - temperature
+        samples['tempsensors_threshold_margin_fahrenheit'].append(f"{{{labels}}} {margin!r}")
+    lines = []
+    for name, unit, help_text in METRICS:
+        lines.append(f"# TYPE {name} gauge")
+        if unit:
+            lines.append(f"# UNIT {name} {unit}")
+        lines.append(f"# HELP {name} {help_text}")
+        lines.extend(f"{name}{sample}" for sample in samples[name])
+    lines.append("# EOF")
+    return '\n'.join(lines) + '\n'
+
+
+def export(config: dict, index: ReadingIndex, posts_root: Path, workers: int) -> str:
+    """
+    Brings the index up to date with the last day of posts, then renders the metrics.
+
+    :param config: The contents of dashboard/_data/config.json
+    :param index: The reading index
+    :param posts_root: The folder holding one subdirectory of posts per sensor ROM
+    :param workers: The number of processes to parse new posts with
+    :return: The exposition, in the OpenMetrics text format
+    """
+    now = datetime.now(UTC)
+    index.ingest(posts_root, workers, since=(now - timedelta(days=1)).strftime(TIME_FORMAT))
+    return render_metrics(config, index, now)
+
+
+def write_textfile(textfile: Path, exposition: str) -> None:
+    """
+    Replaces the textfile atomically, so a collector never reads a half written file.
+
+    :param textfile: The file read by the node_exporter textfile collector, which must end in .prom
+    :param exposition: The metrics to write
+    """
+    partial = textfile.with_name(textfile.name + '.partial')  # the collector ignores files not ending in .prom
+    partial.write_text(exposition)
+    replace(partial, textfile)
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Export the sensor readings as OpenMetrics, to a textfile or over HTTP")
+    parser.add_argument('posts_root', type=Path, help="path to the sensor_data/data folder or dashboard/_posts")
+    parser.add_argument('--index', type=Path, default=repo_root / 'reading_index.sqlite',
+                        help="SQLite reading index shared by the scripts; only posts missing from it are read")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of processes used to parse posts that are not yet in the index")
+    parser.add_argument('--textfile', type=Path, default=None,
+                        help="write the metrics atomically to this .prom file instead of printing them")
+    parser.add_argument('--serve', type=int, default=None, metavar='PORT',
+                        help="serve the metrics over HTTP on this port, recomputing them on every scrape")
+    args = parser.parse_args()
+    config = loads((repo_root / 'dashboard' / '_data' / 'config.json').read_text())
+    index = ReadingIndex(args.index)
+
+    if args.serve is None:
+        exposition = export(config, index, args.posts_root, args.workers)
+        index.close()
+        if args.textfile is None:
+            print(exposition, end='')
+        else:
+            write_textfile(args.textfile, exposition)
+        return
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = export(config, index, args.posts_root, args.workers).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    print(f"Serving metrics on port {args.serve}")
+    HTTPServer(('', args.serve), MetricsHandler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
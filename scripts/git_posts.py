@@ -0,0 +1,171 @@
+# this module reads posts straight out of the git object store, so no sensor_data worktree or rsync'd copy is needed
+# the tree listing (git ls-tree) is limited to data/<rom>/ paths, and the posts are picked by the timestamp in their
+# file names, before a single blob is read; the chosen blobs are then streamed through one long-lived
+# `git cat-file --batch` process instead of one git process (or one file open) per post
+# daily segment files of compacted posts (<rom>/<day>_<rom>.jsonl) are listed and read alongside the posts
+# paths are reported relative to the data/ folder, like <rom>/<timestamp>_<rom>_<name>.html, which matches the layout
+# of the sensor_data/data folder and the synced dashboard/_posts folder, so readers treat them the same
+
+from pathlib import Path
+from subprocess import PIPE, Popen, check_output
+from typing import IO, Iterator
+
+from posts import POST_SUFFIX, SEGMENT_SUFFIX, Reading, file_time, parse_file
+
+#: The folder of the sensor_data branch holding one subdirectory of posts per sensor ROM
+DATA_FOLDER = 'data'
+
+
+def filter_posts(entries: list[tuple[str, str]], since: str = '', latest: int | None = None) -> list[tuple[str, str]]:
+    """
+    Picks posts and segments by the timestamp in their file names; a segment counts as its day's last second.
+
+    :param entries: (path, blob id) tuples, with paths like <rom>/<timestamp>_<rom>_<name>.html
+    :param since: Only keep files that can hold readings strictly newer than this YYYY-MM-DD-HH-MM-SS string
+    :param latest: If given, only keep this many of the newest files of each sensor
+    :return: The kept (path, blob id) tuples, sorted by path
+    """
+    kept = sorted((path, blob) for path, blob in entries if file_time(path) > since)
+    if latest is None:
+        return kept
+    per_sensor: dict[str, list[tuple[str, str]]] = {}
+    for path, blob in sorted(kept, key=lambda entry: file_time(entry[0])):
+        per_sensor.setdefault(path.split('/')[0], []).append((path, blob))
+    return sorted(entry for sensor_entries in per_sensor.values() for entry in sensor_entries[-latest:] if latest > 0)
+
+
+class GitPostReader:
+    """
+    Reads posts from a commit of a git repository, typically the sensor_data branch, without checking it out.
+
+    The reader keeps one `git cat-file --batch` process running for its lifetime, so use it as a context manager or
+    call close() when done.
+    """
+
+    def __init__(self, repo: Path, ref: str = 'origin/sensor_data') -> None:
+        """
+        Starts the blob reading process.
+
+        :param repo: Path to any working tree or git directory of the repository
+        :param ref: The branch, tag or commit whose posts are read
+        """
+        #: The repository being read
+        self.repo = repo
+        #: The ref being read
+        self.ref = ref
+        self._process = Popen(['git', '-C', str(repo), 'cat-file', '--batch'], stdin=PIPE, stdout=PIPE)
+        self._stdin: IO[bytes] = self._process.stdin  # type: ignore[assignment]
+        self._stdout: IO[bytes] = self._process.stdout  # type: ignore[assignment]
+
+    def __enter__(self) -> 'GitPostReader':
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stops the blob reading process."""
+        if self._process.poll() is None:
+            self._stdin.close()
+            self._process.wait()
+            self._stdout.close()
+
+    def commit_id(self) -> str:
+        """
+        Resolves the ref to the id of the commit it currently points at.
+
+        :return: The full commit id
+        """
+        return check_output(['git', '-C', str(self.repo), 'rev-parse', f'{self.ref}^{{commit}}']).decode().strip()
+
+    def list_posts(self, sensor_ids: list[str] | None = None, since: str = '',
+                   latest: int | None = None) -> list[tuple[str, str]]:
+        """
+        Lists posts from the tree of the ref, without reading any of them.
+
+        :param sensor_ids: Only list posts of these sensor ROM hex strings; None lists every sensor
+        :param since: Only list posts strictly newer than this YYYY-MM-DD-HH-MM-SS string
+        :param latest: If given, only list this many of the newest posts of each sensor
+        :return: (path, blob id) tuples sorted by path, with paths relative to the data folder
+        """
+        if sensor_ids is None:
+            pathspecs = [f'{DATA_FOLDER}/']
+        elif not sensor_ids:
+            return []
+        else:
+            pathspecs = [f'{DATA_FOLDER}/{sensor_id}/' for sensor_id in sensor_ids]
+        listing = check_output(
+            ['git', '-C', str(self.repo), 'ls-tree', '-r', '-z', '--full-tree', self.ref, '--', *pathspecs]
+        )
+        entries = []
+        for line in listing.decode().split('\0'):
+            if not line:
+                continue
+            meta, path = line.split('\t', 1)
+            _, object_type, blob = meta.split()
+            if object_type == 'blob' and path.endswith((POST_SUFFIX, SEGMENT_SUFFIX)):
+                entries.append((path[len(DATA_FOLDER) + 1:], blob))
+        return filter_posts(entries, since, latest)
+
+    def changed_posts(self, since_ref: str) -> list[tuple[str, str]]:
+        """
+        Lists the posts and segments added or modified between another commit and the ref, without reading them.
+
+        :param since_ref: The older commit, such as the branch tip before a push
+        :return: (path, blob id) tuples sorted by path, with paths relative to the data folder
+        """
+        listing = check_output(
+            ['git', '-C', str(self.repo), 'diff-tree', '-r', '-z', '--no-renames', '--diff-filter=AM', since_ref,
+             self.ref, '--', f'{DATA_FOLDER}/']
+        )
+        fields = listing.decode().split('\0')
+        entries = []
+        for meta, path in zip(fields[0::2], fields[1::2]):
+            blob = meta.split()[3]
+            if path.endswith((POST_SUFFIX, SEGMENT_SUFFIX)):
+                entries.append((path[len(DATA_FOLDER) + 1:], blob))
+        return sorted(entries)
+
+    def _read_object(self, name: str) -> bytes | None:
+        # asks the cat-file process for one object, by id or by <ref>:<path>; None if git reports it missing
+        self._stdin.write(f'{name}\n'.encode())
+        self._stdin.flush()
+        header = self._stdout.readline().split()
+        if header[-1:] == [b'missing']:
+            return None
+        if len(header) != 3:
+            raise RuntimeError(f"git cat-file could not read object {name}: {b' '.join(header).decode()}")
+        contents = self._stdout.read(int(header[2]))
+        self._stdout.read(1)  # every object is followed by a newline
+        return contents
+
+    def read_blob(self, blob: str) -> bytes:
+        """
+        Reads the full contents of one blob through the long-lived cat-file process.
+
+        :param blob: The blob id, as listed by list_posts
+        :return: The blob contents
+        """
+        contents = self._read_object(blob)
+        if contents is None:
+            raise RuntimeError(f"git cat-file could not find object {blob}")
+        return contents
+
+    def read_path(self, path: str) -> bytes | None:
+        """
+        Reads a file from the tree of the ref through the long-lived cat-file process.
+
+        :param path: The file path from the root of the tree, like latest/2887bb81e3813ccd.json
+        :return: The file contents, or None if there is no such file
+        """
+        return self._read_object(f'{self.ref}:{path}')
+
+    def read_posts(self, entries: list[tuple[str, str]]) -> Iterator[tuple[str, list[Reading] | None]]:
+        """
+        Reads and parses the given posts and segments.
+
+        :param entries: (path, blob id) tuples, as returned by list_posts
+        :return: An iterator of (path, readings) tuples, where the readings are None if the file is malformed
+        """
+        for path, blob in entries:
+            yield path, parse_file(path, self.read_blob(blob))
@@ -0,0 +1,84 @@
+# this module keeps the weekly history as an append-only log, history.jsonl at the root of the repo, with one line per
+# history entry like {"date": "2026-03-01", "averages": {"<nice name>": <average F>, ...}}
+# appending an entry writes one line to the end of the log and never rewrites what is already there, so the file and
+# its git diffs only grow by one line a week; if an entry for the same date is appended again, the later line wins
+# the dashboard does not read the log, it reads dashboard/_data/history.json, a compact view generated from the log
+# before each page build, holding the entries newest first, so the page lists them without sorting or reversing
+# the view is a build artifact and is not committed
+# run this file directly to regenerate the view from the log:
+#   python scripts/history_log.py
+
+from argparse import ArgumentParser
+from json import dumps, loads
+from os import replace
+from pathlib import Path
+
+this_file_path = Path(__file__).resolve()
+repo_root = this_file_path.parent.parent
+
+#: The default location of the append-only history log
+LOG_FILE = repo_root / 'history.jsonl'
+
+#: The default location of the dashboard's view of the history
+VIEW_FILE = repo_root / 'dashboard' / '_data' / 'history.json'
+
+#: The number of decimal places kept in the view; the dashboard shows one
+VIEW_DECIMALS = 2
+
+
+def append_entry(log_file: Path, date: str, averages: dict[str, float]) -> None:
+    """
+    Appends one history entry to the end of the log.
+
+    :param log_file: The history log
+    :param date: The YYYY-MM-DD date of the entry
+    :param averages: The average temperature of each sensor, keyed by its nice name
+    """
+    with open(log_file, 'a') as f:
+        f.write(dumps({'date': date, 'averages': averages}) + '\n')
+
+
+def read_log(log_file: Path) -> dict[str, dict[str, float]]:
+    """
+    Reads every entry of the log, where a later entry for a date replaces an earlier one.
+
+    :param log_file: The history log
+    :return: The averages of each entry, keyed by date
+    """
+    entries = {}
+    if log_file.exists():
+        for line in log_file.read_text().splitlines():
+            if line.strip():
+                entry = loads(line)
+                entries[entry['date']] = entry['averages']
+    return entries
+
+
+def write_view(entries: dict[str, dict[str, float]], view_file: Path) -> None:
+    """
+    Replaces the dashboard's view of the history atomically, as a compact list of entries, newest first.
+
+    :param entries: The averages of each entry, keyed by date
+    :param view_file: The view file to write
+    """
+    view = [
+        {'date': date, 'averages': {name: round(value, VIEW_DECIMALS) for name, value in sorted(entries[date].items())}}
+        for date in sorted(entries, reverse=True)
+    ]
+    partial = view_file.with_name(view_file.name + '.partial')
+    partial.write_text(dumps(view, separators=(',', ':')))
+    replace(partial, view_file)
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Regenerate the dashboard's history view from the append-only history log")
+    parser.add_argument('--log', type=Path, default=LOG_FILE, help="the append-only history log to read")
+    parser.add_argument('--view', type=Path, default=VIEW_FILE, help="the view file read by the dashboard")
+    args = parser.parse_args()
+    entries = read_log(args.log)
+    write_view(entries, args.view)
+    print(f"{args.view} regenerated with {len(entries)} entries")
+
+
+if __name__ == "__main__":
+    main()
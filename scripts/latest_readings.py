@@ -0,0 +1,179 @@
+# this module maintains latest/<rom>.json on the sensor_data branch, a ring of the most recent readings of each sensor,
+# so that the checks and the dashboard read one small file per sensor instead of listing and sorting posts
+# each file looks like {"sensor_id": "<rom>", "readings": [{"measurement_time": ..., "temperature": ...,
+# "sensor_name": ...}, ...]}, newest first, holding at most LATEST_COUNT readings
+# the rings are updated from the posts added by each push to sensor_data, so the work per update only depends on the
+# number of new posts, never on the size of the history
+# latest/source.txt records the sensor_data commit the rings were last brought up to, so an update reads the posts added
+# by every commit since then, however many pushes arrived in between
+# run this file directly in a clone of sensor_data to update the rings in its latest/ folder, or with --rebuild to
+# rebuild them from the newest posts of every sensor:
+#   python main/scripts/latest_readings.py sensor_data
+
+from argparse import ArgumentParser
+from json import dumps, loads
+from os import replace
+from pathlib import Path
+from typing import Iterable
+
+from git_posts import GitPostReader
+from posts import Reading
+
+#: The folder of the sensor_data branch holding the ring files
+LATEST_FOLDER = 'latest'
+
+#: The file in the latest folder recording the commit the rings are up to date with; not JSON, so Jekyll skips it
+SOURCE_FILE = 'source.txt'
+
+#: The most readings kept per sensor; the dashboard plots this many, and the checks only need the first few
+LATEST_COUNT = 100
+
+
+def parse_latest(contents: bytes) -> list[Reading]:
+    """
+    Parses a ring file.
+
+    :param contents: The contents of a latest/<rom>.json file
+    :return: The readings, newest first, or an empty list if the file is malformed
+    """
+    try:
+        data = loads(contents)
+        return [
+            Reading(data['sensor_id'], r['sensor_name'], float(r['temperature']), r['measurement_time'])
+            for r in data['readings']
+        ]
+    except (ValueError, KeyError, TypeError):
+        return []
+
+
+def read_latest(latest_root: Path, sensor_id: str) -> list[Reading]:
+    """
+    Reads the ring of one sensor from a folder.
+
+    :param latest_root: The folder holding the ring files
+    :param sensor_id: The sensor ROM hex string
+    :return: The readings, newest first, or an empty list if the sensor has no ring yet
+    """
+    ring_file = latest_root / f"{sensor_id}.json"
+    return parse_latest(ring_file.read_bytes()) if ring_file.exists() else []
+
+
+def read_latest_git(reader: GitPostReader, sensor_id: str) -> list[Reading]:
+    """
+    Reads the ring of one sensor from the git objects of the sensor_data branch.
+
+    :param reader: An open reader on the sensor_data branch
+    :param sensor_id: The sensor ROM hex string
+    :return: The readings, newest first, or an empty list if the sensor has no ring yet
+    """
+    contents = reader.read_path(f"{LATEST_FOLDER}/{sensor_id}.json")
+    return [] if contents is None else parse_latest(contents)
+
+
+def read_rings(
+    sensor_ids: list[str], latest_root: Path, reader: GitPostReader | None = None
+) -> dict[str, list[Reading]]:
+    """
+    Reads the rings of several sensors, one small file each.
+
+    :param sensor_ids: The sensor ROM hex strings
+    :param latest_root: The folder holding the ring files, used when no reader is given
+    :param reader: An open reader on the sensor_data branch, to read the rings from the git objects instead
+    :return: The readings of each sensor, newest first, keyed by sensor ROM hex string
+    """
+    if reader is None:
+        return {sensor_id: read_latest(latest_root, sensor_id) for sensor_id in sensor_ids}
+    return {sensor_id: read_latest_git(reader, sensor_id) for sensor_id in sensor_ids}
+
+
+def add_readings(ring: list[Reading], readings: Iterable[Reading], count: int = LATEST_COUNT) -> list[Reading]:
+    """
+    Adds readings to a ring, keeping only the newest ones.  A reading already in the ring is replaced, not repeated.
+
+    :param ring: The current readings, newest first
+    :param readings: The readings to add, in any order
+    :param count: The most readings to keep
+    :return: The new ring, newest first
+    """
+    by_time = {reading.measurement_time: reading for reading in ring}
+    by_time.update((reading.measurement_time, reading) for reading in readings)
+    return [by_time[measurement_time] for measurement_time in sorted(by_time, reverse=True)[:count]]
+
+
+def write_latest(latest_root: Path, sensor_id: str, ring: list[Reading]) -> None:
+    """
+    Replaces the ring file of one sensor atomically.
+
+    :param latest_root: The folder holding the ring files
+    :param sensor_id: The sensor ROM hex string
+    :param ring: The readings, newest first
+    """
+    data = {
+        'sensor_id': sensor_id,
+        'readings': [
+            {'measurement_time': r.measurement_time, 'temperature': r.temperature, 'sensor_name': r.sensor_name}
+            for r in ring
+        ],
+    }
+    latest_root.mkdir(parents=True, exist_ok=True)
+    partial = latest_root / f"{sensor_id}.json.partial"
+    partial.write_text(dumps(data, indent=1))
+    replace(partial, latest_root / f"{sensor_id}.json")
+
+
+def update_latest(latest_root: Path, readings: Iterable[Reading], count: int = LATEST_COUNT) -> list[str]:
+    """
+    Folds new readings into the ring files, touching only the sensors that have new readings.
+
+    :param latest_root: The folder holding the ring files
+    :param readings: The new readings, in any order
+    :param count: The most readings to keep per sensor
+    :return: The sensor ROM hex strings whose rings changed
+    """
+    per_sensor: dict[str, list[Reading]] = {}
+    for reading in readings:
+        per_sensor.setdefault(reading.sensor_id, []).append(reading)
+    changed = []
+    for sensor_id, new_readings in sorted(per_sensor.items()):
+        ring = read_latest(latest_root, sensor_id)
+        updated = add_readings(ring, new_readings, count)
+        if updated != ring:
+            write_latest(latest_root, sensor_id, updated)
+            changed.append(sensor_id)
+    return changed
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Update the latest/<rom>.json reading rings in a clone of sensor_data")
+    parser.add_argument('sensor_data', type=Path, help="path to a clone of the sensor_data branch")
+    parser.add_argument('--ref', default='HEAD', help="the commit whose posts are read")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="rebuild the rings from the newest posts, not just the posts added since the last update")
+    parser.add_argument('--count', type=int, default=LATEST_COUNT, help="the most readings kept per sensor")
+    args = parser.parse_args()
+    latest_root = args.sensor_data / LATEST_FOLDER
+    source_file = latest_root / SOURCE_FILE
+    rebuild = args.rebuild or not source_file.exists()
+    with GitPostReader(args.sensor_data, args.ref) as reader:
+        if rebuild:
+            # rebuilding only reads the newest files of each sensor; a segment holds a whole day of readings
+            entries = reader.list_posts(latest=args.count)
+        else:
+            entries = reader.changed_posts(source_file.read_text().strip())
+        new_readings = []
+        for path, readings in reader.read_posts(entries):
+            if readings is None:
+                print(f"Bad sensor data in file {args.ref}:{path}")
+                continue
+            new_readings.extend(readings)
+        source = reader.commit_id()
+    if rebuild:
+        for ring_file in latest_root.glob('*.json'):
+            ring_file.unlink()
+    changed = update_latest(latest_root, new_readings, args.count)
+    source_file.write_text(f"{source}\n")
+    print(f"Read {len(entries)} file(s), updated the latest readings of {len(changed)} sensor(s) up to {source}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# this file will move posts and segments from the flat <rom>/ folders into the <rom>/<YYYY>/<MM>/<DD>/ day partitions
+# it only needs to be run once on the sensor_data branch, but it is safe to run again: files already in a partition are
+# never touched, and a flat file whose partitioned copy already exists is merged into it by measurement time, keeping
+# the partitioned reading where both hold the same time; a file that cannot be read, or whose name does not start with
+# a measurement time, is left in place and reported
+
+from argparse import ArgumentParser
+from pathlib import Path
+
+from compact_posts import write_segment
+from posts import POST_SUFFIX, SEGMENT_SUFFIX, file_time, is_measurement_time, partition_folder, read_file
+
+
+def merge_into(flat: Path, target: Path) -> bool:
+    """
+    Merges a flat file into the partitioned file of the same name, then deletes the flat file.  Two posts of the same
+    name hold the same measurement time, so only two segments need their readings merged.
+
+    :param flat: The file sitting directly in a sensor folder
+    :param target: The file of the same name in its day partition
+    :return: True if the flat file was merged, False if either file cannot be read, which leaves both in place
+    """
+    flat_readings = read_file(flat)
+    target_readings = read_file(target)
+    if flat_readings is None or target_readings is None:
+        return False
+    if target.suffix == SEGMENT_SUFFIX:
+        readings = {reading.measurement_time: reading for reading in flat_readings + target_readings}
+        if len(readings) > len(target_readings):
+            write_segment(target, readings)
+    flat.unlink()
+    return True
+
+
+def migrate(data_root: Path) -> int:
+    """
+    Moves every file sitting directly in a sensor folder into its day partition, by the measurement time its name
+    starts with.
+
+    :param data_root: The folder holding one subdirectory per sensor ROM
+    :return: The number of files moved or merged
+    """
+    num_moved = 0
+    for sensor_folder in sorted(path for path in data_root.iterdir() if path.is_dir()):
+        for post in sorted(sensor_folder.iterdir()):
+            if not post.is_file() or post.suffix not in (POST_SUFFIX, SEGMENT_SUFFIX):
+                continue
+            name_time = file_time(post.name)
+            if not is_measurement_time(name_time):
+                print(f"Not moving {post}, its name does not start with a measurement time")
+                continue
+            target_folder = data_root / partition_folder(sensor_folder.name, name_time)
+            target = target_folder / post.name
+            if target.exists():
+                if merge_into(post, target):
+                    num_moved += 1
+                else:
+                    print(f"Not moving {post}, {target} already exists and one of them is malformed")
+                continue
+            target_folder.mkdir(parents=True, exist_ok=True)
+            post.rename(target)
+            num_moved += 1
+    return num_moved
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Move flat sensor posts into <rom>/<YYYY>/<MM>/<DD>/ day partitions")
+    parser.add_argument('data_root', type=Path, help="path to the sensor_data/data folder in a standalone clone")
+    args = parser.parse_args()
+    num_files_moved = migrate(args.data_root)
+    if num_files_moved > 0:
+        print(f"{num_files_moved} file(s) moved or merged, "
+              "next `git add -A`, `git commit -m MSG` and `git push origin sensor_data")
+    else:
+        print("No files needed moving, nothing to do")
@@ -0,0 +1,250 @@
+# this module is the single parser for the post files the sensors push to the sensor_data branch
+# every post is a tiny YAML front matter block with exactly four keys and an empty body, like:
+#   ---
+#   sensor_id: 2887bb81e3813ccd
+#   sensor_name: P_Garage_Freezer
+#   temperature: -13.5
+#   measurement_time: 2026-02-24-10-30-02
+#   ---
+#   {}
+# only the header bytes are read, and the four keys are found by searching the raw bytes for their line prefixes
+# older posts may have been compacted into one segment file per sensor per day, named <YYYY-MM-DD>_<rom>.jsonl, which
+# holds the same four keys as one JSON object per line, so the readers here accept both kinds of file
+# files are partitioned by day into <rom>/<YYYY>/<MM>/<DD>/ folders, so readers can skip whole years, months and days
+# outside of the time window they need before listing anything; files still sitting directly in the <rom>/ folder, from
+# before the partitioned layout, are read as well
+
+from datetime import datetime
+from heapq import merge
+from json import loads
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+#: The most bytes read from the top of a post; the header is ~150 bytes, so anything without a closing --- by here
+#: is not a post the sensors wrote
+HEADER_LIMIT = 1024
+
+#: The format of measurement times, in posts, segments and file names
+TIME_FORMAT = '%Y-%m-%d-%H-%M-%S'
+
+#: The file suffix of a single reading post
+POST_SUFFIX = '.html'
+
+#: The file suffix of a daily segment of compacted readings
+SEGMENT_SUFFIX = '.jsonl'
+
+_KEYS = (b'\nsensor_id:', b'\nsensor_name:', b'\ntemperature:', b'\nmeasurement_time:')
+
+
+class Reading(NamedTuple):
+    """A single sensor reading, as posted by a sensor box."""
+
+    #: The sensor ROM hex string, like 2887bb81e3813ccd
+    sensor_id: str
+    #: The short sensor name the box had at the time of posting
+    sensor_name: str
+    #: The temperature, in degrees Fahrenheit
+    temperature: float
+    #: The UTC measurement time, like 2026-02-24-10-30-02, which sorts chronologically as plain text
+    measurement_time: str
+
+
+def parse_header(header: bytes) -> Reading | None:
+    """
+    Parses the front matter at the start of a post.  Each key must start its own line, so a sensor name containing
+    the word "temperature" is never mistaken for the temperature itself.
+
+    :param header: The first bytes of a post, which must include the closing --- line
+    :return: The parsed reading, or None if the header is malformed or missing a key
+    """
+    if not header.startswith(b'---'):
+        return None
+    end = header.find(b'\n---', 3)
+    if end < 0:
+        return None
+    values = []
+    for key in _KEYS:
+        start = header.find(key, 3, end)
+        if start < 0:
+            return None
+        start += len(key)
+        stop = header.find(b'\n', start, end + 1)
+        values.append(header[start:stop].strip())
+    sensor_id, sensor_name, temperature, measurement_time = values
+    try:
+        return Reading(sensor_id.decode(), sensor_name.decode(), float(temperature), measurement_time.decode())
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+def read_post(post: Path) -> Reading | None:
+    """
+    Reads and parses a single post file, reading at most HEADER_LIMIT bytes of it.
+
+    :param post: Path to the post file
+    :return: The parsed reading, or None if the post is malformed
+    """
+    with open(post, 'rb') as f:
+        return parse_header(f.read(HEADER_LIMIT))
+
+
+def parse_segment(contents: bytes) -> list[Reading] | None:
+    """
+    Parses a daily segment file, which holds one JSON object with the four post keys per line.
+
+    :param contents: The full contents of the segment
+    :return: The readings in file order, or None if any line is malformed
+    """
+    readings = []
+    for line in contents.splitlines():
+        if not line.strip():
+            continue
+        try:
+            data = loads(line)
+            readings.append(Reading(
+                str(data['sensor_id']), str(data['sensor_name']), float(data['temperature']),
+                str(data['measurement_time'])
+            ))
+        except (ValueError, KeyError, TypeError):
+            return None
+    return readings
+
+
+def parse_file(name: str, contents: bytes) -> list[Reading] | None:
+    """
+    Parses either kind of data file, picking the parser by the file suffix.
+
+    :param name: The file name or path, which only needs the right suffix
+    :param contents: The file contents; for a post, just the first HEADER_LIMIT bytes are enough
+    :return: The readings in the file, or None if the file is malformed
+    """
+    if name.endswith(SEGMENT_SUFFIX):
+        return parse_segment(contents)
+    reading = parse_header(contents)
+    return None if reading is None else [reading]
+
+
+def read_file(path: Path) -> list[Reading] | None:
+    """
+    Reads and parses a post or a segment file, reading only the header of a post.
+
+    :param path: Path to the post or segment file
+    :return: The readings in the file, or None if the file is malformed
+    """
+    if path.suffix == SEGMENT_SUFFIX:
+        return parse_segment(path.read_bytes())
+    reading = read_post(path)
+    return None if reading is None else [reading]
+
+
+def file_time(name: str) -> str:
+    """
+    Finds the newest measurement time a post or segment file can hold, from its name alone.
+
+    :param name: The file name or path of a post (YYYY-MM-DD-HH-MM-SS_rom_name.html) or a segment
+                 (YYYY-MM-DD_rom.jsonl)
+    :return: The post time, or the last second of a segment's day, as a YYYY-MM-DD-HH-MM-SS string
+    """
+    time_string = name.rsplit('/', 1)[-1].split('_')[0]
+    return f"{time_string}-23-59-59" if name.endswith(SEGMENT_SUFFIX) else time_string
+
+
+def is_measurement_time(time_string: str) -> bool:
+    """
+    Checks whether a string is a valid measurement time, such as the result of file_time on a well named file.
+
+    :param time_string: The string to check
+    :return: True if the string is a YYYY-MM-DD-HH-MM-SS time
+    """
+    try:
+        datetime.strptime(time_string, TIME_FORMAT)
+    except ValueError:
+        return False
+    return True
+
+
+def partition_folder(sensor_id: str, measurement_time: str) -> str:
+    """
+    Finds the day partition a reading belongs in.
+
+    :param sensor_id: The sensor ROM hex string
+    :param measurement_time: The YYYY-MM-DD-HH-MM-SS measurement time, or just the YYYY-MM-DD day
+    :return: The partition folder, relative to the data folder, like <rom>/YYYY/MM/DD
+    """
+    return f"{sensor_id}/{measurement_time[:4]}/{measurement_time[5:7]}/{measurement_time[8:10]}"
+
+
+def _is_data_file(path: Path) -> bool:
+    return path.suffix in (POST_SUFFIX, SEGMENT_SUFFIX) and path.is_file()
+
+
+def _sorted_folders(folder: Path, newest_first: bool = False) -> list[Path]:
+    return sorted((child for child in folder.iterdir() if child.is_dir()), reverse=newest_first)
+
+
+def sensor_folders(data_root: Path, sensor_ids: list[str] | None = None) -> list[Path]:
+    """
+    Finds the sensor folders in the data folder, without looking inside any of them.
+
+    :param data_root: The folder holding one subdirectory per sensor ROM
+    :param sensor_ids: Only return the folders of these sensor ROM hex strings; None returns every sensor folder
+    :return: The sensor folders that exist, sorted by name
+    """
+    if sensor_ids is None:
+        return _sorted_folders(data_root)
+    return [data_root / sensor_id for sensor_id in sorted(sensor_ids) if (data_root / sensor_id).is_dir()]
+
+
+def list_files(data_root: Path, start: str = '', end: str = '9999', sensor_ids: list[str] | None = None) -> list[Path]:
+    """
+    Lists the posts and segments of every sensor in the days from start to end, skipping every year, month and day
+    partition outside of that range without listing it.  Files sitting directly in a sensor folder are filtered by
+    the time in their names, and always listed if their names have no time.
+
+    :param data_root: The folder holding one subdirectory per sensor ROM
+    :param start: The first day to list, as a YYYY-MM-DD(-HH-MM-SS) string; only its day is used
+    :param end: The last day to list, as a YYYY-MM-DD(-HH-MM-SS) string; only its day is used
+    :param sensor_ids: Only list the files of these sensor ROM hex strings; None lists every sensor
+    :return: The files, in no particular order
+    """
+    start_day, end_day = start[:10], end[:10]
+    files = []
+    for sensor_folder in sensor_folders(data_root, sensor_ids):
+        for child in sensor_folder.iterdir():
+            if _is_data_file(child):
+                # a file whose name carries no time is always listed, so no reader can lose track of it
+                name_time = file_time(child.name)
+                if not is_measurement_time(name_time) or start_day <= name_time[:10] <= end_day:
+                    files.append(child)
+                continue
+            if not child.is_dir() or not start_day[:4] <= child.name <= end_day[:4]:
+                continue
+            for month in _sorted_folders(child):
+                if not start_day[:7] <= f"{child.name}-{month.name}" <= end_day[:7]:
+                    continue
+                for day in _sorted_folders(month):
+                    if start_day <= f"{child.name}-{month.name}-{day.name}" <= end_day:
+                        files.extend(post for post in day.iterdir() if _is_data_file(post))
+    return files
+
+
+def newest_first(sensor_folder: Path) -> Iterator[Path]:
+    """
+    Walks a sensor's posts and segments from the newest back, opening one day partition at a time, so finding the
+    latest few files only lists the latest day or two.
+
+    :param sensor_folder: The folder holding one sensor's partitions
+    :return: An iterator of files, newest first by the time in their names
+    """
+    def partitioned() -> Iterator[Path]:
+        for year in _sorted_folders(sensor_folder, newest_first=True):
+            for month in _sorted_folders(year, newest_first=True):
+                for day in _sorted_folders(month, newest_first=True):
+                    day_files = [post for post in day.iterdir() if _is_data_file(post)]
+                    yield from sorted(day_files, key=lambda post: file_time(post.name), reverse=True)
+
+    flat = sorted(
+        (child for child in sensor_folder.iterdir() if _is_data_file(child)),
+        key=lambda post: file_time(post.name), reverse=True
+    )
+    return merge(partitioned(), flat, key=lambda post: file_time(post.name), reverse=True)
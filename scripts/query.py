@@ -0,0 +1,148 @@
+# this file answers ad-hoc questions like "what did freezer 04 do between Tuesday and Thursday?" from the columnar
+# reading archive, see reading_archive.py, without walking or parsing any posts
+# each sensor's time column is sorted, so the requested range is found by binary search and only the rows inside it
+# are read out of the memory map; the results are written to stdout as CSV or JSON for piping into other tools
+# sensors are picked by cable number, ROM hex, short name or nice name, or by location, using the sensor config
+# times are UTC, given as YYYY-MM-DD with optional hours, minutes and seconds; --to includes the whole of the last
+# day, hour or minute given
+#   python scripts/query.py --sensor 04 --from 2026-10-13 --to 2026-10-15 --agg hourly
+#   python scripts/query.py --location Pantry --from 2026-10-13-06 --agg summary --format json
+
+from argparse import ArgumentParser, ArgumentTypeError
+from csv import writer
+from json import dumps, loads
+from pathlib import Path
+from re import split
+from sys import stdout
+
+from analytics import ReadingFrame, epoch_to_measurement_time
+from reading_archive import measurement_epoch
+from rollups import TIERS
+
+this_file_path = Path(__file__).resolve()
+repo_root = this_file_path.parent.parent
+
+#: The aggregations that can be asked for: raw readings, a summary per sensor, or the buckets of a rollup tier
+AGGREGATIONS = ('raw', 'summary', *TIERS)
+
+
+def parse_time(text: str, end: bool = False) -> int:
+    """
+    Parses a possibly partial UTC time, like 2026-10-13, 2026-10-13-06 or 2026-10-13T06:30.
+
+    :param text: The time, with any separators between the fields
+    :param end: Fill the missing fields with the end of the period instead of the start
+    :return: The time in epoch seconds
+    """
+    fields = [field for field in split(r'\D+', text) if field]
+    if not 3 <= len(fields) <= 6:
+        raise ArgumentTypeError(f"\"{text}\" is not a time like YYYY-MM-DD or YYYY-MM-DD-HH-MM-SS")
+    fields += (['23', '59', '59'] if end else ['00', '00', '00'])[len(fields) - 3:]
+    try:
+        return measurement_epoch('-'.join(f"{int(field):02d}" for field in fields))
+    except ValueError:
+        raise ArgumentTypeError(f"\"{text}\" is not a valid time") from None
+
+
+def select_sensors(config: dict, sensors: list[str], locations: list[str]) -> list[str]:
+    """
+    Finds the sensors being asked about.
+
+    :param config: The contents of dashboard/_data/config.json
+    :param sensors: Cable numbers, ROM hex strings, short names or nice names; case is ignored for names
+    :param locations: Sensor locations, every sensor at which is included
+    :return: The sensor ROM hex strings, in the order asked for; every active sensor if nothing was asked for
+    """
+    entries = {k: v for k, v in config['sensors'].items() if not k.startswith('readme')}
+    if not sensors and not locations:
+        return [sensor['hex'] for sensor in entries.values() if sensor.get('active', False)]
+    selected = []
+    for wanted in sensors:
+        matches = [
+            sensor['hex'] for cable_num, sensor in entries.items()
+            if wanted in (cable_num, sensor['hex']) or wanted.lower() in (
+                sensor.get('short_name', '').lower(), sensor.get('nice_name', '').lower()
+            )
+        ]
+        if not matches:
+            raise ValueError(f"No sensor matches \"{wanted}\"")
+        selected.extend(matches)
+    for location in locations:
+        matches = [sensor['hex'] for sensor in entries.values() if sensor.get('sensor_location') == location]
+        if not matches:
+            raise ValueError(f"No sensor is at location \"{location}\"")
+        selected.extend(matches)
+    return list(dict.fromkeys(selected))
+
+
+def query_rows(frame: ReadingFrame, aggregation: str) -> tuple[list[str], list[list]]:
+    """
+    Lays out the readings of a frame as a table.
+
+    :param frame: The readings in the requested range
+    :param aggregation: One of AGGREGATIONS
+    :return: A tuple of the column names and the rows
+    """
+    if aggregation == 'raw':
+        times = [epoch_to_measurement_time(epoch) for epoch in frame.epoch.tolist()]
+        sensor_ids = [frame.sensor_ids[i] for i in frame.sensor_index.tolist()]
+        return ['sensor_id', 'measurement_time', 'temperature'], [
+            [sensor_id, measurement_time, round(temperature, 3)]
+            for sensor_id, measurement_time, temperature in zip(sensor_ids, times, frame.temperature.tolist())
+        ]
+    columns = ['count', 'min', 'max', 'mean', 'p95']
+    if aggregation == 'summary':
+        stats = frame.summary(quantiles=(0.95,))
+        sensor_ids = [frame.sensor_ids[i] for i in stats.keys.tolist()]
+        starts: list[str | None] = [None] * len(sensor_ids)
+    else:
+        period, offset = TIERS[aggregation]
+        resampled = frame.resample(period, quantiles=(0.95,), offset_seconds=offset)
+        stats = resampled.stats
+        sensor_ids = resampled.sensor_ids
+        starts = [epoch_to_measurement_time(start) for start in resampled.bucket_start.tolist()]
+    values = zip(
+        sensor_ids, starts, stats.num_readings.tolist(), stats.minimum.tolist(), stats.maximum.tolist(),
+        stats.mean.tolist(), stats.quantiles[0].tolist()
+    )
+    rows = [
+        [sensor_id, *([] if start is None else [start]), count, *(round(v, 3) for v in (low, high, mean, p95))]
+        for sensor_id, start, count, low, high, mean, p95 in values
+    ]
+    return ['sensor_id', *([] if aggregation == 'summary' else ['start']), *columns], rows
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Query sensor readings over a time range from the columnar reading archive")
+    parser.add_argument('--sensor', action='append', default=[],
+                        help="cable number, ROM hex, short name or nice name of a sensor; can be given more than once")
+    parser.add_argument('--location', action='append', default=[],
+                        help="include every sensor at this location; can be given more than once")
+    parser.add_argument('--from', dest='start', type=parse_time, default=0,
+                        help="first UTC time to include, like 2026-10-13 or 2026-10-13-06-30")
+    parser.add_argument('--to', dest='end', type=lambda text: parse_time(text, end=True), default=2 ** 62 - 1,
+                        help="last UTC time to include; a date includes the whole day")
+    parser.add_argument('--agg', choices=AGGREGATIONS, default='raw',
+                        help="raw readings, one summary row per sensor, or hourly, daily or weekly buckets")
+    parser.add_argument('--format', choices=('csv', 'json'), default='csv', help="output format")
+    parser.add_argument('--archive', type=Path, default=repo_root / 'archive',
+                        help="folder holding the archive column files, as built by reading_archive.py")
+    args = parser.parse_args()
+
+    config = loads((repo_root / 'dashboard' / '_data' / 'config.json').read_text())
+    try:
+        sensor_ids = select_sensors(config, args.sensor, args.location)
+    except ValueError as e:
+        parser.error(str(e))
+    frame = ReadingFrame.from_archive(args.archive, sensor_ids, args.start, args.end + 1)
+    columns, rows = query_rows(frame, args.agg)
+    if args.format == 'json':
+        print(dumps([dict(zip(columns, row)) for row in rows]))
+    else:
+        csv_writer = writer(stdout, lineterminator='\n')
+        csv_writer.writerow(columns)
+        csv_writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# this module stores sensor readings as fixed width binary columns, one pair of column files per sensor:
+#  - <rom>.epoch holds the measurement times as int64 seconds since the epoch (UTC)
+#  - <rom>.temp holds the temperatures as float32 degrees Fahrenheit
+# row N of one column lines up with row N of the other, and rows are kept in time order so ranges can be bisected
+# readers map the columns with mmap and get memoryview (or NumPy) views of them without copying anything
+# for storing away or sending elsewhere, the columns of a sensor can also be packed into one <rom>.tsc file with the
+# compressed series codec, which takes about two bytes per reading instead of 12, see series_codec.py
+# the posts are cleaned up after a few days, so the archive is kept in the repo as packed files, one per sensor per UTC
+# month in archive_months/<rom>/<YYYY-MM>.tsc; the weekly workflow merges them into a fresh archive, adds the posts,
+# and writes back only the months that changed, so the repo grows by about a month of packed readings at a time
+# run this file directly to build or extend an archive from a posts folder, optionally packing it too:
+#   python scripts/reading_archive.py sensor_data/data archive --months archive_months --pack packed
+
+from argparse import ArgumentParser
+from array import array
+from bisect import bisect_left
+from datetime import datetime, UTC
+from mmap import mmap, ACCESS_READ
+from pathlib import Path
+from sys import byteorder
+
+from reading_index import ReadingIndex
+from series_codec import decode, encode
+
+try:
+    from numpy import frombuffer
+    HAVE_NUMPY = True
+except ImportError:  # numpy is optional, the memoryview columns work without it
+    HAVE_NUMPY = False
+
+#: The suffix of a packed sensor series file
+PACKED_SUFFIX = '.tsc'
+
+# the columns are written in native byte order by array.tofile, and only little-endian machines are expected here
+assert byteorder == 'little'
+
+
+class SensorArchive:
+    """
+    A read-only, memory-mapped view of the archived readings for one sensor.  Use it as a context manager, or call
+    close() when done, since the views must be released before the underlying maps can be closed.
+    """
+
+    def __init__(self, archive_root: Path, sensor_id: str) -> None:
+        """
+        Maps both column files for the given sensor.  A sensor with no archive yet just has empty columns.
+
+        :param archive_root: The folder holding the column files
+        :param sensor_id: The sensor ROM hex string
+        """
+        self._maps: list[mmap] = []
+        #: The measurement times, as a memoryview of int64 epoch seconds
+        self.epochs = self._map_column(archive_root / f"{sensor_id}.epoch").cast('q')
+        #: The temperatures, as a memoryview of float32 degrees Fahrenheit
+        self.temperatures = self._map_column(archive_root / f"{sensor_id}.temp").cast('f')
+        if len(self.epochs) != len(self.temperatures):
+            self.close()
+            raise ValueError(f"Archive columns for sensor {sensor_id} have different lengths")
+
+    def _map_column(self, column_file: Path) -> memoryview:
+        # the bytes of a column file, which the caller casts to the column's item type
+        if not column_file.exists() or column_file.stat().st_size == 0:
+            return memoryview(b'')  # mmap refuses to map an empty file
+        with open(column_file, 'rb') as f:
+            mapped = mmap(f.fileno(), 0, access=ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped)
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    def __enter__(self) -> 'SensorArchive':
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Releases the column views and closes the underlying maps."""
+        self.epochs.release()
+        self.temperatures.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+    def window(self, start_epoch: int, end_epoch: int) -> tuple['memoryview[int]', 'memoryview[float]']:
+        """
+        Finds the rows measured in [start_epoch, end_epoch) by bisecting the time column.
+
+        :param start_epoch: The first epoch second to include
+        :param end_epoch: The first epoch second to exclude
+        :return: A tuple of (epochs, temperatures) memoryview slices, which share memory with the map and so must be
+                 released (or dropped) before this archive is closed
+        """
+        start = bisect_left(self.epochs, start_epoch)
+        end = bisect_left(self.epochs, end_epoch, lo=start)
+        return self.epochs[start:end], self.temperatures[start:end]
+
+    def numpy_columns(self):  # type: ignore[no-untyped-def]
+        """
+        Wraps both columns as NumPy arrays that share memory with the map.  NumPy must be installed to call this.
+
+        :return: A tuple of (epochs, temperatures) NumPy arrays, int64 and float32
+        """
+        if not HAVE_NUMPY:
+            raise RuntimeError("NumPy is not installed; use the epochs and temperatures memoryviews instead")
+        return frombuffer(self.epochs, dtype='<i8'), frombuffer(self.temperatures, dtype='<f4')
+
+
+def measurement_epoch(measurement_time: str) -> int:
+    """
+    Converts a posted measurement time string into epoch seconds.
+
+    :param measurement_time: A UTC time string like 2026-02-24-10-30-02
+    :return: Integer seconds since the epoch
+    """
+    return int(datetime.strptime(measurement_time, '%Y-%m-%d-%H-%M-%S').replace(tzinfo=UTC).timestamp())
+
+
+def append_readings(archive_root: Path, sensor_id: str, readings: list[tuple[int, float]]) -> int:
+    """
+    Adds readings to one sensor's columns, keeping them in time order.  Readings newer than the last archived one are
+    appended to the end, and a reading that was posted late, measured before it, is merged into place by rewriting the
+    columns from that point on, which is only the last few days.  Readings at an already archived time are skipped,
+    which makes repeated conversions of the same posts harmless.
+
+    :param archive_root: The folder holding the column files
+    :param sensor_id: The sensor ROM hex string
+    :param readings: A list of (epoch seconds, temperature F) tuples, in any order
+    :return: The number of readings that were added
+    """
+    archive_root.mkdir(parents=True, exist_ok=True)
+    with SensorArchive(archive_root, sensor_id) as existing:
+        new = []
+        for epoch, temperature in sorted(dict(readings).items()):
+            position = bisect_left(existing.epochs, epoch)
+            if position == len(existing) or existing.epochs[position] != epoch:
+                new.append((epoch, temperature))
+        if not new:
+            return 0
+        first = bisect_left(existing.epochs, new[0][0])
+        kept = list(zip(existing.epochs[first:].tolist(), existing.temperatures[first:].tolist()))
+    merged = sorted(kept + new)
+    epochs = array('q', [epoch for epoch, _ in merged])
+    temperatures = array('f', [temperature for _, temperature in merged])
+    for column_file, values in ((archive_root / f"{sensor_id}.epoch", epochs),
+                                (archive_root / f"{sensor_id}.temp", temperatures)):
+        with open(column_file, 'r+b' if column_file.exists() else 'wb') as f:
+            f.seek(first * values.itemsize)
+            values.tofile(f)
+            f.truncate()
+    return len(new)
+
+
+def pack_sensor(archive_root: Path, sensor_id: str) -> bytes:
+    """
+    Compresses every archived reading of one sensor, to the hundredth of a degree.
+
+    :param archive_root: The folder holding the column files
+    :param sensor_id: The sensor ROM hex string
+    :return: The encoded series, which unpack_sensor can append to another archive
+    """
+    with SensorArchive(archive_root, sensor_id) as archive:
+        return encode(list(archive.epochs), list(archive.temperatures))
+
+
+def unpack_sensor(archive_root: Path, sensor_id: str, payload: bytes) -> int:
+    """
+    Adds the readings of an encoded series to one sensor's columns, skipping any already archived.
+
+    :param archive_root: The folder holding the column files
+    :param sensor_id: The sensor ROM hex string
+    :param payload: The encoded series, as made by pack_sensor
+    :return: The number of readings that were added
+    """
+    epochs, temperatures = decode(payload)
+    return append_readings(archive_root, sensor_id, list(zip(epochs, temperatures)))
+
+
+def load_months(months_root: Path, archive_root: Path) -> int:
+    """
+    Merges every packed month kept in the repo into the archive.
+
+    :param months_root: The folder holding a <rom>/<YYYY-MM>.tsc file per sensor per month
+    :param archive_root: The folder holding the column files
+    :return: The number of readings that were added
+    """
+    return sum(
+        unpack_sensor(archive_root, month_file.parent.name, month_file.read_bytes())
+        for month_file in sorted(months_root.glob(f"*/*{PACKED_SUFFIX}"))
+    )
+
+
+def save_months(archive_root: Path, months_root: Path) -> list[str]:
+    """
+    Packs the archive into one file per sensor per UTC month, writing only the files whose contents changed, so
+    that keeping them in the repo only adds the months that new readings fall into.
+
+    :param archive_root: The folder holding the column files
+    :param months_root: The folder to hold a <rom>/<YYYY-MM>.tsc file per sensor per month
+    :return: The paths of the files written, relative to months_root
+    """
+    written = []
+    for epoch_file in sorted(archive_root.glob('*.epoch')):
+        sensor_id = epoch_file.stem
+        with SensorArchive(archive_root, sensor_id) as archive:
+            if not len(archive):
+                continue
+            month = datetime.fromtimestamp(archive.epochs[0], UTC).replace(day=1, hour=0, minute=0, second=0)
+            payloads = {}
+            while int(month.timestamp()) <= archive.epochs[-1]:
+                after = month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+                epochs, temperatures = archive.window(int(month.timestamp()), int(after.timestamp()))
+                if len(epochs):
+                    payloads[month.strftime('%Y-%m')] = encode(list(epochs), list(temperatures))
+                epochs.release()
+                temperatures.release()
+                month = after
+        for name, payload in payloads.items():
+            month_file = months_root / sensor_id / f"{name}{PACKED_SUFFIX}"
+            if not month_file.exists() or month_file.read_bytes() != payload:
+                month_file.parent.mkdir(parents=True, exist_ok=True)
+                month_file.write_bytes(payload)
+                written.append(month_file.relative_to(months_root).as_posix())
+    return written
+
+
+def build_archive(posts_root: Path, archive_root: Path, index: ReadingIndex) -> dict[str, int]:
+    """
+    Converts the posts in a posts folder into the columnar archive, adding every reading that is not archived yet.
+
+    :param posts_root: The folder holding one subdirectory of posts per sensor ROM
+    :param archive_root: The folder holding the column files
+    :param index: The reading index to ingest the posts through
+    :return: A dict keyed by sensor ROM hex string, with the number of readings added as values
+    """
+    index.ingest(posts_root)
+    per_sensor: dict[str, list[tuple[int, float]]] = {}
+    for sensor_id, measurement_time, temperature in index.readings_since(''):
+        per_sensor.setdefault(sensor_id, []).append((measurement_epoch(measurement_time), temperature))
+    return {
+        sensor_id: append_readings(archive_root, sensor_id, readings) for sensor_id, readings in per_sensor.items()
+    }
+
+
+if __name__ == "__main__":
+    this_file_path = Path(__file__).resolve()
+    repo_root = this_file_path.parent.parent
+    parser = ArgumentParser(description="Build or extend the columnar reading archive from a posts folder")
+    parser.add_argument('posts_root', type=Path, help="path to the sensor_data/data folder or dashboard/_posts")
+    parser.add_argument('archive_root', type=Path, help="folder to hold the per-sensor column files")
+    parser.add_argument('--index', type=Path, default=repo_root / 'reading_index.sqlite',
+                        help="SQLite reading index shared by the scripts; only posts missing from it are read")
+    parser.add_argument('--months', type=Path, default=None,
+                        help="packed monthly files kept in the repo, merged into the archive first and updated after")
+    parser.add_argument('--pack', type=Path, default=None,
+                        help="also write a compressed <rom>.tsc file per sensor of the archive into this folder")
+    args = parser.parse_args()
+    if args.months is not None:
+        print(f"{load_months(args.months, args.archive_root)} reading(s) added from {args.months}")
+    appended = build_archive(args.posts_root, args.archive_root, ReadingIndex(args.index))
+    for rom, count in sorted(appended.items()):
+        print(f" - {rom}: {count} reading(s) added")
+    print(f"Archive at {args.archive_root} is up to date")
+    if args.months is not None:
+        for path in save_months(args.archive_root, args.months):
+            print(f" - {args.months / path} written")
+    if args.pack is not None:
+        args.pack.mkdir(parents=True, exist_ok=True)
+        for epoch_file in sorted(args.archive_root.glob('*.epoch')):
+            packed = pack_sensor(args.archive_root, epoch_file.stem)
+            (args.pack / f"{epoch_file.stem}{PACKED_SUFFIX}").write_bytes(packed)
+            column_bytes = epoch_file.stat().st_size * 3 // 2  # the temperature column is half the size
+            print(f" - {epoch_file.stem}: packed {column_bytes} column bytes into {len(packed)}")
@@ -0,0 +1,204 @@
+# this module maintains a local SQLite index of the sensor readings posted to the sensor_data branch
+# the scripts in this folder share it, so each post file is opened once, and lookups are indexed queries
+# the index mirrors a posts folder laid out as <rom>/<timestamp>_<rom>_<name>.html, plus any daily segments compacted
+# into <rom>/<day>_<rom>.jsonl, which is true for both the sensor_data/data folder in a standalone clone and the synced
+# dashboard/_posts folder
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Mapping
+from sqlite3 import connect
+
+from posts import Reading, file_time, list_files, newest_first, read_file, sensor_folders
+
+
+#: The layout version of the index database, stored in its user_version; bump this whenever the tables change
+SCHEMA_VERSION = 2
+
+
+class ReadingIndex:
+    """
+    A SQLite database of readings keyed by (sensor_id, measurement_time), with an extra index on measurement_time.
+
+    Measurement times are stored as the same fixed width YYYY-MM-DD-HH-MM-SS strings the sensors post, which sort
+    chronologically as plain text.  Every file that has been ingested is also recorded, with one row per reading it
+    holds, so re-indexing only opens files that are not already in the database, and drops readings once no remaining
+    file holds them.  A reading can be in both a post and the daily segment it was compacted into.
+    """
+
+    def __init__(self, db_path: Path | str = ':memory:') -> None:
+        """
+        Opens (or creates) the index database.
+
+        :param db_path: Path to the SQLite database file, or ':memory:' for a throwaway index
+        """
+        self.connection = connect(db_path)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # the index is only a cache of the posts, so an index in an older layout is simply rebuilt
+            with self.connection:
+                self.connection.execute("DROP TABLE IF EXISTS files")
+                self.connection.execute("DROP TABLE IF EXISTS readings")
+                self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS files (path TEXT NOT NULL, sensor_id TEXT, measurement_time TEXT)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS files_by_path ON files (path)")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS files_by_reading ON files (sensor_id, measurement_time)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS readings ("
+                "sensor_id TEXT NOT NULL, measurement_time TEXT NOT NULL, temperature REAL NOT NULL, "
+                "sensor_name TEXT NOT NULL, PRIMARY KEY (sensor_id, measurement_time))"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS readings_by_time ON readings (measurement_time)"
+            )
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        self.connection.close()
+
+    def ingest(self, posts_root: Path, workers: int = 1, since: str = '', latest: int | None = None,
+               sensor_ids: list[str] | None = None) -> int:
+        """
+        Brings the index up to date with the posts currently in the given folder.  Files already in the index are not
+        opened again, and files that no longer exist (cleaned up by retention) are dropped from the index.
+
+        With more than one worker, the new files are sharded by sensor directory and parsed across a process pool.
+        The shards are merged back in sorted order, so the resulting index does not depend on the worker count.
+
+        The day partitions outside of the requested window are never listed: with since, only days from that day on
+        are looked at, and with latest, each sensor's partitions are walked from the newest back until enough well
+        formed files are found.  Files outside of the window are neither read nor dropped.
+
+        :param posts_root: The folder holding one subdirectory of posts per sensor ROM
+        :param workers: The number of processes to parse new files with
+        :param since: Only look at the day partitions from the day of this YYYY-MM-DD-HH-MM-SS string on
+        :param latest: If given, only look at this many of the newest well formed files of each sensor
+        :param sensor_ids: Only look at the folders of these sensor ROM hex strings; None looks at every sensor
+        :return: The number of new files that were read
+        """
+        if latest is not None:
+            candidates = {
+                sensor_folder.name: (post.relative_to(posts_root).as_posix() for post in newest_first(sensor_folder))
+                for sensor_folder in sensor_folders(posts_root, sensor_ids)
+            }
+            parsed = self._read_newest(candidates, lambda path: read_file(posts_root / path), latest)
+            return self._store(posts_root, [parsed], set())
+        present = {
+            post.relative_to(posts_root).as_posix() for post in list_files(posts_root, since, sensor_ids=sensor_ids)
+        }
+        known = {row[0] for row in self.connection.execute("SELECT DISTINCT path FROM files")}
+        if sensor_ids is not None:
+            known = {path for path in known if path.split('/')[0] in sensor_ids}
+        if since:
+            known = {path for path in known if file_time(path)[:10] >= since[:10]}
+        shards: dict[str, list[str]] = {}
+        for path in sorted(present - known):
+            shards.setdefault(path.split('/')[0], []).append(path)
+        shard_list = [shards[sensor_dir] for sensor_dir in sorted(shards)]
+        if workers > 1 and len(shard_list) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed_shards = list(pool.map(_parse_shard, [posts_root] * len(shard_list), shard_list))
+        else:
+            parsed_shards = [_parse_shard(posts_root, shard) for shard in shard_list]
+        return self._store(posts_root, parsed_shards, known - present)
+
+    def _read_newest(self, candidates: Mapping[str, Iterable[str]], read: Callable[[str], list[Reading] | None],
+                     count: int) -> list[tuple[str, list[Reading] | None]]:
+        # walks each sensor's files newest first until it has count well formed ones, counting files already indexed,
+        # so a malformed newest post never hides the readings before it
+        known = {row[0] for row in self.connection.execute("SELECT DISTINCT path FROM files")}
+        known_good = {
+            row[0] for row in self.connection.execute("SELECT DISTINCT path FROM files WHERE sensor_id IS NOT NULL")
+        }
+        parsed = []
+        for paths in candidates.values():
+            good = 0
+            for path in paths:
+                if good >= count:
+                    break
+                if path in known:
+                    good += path in known_good
+                    continue
+                readings = read(path)
+                parsed.append((path, readings))
+                good += bool(readings)
+        return parsed
+
+    def _store(self, source: Path | str, parsed_shards: list[list[tuple[str, list[Reading] | None]]],
+               removed_paths: set[str]) -> int:
+        # writes newly parsed files and drops removed ones in a single transaction; the new files go in first, so a
+        # reading that moved from a post into a segment in the same ingest is never dropped
+        new_files: list[tuple[str, str | None, str | None]] = []
+        new_readings = []
+        for parsed_shard in parsed_shards:
+            for path, readings in parsed_shard:
+                if readings is None:
+                    print(f"Bad sensor data in file {source}/{path}")
+                    new_files.append((path, None, None))
+                    continue
+                for reading in readings:
+                    new_files.append((path, reading.sensor_id, reading.measurement_time))
+                    new_readings.append(
+                        (reading.sensor_id, reading.measurement_time, reading.temperature, reading.sensor_name)
+                    )
+        removed = [(path,) for path in removed_paths]
+        with self.connection:
+            self.connection.executemany("INSERT INTO files VALUES (?, ?, ?)", new_files)
+            self.connection.executemany("INSERT OR REPLACE INTO readings VALUES (?, ?, ?, ?)", new_readings)
+            removed_keys = [
+                key for (path,) in removed for key in self.connection.execute(
+                    "SELECT sensor_id, measurement_time FROM files WHERE path = ? AND sensor_id IS NOT NULL", (path,)
+                )
+            ]
+            self.connection.executemany("DELETE FROM files WHERE path = ?", removed)
+            self.connection.executemany(
+                "DELETE FROM readings WHERE sensor_id = ?1 AND measurement_time = ?2 AND NOT EXISTS "
+                "(SELECT 1 FROM files WHERE sensor_id = ?1 AND measurement_time = ?2)", removed_keys
+            )
+        return len({path for path, _, _ in new_files})
+
+    def latest(self, sensor_id: str, count: int) -> list[tuple[str, float]]:
+        """
+        Looks up the most recent readings for one sensor.
+
+        :param sensor_id: The sensor ROM hex string
+        :param count: The maximum number of readings to return
+        :return: A list of (measurement_time, temperature) tuples, newest first
+        """
+        return self.connection.execute(
+            "SELECT measurement_time, temperature FROM readings WHERE sensor_id = ? "
+            "ORDER BY measurement_time DESC LIMIT ?", (sensor_id, count)
+        ).fetchall()
+
+    def counts_since(self, measurement_time: str) -> dict[str, int]:
+        """
+        Counts the readings of every sensor strictly newer than the given measurement time.
+
+        :param measurement_time: A YYYY-MM-DD-HH-MM-SS string, or an empty string to count every reading
+        :return: A dict keyed by sensor ROM hex string, with the number of readings as values
+        """
+        return dict(self.connection.execute(
+            "SELECT sensor_id, COUNT(*) FROM readings WHERE measurement_time > ? GROUP BY sensor_id",
+            (measurement_time,)
+        ).fetchall())
+
+    def readings_since(self, measurement_time: str) -> Iterator[tuple[str, str, float]]:
+        """
+        Looks up every reading strictly newer than the given measurement time, across all sensors.  The readings are
+        streamed from the database as they are iterated, rather than gathered into a list up front.
+
+        :param measurement_time: A YYYY-MM-DD-HH-MM-SS string, or an empty string to get every reading
+        :return: An iterator of (sensor_id, measurement_time, temperature) tuples, oldest first
+        """
+        return self.connection.execute(
+            "SELECT sensor_id, measurement_time, temperature FROM readings WHERE measurement_time > ? "
+            "ORDER BY measurement_time, sensor_id", (measurement_time,)
+        )
+
+
+def _parse_shard(posts_root: Path, paths: list[str]) -> list[tuple[str, list[Reading] | None]]:
+    return [(path, read_file(posts_root / path)) for path in paths]
@@ -5,6 +5,8 @@ SENSOR_BRANCH="sensor_data"
 WORKTREE_DIR="sensor_data"
 SOURCE_DIR="$WORKTREE_DIR/data"
 TARGET_DIR="dashboard/_posts"
+LATEST_SOURCE_DIR="$WORKTREE_DIR/latest"
+LATEST_TARGET_DIR="dashboard/_data/latest"
 
 echo "=== Refreshing sensor data ==="
 
@@ -27,4 +29,13 @@ mkdir -p "$TARGET_DIR"
 # Clear old copied posts
 rsync -a --delete "$SOURCE_DIR"/ "$TARGET_DIR"/
 
+# The dashboard and the checks read the latest readings rings
+echo "Syncing latest readings into $LATEST_TARGET_DIR..."
+mkdir -p "$LATEST_TARGET_DIR"
+rsync -a --delete "$LATEST_SOURCE_DIR"/ "$LATEST_TARGET_DIR"/
+
+# The dashboard reads a view of the history log, which is generated rather than committed
+echo "Generating the history view..."
+python3 scripts/history_log.py
+
 echo "Sensor posts refreshed."
@@ -0,0 +1,114 @@
+# this module provides a streaming, bounded memory accumulator for robust temperature statistics
+# the DS18x20 sensors report in steps of 1/16 C, so readings fall on a small set of distinct values, and a histogram of
+# readings quantized to 0.01 F holds every statistic we need exactly, no matter how many readings are added:
+# memory grows with the spread of temperatures a sensor sees, never with the number of readings
+
+from math import ceil, floor
+
+#: The quantization step of the histogram, in degrees F; this is well below the sensor resolution of 0.1125 F
+RESOLUTION = 0.01
+
+#: The fraction of readings trimmed from each end before averaging; with a week of hourly readings (168) this trims 4
+#: from each end, which matches the fixed trim the history averages used before
+TRIM_PROPORTION = 0.025
+
+
+class TemperatureSketch:
+    """
+    A histogram of temperature readings, keyed by the reading in hundredths of a degree F, that can answer trimmed
+    means, medians and percentiles in one pass.  Sketches can be merged, and round trip through JSON, so partial
+    aggregates can be combined across runs and worker processes.
+    """
+
+    def __init__(self) -> None:
+        #: Reading counts keyed by the quantized reading (temperature / RESOLUTION, rounded)
+        self.counts: dict[int, int] = {}
+        #: The total number of readings added
+        self.count = 0
+
+    def add(self, temperature: float) -> None:
+        """
+        Adds one reading to the sketch.
+
+        :param temperature: The temperature reading in degrees F
+        """
+        key = round(temperature / RESOLUTION)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+
+    def merge(self, other: 'TemperatureSketch') -> None:
+        """
+        Adds all the readings from another sketch into this one.
+
+        :param other: The sketch to merge in, which is left unchanged
+        """
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.count += other.count
+
+    def to_json(self) -> dict[str, int]:
+        """
+        Provides a JSON friendly form of the sketch, for saving partial aggregates to a state file.
+
+        :return: A dict of reading counts keyed by the quantized reading as a string
+        """
+        return {str(key): count for key, count in sorted(self.counts.items())}
+
+    @staticmethod
+    def from_json(data: dict[str, int]) -> 'TemperatureSketch':
+        """
+        Rebuilds a sketch from the output of to_json.
+
+        :param data: A dict of reading counts keyed by the quantized reading as a string
+        :return: A new sketch
+        """
+        sketch = TemperatureSketch()
+        for key, count in data.items():
+            sketch.counts[int(key)] = count
+            sketch.count += count
+        return sketch
+
+    def _sorted_runs(self) -> list[tuple[float, int]]:
+        return [(key * RESOLUTION, self.counts[key]) for key in sorted(self.counts)]
+
+    def quantile(self, q: float) -> float:
+        """
+        Finds the reading at the given quantile, using the nearest rank: the smallest reading with at least that
+        fraction of the readings at or below it.
+
+        :param q: The quantile to find, from 0 (minimum) to 1 (maximum)
+        :return: The reading at that quantile, in degrees F
+        """
+        if not self.count:
+            raise ValueError("Cannot take a quantile of an empty sketch")
+        rank = min(max(ceil(q * self.count) - 1, 0), self.count - 1)
+        seen = 0
+        for value, count in self._sorted_runs():
+            seen += count
+            if seen > rank:
+                return value
+        raise AssertionError("unreachable, the counts always add up to self.count")
+
+    def median(self) -> float:
+        """:return: The median reading, in degrees F"""
+        return self.quantile(0.5)
+
+    def trimmed_mean(self, proportion: float = TRIM_PROPORTION) -> float:
+        """
+        Averages the readings after dropping the given fraction of readings from each end, to get rid of outliers.
+
+        :param proportion: The fraction of readings to drop from each end, rounded down to a whole number of readings
+        :return: The trimmed mean reading, in degrees F
+        """
+        if not self.count:
+            raise ValueError("Cannot take the mean of an empty sketch")
+        trim = floor(self.count * proportion)
+        low, high = trim, self.count - trim  # keep the readings ranked in [low, high)
+        total = 0.0
+        seen = 0
+        for value, count in self._sorted_runs():
+            kept = min(seen + count, high) - max(seen, low)
+            if kept > 0:
+                total += value * kept
+            seen += count
+        return total / (high - low)
@@ -0,0 +1,202 @@
+# this module materializes hourly, daily and weekly rollups of every sensor's readings into dashboard/_data/rollups.json
+# raw posts are cleaned up after a few days and history.json only keeps one weekly average, so the rollups are what
+# keeps the shape of the data in between: each tier holds the number of readings, min, max, mean and 95th percentile
+# per bucket
+# rollups are stored as columns per sensor per tier, so a long range question reads a few hundred numbers
+# updates recompute every hourly and daily bucket that the raw readings still in the posts folder fall into, so a
+# reading that was posted late, after newer readings were already rolled up, still lands in its bucket; a bucket is
+# only rewritten when it holds more readings than before, which keeps the complete figures of a day whose first posts
+# were already cleaned up, since every day is rolled up at least once before the cleanup reaches it
+# a week is longer than the posts are kept, so its first days can be cleaned up before its last days are rolled up;
+# weekly buckets are therefore merged from the daily buckets and a sketch of each day's readings, kept in the file
+# until the week of the oldest post still in the folder, rather than recomputed from the raw readings
+# the watermark in the file records the newest reading rolled up
+# run this file directly to bring the rollups up to date with a posts folder:
+#   python scripts/rollups.py sensor_data/data
+
+from argparse import ArgumentParser
+from json import dumps, loads
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from analytics import WEEK_OFFSET, ReadingFrame, epoch_to_measurement_time
+from reading_index import ReadingIndex
+from robust_stats import TemperatureSketch
+
+#: The rollup tiers, as (bucket length in seconds, bucket offset in seconds); weeks start on Monday at midnight UTC
+#: and, unlike the other tiers, are merged from the days rather than recomputed from the raw readings
+TIERS = {
+    'hourly': (3600, 0),
+    'daily': (86400, 0),
+    'weekly': (7 * 86400, WEEK_OFFSET),
+}
+
+#: The statistics stored for every bucket, in column order
+COLUMNS = ('num_readings', 'min', 'max', 'mean', 'p95')
+
+
+class RollupRow(NamedTuple):
+    """The statistics of one sensor over one rollup bucket."""
+
+    #: The start of the bucket, in epoch seconds
+    start: int
+    #: The number of readings in the bucket
+    num_readings: int
+    #: The lowest reading, in degrees F
+    min: float
+    #: The highest reading, in degrees F
+    max: float
+    #: The mean reading, in degrees F
+    mean: float
+    #: The 95th percentile reading, in degrees F
+    p95: float
+
+
+def empty_rollups() -> dict:
+    """
+    Provides the contents of a rollup file before anything has been rolled up.
+
+    :return: A dict with an empty watermark, an empty table for each tier, and no day sketches
+    """
+    return {'watermark': '', 'tiers': {tier: {} for tier in TIERS}, 'days': {}}
+
+
+def tier_rows(rollups: dict, tier: str, sensor_id: str) -> list[RollupRow]:
+    """
+    Reads the stored buckets of one sensor in one tier.
+
+    :param rollups: The contents of a rollup file
+    :param tier: One of the TIERS names
+    :param sensor_id: The sensor ROM hex string
+    :return: The rows, oldest first, or an empty list if the sensor has no rollups in that tier
+    """
+    table = rollups['tiers'][tier].get(sensor_id)
+    if table is None:
+        return []
+    return [RollupRow(*values) for values in zip(table['start'], *(table[column] for column in COLUMNS))]
+
+
+def _store_rows(rollups: dict, tier: str, updated: dict[str, dict[int, RollupRow]],
+                keep_after: int | None = None) -> None:
+    # writes the rows of each updated sensor back to its tier table as columns, oldest first
+    tables = rollups['tiers'].setdefault(tier, {})
+    for sensor_id, rows in updated.items():
+        kept = [rows[start] for start in sorted(rows) if keep_after is None or start > keep_after]
+        tables[sensor_id] = {
+            'start': [row.start for row in kept], **{c: [getattr(row, c) for row in kept] for c in COLUMNS}
+        }
+
+
+def _update_days(rollups: dict, frame: ReadingFrame) -> set[tuple[str, int]]:
+    # replaces the stored sketch of each sensor's day when the readings now hold more of that day, and reports the
+    # (sensor, week start) of every week with a replaced day
+    period, offset = TIERS['weekly']
+    days = rollups.setdefault('days', {})
+    day_number = frame.epoch // 86400
+    changed = set()
+    for day in np.unique(day_number).tolist():
+        keep = day_number == day
+        day_frame = ReadingFrame(frame.sensor_ids, frame.sensor_index[keep], frame.epoch[keep], frame.temperature[keep])
+        for sensor_id, sketch in day_frame.sketches().items():
+            stored = days.setdefault(sensor_id, {}).get(str(day * 86400))
+            if stored is None or sketch.count > sum(stored.values()):
+                days[sensor_id][str(day * 86400)] = sketch.to_json()
+                changed.add((sensor_id, (day * 86400 - offset) // period * period + offset))
+    return changed
+
+
+def _merge_week(rollups: dict, sensor_id: str, week_start: int) -> RollupRow:
+    # merges the daily buckets of a week for the count, min, max and mean, and its day sketches for the 95th
+    # percentile, which is exact up to the sketch's quantization
+    period, _ = TIERS['weekly']
+    daily = [row for row in tier_rows(rollups, 'daily', sensor_id) if week_start <= row.start < week_start + period]
+    sketch = TemperatureSketch()
+    for day, data in rollups['days'][sensor_id].items():
+        if week_start <= int(day) < week_start + period:
+            sketch.merge(TemperatureSketch.from_json(data))
+    num_readings = sum(row.num_readings for row in daily)
+    return RollupRow(
+        week_start, num_readings, min(row.min for row in daily), max(row.max for row in daily),
+        round(sum(row.mean * row.num_readings for row in daily) / num_readings, 3), round(sketch.quantile(0.95), 3)
+    )
+
+
+def update_rollups(rollups: dict, index: ReadingIndex, hourly_days: int = 31) -> int:
+    """
+    Recomputes every hourly and daily bucket that the readings in the index fall into, merges the weeks whose days
+    changed, and advances the watermark.  Late readings are measured before the watermark, so buckets are not skipped
+    by time; the posts folder only holds a few days of posts, which keeps this cheap.
+
+    An hourly or daily bucket is only ever replaced by one holding more readings, so a bucket whose earliest readings
+    have already been cleaned out of the posts folder keeps the complete figures it was stored with, and an unchanged
+    bucket is not written again.  A week is only rewritten when one of its days is, and always from every day stored
+    for it, so the days of a week that were cleaned up before its last days arrived still count.
+
+    :param rollups: The contents of a rollup file, updated in place
+    :param index: An up-to-date reading index
+    :param hourly_days: How many days of hourly buckets to keep, counted back from the newest reading
+    :return: The number of buckets written
+    """
+    frame = ReadingFrame.from_index(index)
+    if not len(frame):
+        return 0
+    newest = int(frame.epoch.max())
+    written = 0
+    for tier in ('hourly', 'daily'):
+        period, offset = TIERS[tier]
+        resampled = frame.resample(period, quantiles=(0.95,), offset_seconds=offset)
+        stats = resampled.stats
+        columns = zip(
+            resampled.sensor_ids, resampled.bucket_start.tolist(), stats.num_readings.tolist(), stats.minimum.tolist(),
+            stats.maximum.tolist(), stats.mean.tolist(), stats.quantiles[0].tolist()
+        )
+        updated: dict[str, dict[int, RollupRow]] = {}
+        for sensor_id, start, num_readings, low, high, mean, p95 in columns:
+            rows = updated.get(sensor_id)
+            if rows is None:
+                rows = updated[sensor_id] = {row.start: row for row in tier_rows(rollups, tier, sensor_id)}
+            if start in rows and rows[start].num_readings >= num_readings:
+                continue
+            rows[start] = RollupRow(start, num_readings, round(low, 3), round(high, 3), round(mean, 3), round(p95, 3))
+            written += 1
+        _store_rows(rollups, tier, updated, newest - hourly_days * 86400 if tier == 'hourly' else None)
+    weeks: dict[str, dict[int, RollupRow]] = {}
+    for sensor_id, week_start in sorted(_update_days(rollups, frame)):
+        rows = weeks.get(sensor_id)
+        if rows is None:
+            rows = weeks[sensor_id] = {row.start: row for row in tier_rows(rollups, 'weekly', sensor_id)}
+        rows[week_start] = _merge_week(rollups, sensor_id, week_start)
+        written += 1
+    _store_rows(rollups, 'weekly', weeks)
+    # the weeks before the one holding the oldest reading still in the folder can no longer change
+    period, offset = TIERS['weekly']
+    oldest_week = (int(frame.epoch.min()) - offset) // period * period + offset
+    for days in rollups['days'].values():
+        for day in [day for day in days if int(day) < oldest_week]:
+            del days[day]
+    rollups['watermark'] = max(rollups['watermark'], epoch_to_measurement_time(newest))
+    return written
+
+
+if __name__ == "__main__":
+    this_file_path = Path(__file__).resolve()
+    repo_root = this_file_path.parent.parent
+    parser = ArgumentParser(description="Bring the hourly, daily and weekly sensor rollups up to date")
+    parser.add_argument('posts_root', type=Path, help="path to the sensor_data/data folder or dashboard/_posts")
+    parser.add_argument('--rollups', type=Path, default=repo_root / 'dashboard' / '_data' / 'rollups.json',
+                        help="rollup file to update, which is created if it does not exist")
+    parser.add_argument('--index', type=Path, default=repo_root / 'reading_index.sqlite',
+                        help="SQLite reading index shared by the scripts; only posts missing from it are read")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of processes used to parse posts that are not yet in the index")
+    parser.add_argument('--hourly-days', type=int, default=31, help="days of hourly rollups to keep")
+    args = parser.parse_args()
+    current_rollups = loads(args.rollups.read_text()) if args.rollups.exists() else empty_rollups()
+    reading_index = ReadingIndex(args.index)
+    reading_index.ingest(args.posts_root, args.workers)
+    num_written = update_rollups(current_rollups, reading_index, args.hourly_days)
+    reading_index.close()
+    args.rollups.write_text(dumps(current_rollups, separators=(',', ':')))
+    print(f"{num_written} rollup bucket(s) written, watermark is {current_rollups['watermark']}")
@@ -0,0 +1,132 @@
+# this module compresses the readings of one sensor into a small byte string, for packed archives and for transfer
+# the times are stored as deltas of deltas: readings come at a steady cadence, so the delta between two gaps is nearly
+# always zero or a few seconds of jitter; the temperatures are quantized to hundredths of a degree F, well below the
+# sensor resolution of 0.1125 F, and stored as deltas from the previous reading, which are small between samples
+# every number is a zigzag varint (seven bits per byte, high bit set on all but the last byte), so a typical reading
+# takes two bytes, against the 12 of the archive columns and the 150 or so of a post
+# layout: MAGIC, the reading count, the first epoch, the first temperature in hundredths, and then a (delta of delta,
+# temperature delta) pair per further reading
+# the varints are byte aligned, so besides the pure Python decoder there is a NumPy decoder with no Python loop at all
+
+from array import array
+
+from robust_stats import RESOLUTION
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, the pure Python decoder works without it
+    np = None  # type: ignore[assignment]
+
+#: The first bytes of every encoded series, including a format version
+MAGIC = b'TSC\x01'
+
+
+def _quantize(temperature: float) -> int:
+    return round(temperature / RESOLUTION)
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    zigzag = value * 2 if value >= 0 else -value * 2 - 1
+    while zigzag >= 0x80:
+        out.append((zigzag & 0x7F) | 0x80)
+        zigzag >>= 7
+    out.append(zigzag)
+
+
+def encode(epochs: list[int], temperatures: list[float]) -> bytes:
+    """
+    Compresses the readings of one sensor.
+
+    :param epochs: The measurement times, in epoch seconds, in time order
+    :param temperatures: The temperature of each reading, in degrees F
+    :return: The encoded series
+    """
+    if len(epochs) != len(temperatures):
+        raise ValueError(f"Got {len(epochs)} times but {len(temperatures)} temperatures")
+    out = bytearray(MAGIC)
+    _write_varint(out, len(epochs))
+    if not epochs:
+        return bytes(out)
+    previous_epoch = int(epochs[0])
+    previous_delta = 0
+    previous_centi = _quantize(temperatures[0])
+    _write_varint(out, previous_epoch)
+    _write_varint(out, previous_centi)
+    for epoch, temperature in zip(epochs[1:], temperatures[1:]):
+        delta = int(epoch) - previous_epoch
+        centi = _quantize(temperature)
+        _write_varint(out, delta - previous_delta)
+        _write_varint(out, centi - previous_centi)
+        previous_epoch, previous_delta, previous_centi = int(epoch), delta, centi
+    return bytes(out)
+
+
+def _check_magic(payload: bytes) -> None:
+    if payload[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not an encoded reading series, or one from a newer format version")
+
+
+def decode(payload: bytes) -> tuple[array, array]:
+    """
+    Decompresses a series in pure Python.
+
+    :param payload: The encoded series
+    :return: A tuple of (epochs, temperatures) arrays, int64 epoch seconds and float64 degrees F
+    """
+    _check_magic(payload)
+    values = []
+    value = shift = 0
+    for byte in payload[len(MAGIC):]:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            values.append(value >> 1 if value & 1 == 0 else -(value >> 1) - 1)
+            value = shift = 0
+    if shift:
+        raise ValueError("Encoded reading series is truncated")
+    count = values[0]
+    if len(values) != (1 if count == 0 else 2 * count + 1):
+        raise ValueError(f"Encoded reading series should hold {count} readings")
+    epochs = array('q')
+    temperatures = array('d')
+    if count:
+        epoch, delta, centi = values[1], 0, values[2]
+        epochs.append(epoch)
+        temperatures.append(centi * RESOLUTION)
+        for position in range(3, len(values), 2):
+            delta += values[position]
+            epoch += delta
+            centi += values[position + 1]
+            epochs.append(epoch)
+            temperatures.append(centi * RESOLUTION)
+    return epochs, temperatures
+
+
+def decode_numpy(payload: bytes):  # type: ignore[no-untyped-def]
+    """
+    Decompresses a series with vectorized NumPy operations.  NumPy must be installed to call this.
+
+    :param payload: The encoded series
+    :return: A tuple of (epochs, temperatures) NumPy arrays, int64 epoch seconds and float64 degrees F
+    """
+    if np is None:
+        raise RuntimeError("NumPy is not installed; use decode instead")
+    _check_magic(payload)
+    data = np.frombuffer(payload, dtype=np.uint8, offset=len(MAGIC))
+    if len(data) == 0 or data[-1] >= 0x80:
+        raise ValueError("Encoded reading series is truncated")
+    # each varint ends on a byte below 0x80; shift the low seven bits of every byte into place within its varint,
+    # and since the shifted bits never overlap, adding them up per varint puts the value together
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.r_[0, ends[:-1] + 1]
+    place = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    zigzag = np.add.reduceat((data & 0x7F).astype(np.uint64) << (7 * place).astype(np.uint64), starts)
+    values = (zigzag >> np.uint64(1)).astype(np.int64) ^ -(zigzag & np.uint64(1)).astype(np.int64)
+    count = int(values[0])
+    if len(values) != (1 if count == 0 else 2 * count + 1):
+        raise ValueError(f"Encoded reading series should hold {count} readings")
+    if count == 0:
+        return np.zeros(0, np.int64), np.zeros(0, np.float64)
+    epochs = values[1] + np.r_[0, np.cumsum(np.cumsum(values[3::2]))]
+    temperatures = (values[2] + np.r_[0, np.cumsum(values[4::2])]) * RESOLUTION
+    return epochs, temperatures
@@ -0,0 +1,62 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import numpy as np
+
+from analytics import ReadingFrame, group_stats
+from reading_archive import PACKED_SUFFIX, append_readings, pack_sensor
+
+
+class TestAnalytics(TestCase):
+
+    def test_group_stats(self) -> None:
+        keys = np.array([1, 0, 1, 2] + [3] * 20)
+        temperatures = np.array([50.0, 7.0, 40.0, -1.0] + [float(t) for t in range(20, 0, -1)])
+        stats = group_stats(keys, temperatures, proportion=0.1, quantiles=(0.5, 0.95))
+        self.assertEqual([0, 1, 2, 3], stats.keys.tolist())
+        self.assertEqual([1, 2, 1, 20], stats.num_readings.tolist())
+        self.assertEqual([7.0, 40.0, -1.0, 1.0], stats.minimum.tolist())
+        self.assertEqual([7.0, 50.0, -1.0, 20.0], stats.maximum.tolist())
+        self.assertEqual([7.0, 45.0, -1.0, 10.5], stats.mean.tolist())
+        self.assertEqual(10.5, stats.trimmed_mean[3])
+        self.assertEqual([7.0, 40.0, -1.0, 10.0], stats.quantiles[0].tolist())
+        self.assertEqual([7.0, 50.0, -1.0, 19.0], stats.quantiles[1].tolist())  # a small group's p95 is its maximum
+
+    def test_frame_from_readings(self) -> None:
+        frame = ReadingFrame.from_readings([
+            ('bb', '2026-03-01-10-00-00', 5.0), ('aa', '2026-03-01-11-00-00', 2.0), ('aa', '2026-03-01-10-00-00', 1.0)
+        ])
+        self.assertEqual(['bb', 'aa'], frame.sensor_ids)
+        self.assertEqual([5.0, 2.0], frame.tail(1).temperature.tolist())  # sorted by sensor index
+        sketches = frame.sketches()
+        self.assertEqual(2, sketches['aa'].count)
+        daily = frame.resample(86400)
+        self.assertEqual(['bb', 'aa'], daily.sensor_ids)
+        self.assertEqual([1, 2], daily.stats.num_readings.tolist())
+
+    def test_excursion_seconds(self) -> None:
+        frame = ReadingFrame(
+            ['aa', 'bb', 'cc'], np.array([0, 0, 0, 0, 1, 1, 2]), np.array([0, 600, 1200, 20000, 100, 200, 50]),
+            np.array([5.0, -1.0, 3.0, 2.0, 9.0, 9.0, 1.0])
+        )
+        # aa is above its limit for the 600 s to its next reading, then for a gap capped at 7200 s, and its last
+        # reading has no next reading to count up to; bb has no limit, so it is skipped
+        self.assertEqual({'aa': 7800, 'cc': 0}, frame.excursion_seconds({'aa': 0.0, 'cc': 10.0}, max_gap_seconds=7200))
+        empty = ReadingFrame(['aa'], np.zeros(0, int), np.zeros(0, int), np.zeros(0))
+        self.assertEqual({'aa': 0}, empty.excursion_seconds({'aa': 0.0}))
+
+    def test_frame_from_archive_and_packed_files(self) -> None:
+        with TemporaryDirectory() as folder:
+            archive_root = Path(folder) / 'archive'
+            append_readings(archive_root, 'aa', [(100, 1.5), (200, 2.5), (300, 3.5)])
+            append_readings(archive_root, 'bb', [(150, -1.0)])
+            frame = ReadingFrame.from_archive(archive_root, ['aa', 'bb', 'zz'], start_epoch=150, end_epoch=300)
+            self.assertEqual(([0, 1], [200, 150], [2.5, -1.0]),
+                             (frame.sensor_index.tolist(), frame.epoch.tolist(), frame.temperature.tolist()))
+            packed_root = Path(folder) / 'packed'
+            packed_root.mkdir()
+            (packed_root / f"aa{PACKED_SUFFIX}").write_bytes(pack_sensor(archive_root, 'aa'))
+            frame = ReadingFrame.from_packed(packed_root, ['zz', 'aa'])
+            self.assertEqual(([1, 1, 1], [100, 200, 300], [1.5, 2.5, 3.5]),
+                             (frame.sensor_index.tolist(), frame.epoch.tolist(), frame.temperature.tolist()))
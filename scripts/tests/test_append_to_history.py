@@ -0,0 +1,47 @@
+from json import dumps
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from analytics import ReadingFrame
+from append_to_history import gather_readings, load_state, open_period, period_sketches, week_entry_dates
+
+
+def frame(*readings: tuple[str, float]) -> ReadingFrame:
+    return ReadingFrame.from_readings([('aa', measurement_time, t) for measurement_time, t in readings])
+
+
+class TestAppendToHistory(TestCase):
+
+    def test_days_are_gathered_per_period(self) -> None:
+        closed = open_period('')
+        readings = [('2026-03-01-10-00-00', 40.0), ('2026-03-02-10-00-00', 42.0)]
+        self.assertEqual([2], gather_readings([closed], frame(*readings)))
+        closed['end'] = '2026-03-02-10-00-00'
+        closed['date'] = '2026-03-02'
+        current = open_period('2026-03-02-10-00-00')
+        readings += [('2026-03-01-12-00-00', 50.0), ('2026-03-03-10-00-00', 60.0)]  # the first was posted late
+        self.assertEqual([1, 1], gather_readings([closed, current], frame(*readings)))
+        self.assertEqual(3, period_sketches(closed)['aa'].count)
+        self.assertEqual(60.0, period_sketches(current)['aa'].trimmed_mean())
+        self.assertEqual([0, 0], gather_readings([closed, current], frame(*readings)))
+
+    def test_cleaned_up_days_are_kept(self) -> None:
+        period = open_period('')
+        gather_readings([period], frame(('2026-03-01-10-00-00', 40.0), ('2026-03-01-11-00-00', 41.0)))
+        self.assertEqual([0], gather_readings([period], frame(('2026-03-01-11-00-00', 41.0))))
+        self.assertEqual(2, period_sketches(period)['aa'].count)
+
+    def test_state_files(self) -> None:
+        self.assertEqual({'watermark': '', 'periods': [open_period('')]}, load_state(None))
+        with TemporaryDirectory() as folder:
+            state_file = Path(folder) / 'state.json'
+            state_file.write_text(dumps({'watermark': '2026-03-01-10-00-00', 'sketches': {'aa': {'4000': 3}}}))
+            state = load_state(state_file)
+        self.assertEqual('2026-03-01-10-00-00', state['periods'][0]['start'])
+        self.assertEqual([0], gather_readings(state['periods'], frame(('2026-03-01-09-00-00', 40.0))))
+        self.assertEqual(3, period_sketches(state['periods'][0])['aa'].count)
+
+    def test_week_entry_dates(self) -> None:
+        self.assertEqual(['2026-03-01', '2026-03-08'], week_entry_dates('2026-02-23', '2026-03-08'))
+        self.assertEqual([], week_entry_dates('2026-03-02', '2026-03-07'))
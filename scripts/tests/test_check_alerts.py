@@ -0,0 +1,62 @@
+from datetime import datetime, UTC
+from unittest import TestCase
+
+from check_alerts import evaluate, sensor_rules
+from posts import Reading
+
+NOW = datetime(2026, 3, 1, 12, 0, 0, tzinfo=UTC)
+FREEZER = {'hex': 'aa', 'active': True, 'nice_name': 'Freezer', 'maximum_temp': 0.0, 'type': 'freezer'}
+RULES = {
+    'readme1': "ignored",
+    'defaults': {'consecutive_excursions': {'count': 3}, 'staleness': {'hours': 18}},
+    'types': {'freezer': {'max_temp': {'margin': 15}, 'rate_of_change': {'degrees': 15, 'hours': 2}}},
+}
+
+
+def ring(*readings: tuple[str, float]) -> list[Reading]:
+    """Builds a ring, newest first, from (HH-MM on the day of NOW, temperature) pairs."""
+    return [Reading('aa', 'F', temperature, f"2026-03-01-{time}-00") for time, temperature in readings]
+
+
+class TestCheckAlerts(TestCase):
+
+    def broken(self, readings: list[Reading], sensor: dict = FREEZER) -> list[str]:
+        alerts, passing = evaluate({'alert_rules': RULES, 'sensors': {'1': sensor}}, {'aa': readings}, NOW)
+        self.assertEqual([] if alerts else ['1'], passing)
+        return sorted(alert.rule for alert in alerts)
+
+    def test_rules_are_layered(self) -> None:
+        self.assertEqual(
+            {'consecutive_excursions': {'count': 3}, 'staleness': {'hours': 18}, 'max_temp': {'margin': 15},
+             'rate_of_change': {'degrees': 15, 'hours': 2}},
+            sensor_rules(RULES, FREEZER)
+        )
+        sensor = {**FREEZER, 'alert_rules': {'staleness': None, 'max_temp': {'margin': 5}}}
+        rules = sensor_rules(RULES, sensor)
+        self.assertNotIn('staleness', rules)
+        self.assertEqual({'margin': 5}, rules['max_temp'])
+        with self.assertRaises(ValueError):
+            sensor_rules({'defaults': {'too_warm': {}}}, FREEZER)
+
+    def test_passing(self) -> None:
+        self.assertEqual([], self.broken(ring(('11-50', -10.0), ('11-40', -10.5), ('11-30', -11.0))))
+
+    def test_max_temp(self) -> None:
+        self.assertEqual(['max_temp'], self.broken(ring(('11-50', 16.0), ('09-00', -10.0), ('08-00', -10.0))))
+
+    def test_consecutive_excursions(self) -> None:
+        self.assertEqual(['consecutive_excursions'], self.broken(ring(('11-50', 1.0), ('11-40', 0.0), ('11-30', 2.0))))
+        self.assertEqual([], self.broken(ring(('11-50', 1.0), ('11-40', -0.5), ('11-30', 2.0))))
+
+    def test_rate_of_change(self) -> None:
+        self.assertEqual(['rate_of_change'], self.broken(ring(('11-50', -4.0), ('11-00', -20.0), ('09-00', -4.0))))
+        self.assertEqual([], self.broken(ring(('11-50', -4.0), ('09-00', -20.0))))  # the low was too long ago
+
+    def test_staleness(self) -> None:
+        self.assertEqual(['staleness'], self.broken([]))
+        stale = [Reading('aa', 'F', -10.0, '2026-02-28-17-00-00')]
+        self.assertEqual(['staleness'], self.broken(stale))
+
+    def test_inactive_sensors_are_skipped(self) -> None:
+        alerts, passing = evaluate({'alert_rules': RULES, 'sensors': {'1': {**FREEZER, 'active': False}}}, {}, NOW)
+        self.assertEqual(([], []), (alerts, passing))
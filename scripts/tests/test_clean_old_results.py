@@ -0,0 +1,44 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from clean_old_results import delete_files, find_expired
+from posts import partition_folder
+
+
+class TestRetention(TestCase):
+
+    def setUp(self) -> None:
+        self.folder = TemporaryDirectory()
+        self.root = Path(self.folder.name)
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def write(self, relative: str, contents: str = '') -> Path:
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(contents)
+        return path
+
+    def test_expired_files_are_deleted_and_empty_folders_removed(self) -> None:
+        old_post = self.write(f"{partition_folder('aa', '2026-02-01')}/2026-02-01-10-00-00_aa_X.html")
+        old_segment = self.write(f"{partition_folder('aa', '2026-02-02')}/2026-02-02_aa.jsonl")
+        flat = self.write('aa/2026-02-03-10-00-00_aa_X.html')  # from before the partitions
+        new_post = self.write(f"{partition_folder('aa', '2026-03-01')}/2026-03-01-10-00-00_aa_X.html")
+        expired, unknown = find_expired(self.root, '2026-02-15-00-00-00')
+        self.assertEqual(sorted([old_post, old_segment, flat]), expired)
+        self.assertEqual([], unknown)
+        delete_files(self.root, expired, workers=2)
+        self.assertFalse((self.root / 'aa' / '2026' / '02').exists())
+        self.assertTrue(new_post.exists())
+        self.assertTrue((self.root / 'aa').is_dir())
+
+    def test_files_without_a_time_in_their_name(self) -> None:
+        inside = self.write('aa/notes.html', "---\nsensor_id: aa\nsensor_name: X\ntemperature: 1\n"
+                                             "measurement_time: 2026-02-01-00-00-00\n---\n{}\n")
+        by_folder = self.write(f"{partition_folder('aa', '2026-02-01')}/junk.html", "junk")
+        unknown_age = self.write('aa/junk.html', "junk")
+        expired, unknown = find_expired(self.root, '2026-02-15-00-00-00')
+        self.assertEqual(sorted([inside, by_folder]), expired)
+        self.assertEqual([unknown_age], unknown)
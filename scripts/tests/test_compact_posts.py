@@ -0,0 +1,58 @@
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from compact_posts import compact_posts
+from posts import partition_folder, read_file
+
+
+def post_text(measurement_time: str, temperature: float) -> str:
+    return (f"---\nsensor_id: aa\nsensor_name: X\ntemperature: {temperature}\nmeasurement_time: {measurement_time}\n"
+            f"---\n{{}}\n")
+
+
+def segment_text(*readings: tuple[str, float]) -> str:
+    return ''.join(
+        f'{{"sensor_id": "aa", "sensor_name": "X", "temperature": {temperature}, '
+        f'"measurement_time": "{measurement_time}"}}\n' for measurement_time, temperature in readings
+    )
+
+
+class TestCompaction(TestCase):
+
+    def setUp(self) -> None:
+        self.folder = TemporaryDirectory()
+        self.root = Path(self.folder.name)
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def write(self, relative: str, contents: str) -> Path:
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(contents)
+        return path
+
+    def files(self) -> list[str]:
+        return sorted(path.relative_to(self.root).as_posix() for path in self.root.rglob('*') if path.is_file())
+
+    def test_old_days_are_compacted_into_their_partition(self) -> None:
+        day = partition_folder('aa', '2020-01-02')
+        self.write(f"{day}/2020-01-02-10-00-00_aa_X.html", post_text('2020-01-02-10-00-00', 1.0))
+        self.write('aa/2020-01-02-11-00-00_aa_X.html', post_text('2020-01-02-11-00-00', 2.0))  # a leftover flat post
+        self.write(f"{day}/2020-01-02_aa.jsonl", segment_text(('2020-01-02-09-00-00', 0.5)))
+        self.write(f"{day}/2020-01-02-12-00-00_aa_X.html", "garbage")
+        with redirect_stdout(StringIO()) as output:
+            self.assertEqual(2, compact_posts(self.root, keep_days=5))
+        self.assertIn("leaving it in place", output.getvalue())
+        self.assertEqual([f"{day}/2020-01-02-12-00-00_aa_X.html", f"{day}/2020-01-02_aa.jsonl"], self.files())
+        segment = read_file(self.root / day / '2020-01-02_aa.jsonl')
+        self.assertEqual([0.5, 1.0, 2.0], [reading.temperature for reading in segment or []])
+        with redirect_stdout(StringIO()):
+            self.assertEqual(0, compact_posts(self.root, keep_days=5))
+
+    def test_recent_days_are_left_alone(self) -> None:
+        self.write('aa/9999/01/01/9999-01-01-10-00-00_aa_X.html', post_text('9999-01-01-10-00-00', 1.0))
+        self.assertEqual(0, compact_posts(self.root, keep_days=5))
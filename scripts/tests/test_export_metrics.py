@@ -0,0 +1,73 @@
+from datetime import datetime, UTC
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from export_metrics import render_metrics, write_textfile
+from reading_index import ReadingIndex
+
+NOW = datetime(2026, 3, 2, 12, 0, 0, tzinfo=UTC)
+CONFIG = {
+    'sensors': {
+        'readme1': "ignored",
+        '01': {'hex': 'aa', 'active': True, 'nice_name': 'The "Big" Freezer\\1', 'sensor_location': 'Garage\nBay',
+               'type': 'freezer', 'maximum_temp': 0.0},
+        '02': {'hex': 'bb', 'active': True, 'nice_name': 'Fridge', 'sensor_location': 'Pantry', 'type': None,
+               'maximum_temp': 40.0},
+        '03': {'hex': 'cc', 'active': False, 'nice_name': 'Old', 'sensor_location': 'Garage', 'type': 'freezer',
+               'maximum_temp': 0.0},
+    }
+}
+AA = 'sensor="aa",cable="01",name="The \\"Big\\" Freezer\\\\1",location="Garage\\nBay",type="freezer"'
+BB = 'sensor="bb",cable="02",name="Fridge",location="Pantry",type=""'
+
+
+class TestExportMetrics(TestCase):
+
+    def setUp(self) -> None:
+        self.index = ReadingIndex()
+
+    def tearDown(self) -> None:
+        self.index.close()
+
+    def test_render_metrics(self) -> None:
+        with self.index.connection:
+            self.index.connection.executemany("INSERT INTO readings VALUES (?, ?, ?, 'X')", [
+                ('aa', '2026-03-01-10-00-00', -3.0), ('aa', '2026-03-02-11-00-00', 1.5),
+                ('aa', '2026-03-02-11-30-00', -2.25), ('cc', '2026-03-02-11-30-00', 9.0),
+            ])
+        self.assertEqual(
+            "# TYPE tempsensors_temperature_fahrenheit gauge\n"
+            "# UNIT tempsensors_temperature_fahrenheit fahrenheit\n"
+            "# HELP tempsensors_temperature_fahrenheit The latest temperature reading.\n"
+            f"tempsensors_temperature_fahrenheit{{{AA}}} -2.25\n"
+            "# TYPE tempsensors_reading_age_seconds gauge\n"
+            "# UNIT tempsensors_reading_age_seconds seconds\n"
+            "# HELP tempsensors_reading_age_seconds The time since the latest reading was measured.\n"
+            f"tempsensors_reading_age_seconds{{{AA}}} 1800\n"
+            "# TYPE tempsensors_threshold_margin_fahrenheit gauge\n"
+            "# UNIT tempsensors_threshold_margin_fahrenheit fahrenheit\n"
+            "# HELP tempsensors_threshold_margin_fahrenheit The maximum temperature minus the latest reading; "
+            "negative when over the maximum.\n"
+            f"tempsensors_threshold_margin_fahrenheit{{{AA}}} 2.25\n"
+            "# TYPE tempsensors_readings_last_day gauge\n"
+            "# HELP tempsensors_readings_last_day The number of readings pushed over the last day.\n"
+            f"tempsensors_readings_last_day{{{AA}}} 2\n"
+            f"tempsensors_readings_last_day{{{BB}}} 0\n"
+            "# EOF\n",
+            render_metrics(CONFIG, self.index, NOW)
+        )  # bb never reported, so it only has a count of readings, and the inactive cc is left out
+
+    def test_no_readings(self) -> None:
+        exposition = render_metrics(CONFIG, self.index, NOW)
+        self.assertEqual(2, exposition.count('tempsensors_readings_last_day{'))
+        self.assertNotIn('tempsensors_temperature_fahrenheit{', exposition)
+        self.assertTrue(exposition.endswith("# EOF\n"))
+
+    def test_write_textfile(self) -> None:
+        with TemporaryDirectory() as folder:
+            textfile = Path(folder) / 'tempsensors.prom'
+            textfile.write_text("old")
+            write_textfile(textfile, "# EOF\n")
+            self.assertEqual("# EOF\n", textfile.read_text())
+            self.assertEqual([textfile], list(Path(folder).iterdir()))
@@ -0,0 +1,95 @@
+from pathlib import Path
+from subprocess import check_output
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from git_posts import GitPostReader, filter_posts
+from posts import Reading
+
+
+def post_text(sensor_id: str, measurement_time: str, temperature: float) -> str:
+    return (f"---\nsensor_id: {sensor_id}\nsensor_name: X\ntemperature: {temperature}\n"
+            f"measurement_time: {measurement_time}\n---\n{{}}\n")
+
+
+class TestFilterPosts(TestCase):
+
+    def test_since_and_latest(self) -> None:
+        entries = [
+            ('aa/2026-03-01-10-00-00_aa_X.html', '1'), ('aa/2026-03-02_aa.jsonl', '2'),
+            ('aa/2026-03-02-10-00-00_aa_X.html', '3'), ('bb/2026-03-01-09-00-00_bb_Y.html', '4'),
+        ]
+        self.assertEqual([entries[2], entries[1]], filter_posts(entries, since='2026-03-01-10-00-00'))
+        # the segment counts as the last second of its day, so it is the newest file of sensor aa
+        self.assertEqual([entries[1], entries[3]], filter_posts(entries, latest=1))
+        self.assertEqual([], filter_posts(entries, latest=0))
+
+
+class TestGitPostReader(TestCase):
+
+    def setUp(self) -> None:
+        self.folder = TemporaryDirectory()
+        self.repo = Path(self.folder.name)
+        self.git('init', '-q')
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def git(self, *arguments: str) -> str:
+        return check_output(
+            ['git', '-C', str(self.repo), '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *arguments]
+        ).decode().strip()
+
+    def commit(self, files: dict[str, str]) -> str:
+        for relative, contents in files.items():
+            path = self.repo / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(contents)
+        self.git('add', '-A')
+        self.git('commit', '-q', '-m', 'Sensor Data')
+        return self.git('rev-parse', 'HEAD')
+
+    def test_list_and_read_posts(self) -> None:
+        commit = self.commit({
+            'data/aa/2026-03-01-10-00-00_aa_X.html': post_text('aa', '2026-03-01-10-00-00', 40.0),
+            'data/aa/2026-03-02-10-00-00_aa_X.html': "garbage",
+            'data/aa/notes.txt': "not a post",
+            'data/bb/2026-03-01-11-00-00_bb_X.html': post_text('bb', '2026-03-01-11-00-00', -5.0),
+            'latest/aa.json': '[]',
+        })
+        with GitPostReader(self.repo, 'HEAD') as reader:
+            self.assertEqual(commit, reader.commit_id())
+            entries = reader.list_posts()
+            self.assertEqual(['aa/2026-03-01-10-00-00_aa_X.html', 'aa/2026-03-02-10-00-00_aa_X.html',
+                              'bb/2026-03-01-11-00-00_bb_X.html'], [path for path, _ in entries])
+            self.assertEqual(['bb/2026-03-01-11-00-00_bb_X.html'], [path for path, _ in reader.list_posts(['bb'])])
+            self.assertEqual([], reader.list_posts([]))
+            self.assertEqual(['aa/2026-03-02-10-00-00_aa_X.html'],
+                             [path for path, _ in reader.list_posts(['aa'], since='2026-03-01-10-00-00')])
+            self.assertEqual(
+                [('aa/2026-03-01-10-00-00_aa_X.html', [Reading('aa', 'X', 40.0, '2026-03-01-10-00-00')]),
+                 ('aa/2026-03-02-10-00-00_aa_X.html', None)],
+                list(reader.read_posts(reader.list_posts(['aa'])))
+            )
+            self.assertEqual(b'[]', reader.read_path('latest/aa.json'))
+            self.assertIsNone(reader.read_path('latest/bb.json'))
+
+    def test_changed_posts(self) -> None:
+        first = self.commit({
+            'data/aa/2026-03-01-10-00-00_aa_X.html': post_text('aa', '2026-03-01-10-00-00', 40.0),
+            'data/aa/2026-03-02-10-00-00_aa_X.html': post_text('aa', '2026-03-02-10-00-00', 41.0),
+        })
+        (self.repo / 'data' / 'aa' / '2026-03-01-10-00-00_aa_X.html').unlink()
+        self.commit({
+            'data/aa/2026-03-02-10-00-00_aa_X.html': post_text('aa', '2026-03-02-10-00-00', 42.0),
+            'data/bb/2026-03-02-11-00-00_bb_X.html': post_text('bb', '2026-03-02-11-00-00', -5.0),
+            'latest/aa.json': '[]',
+        })
+        with GitPostReader(self.repo, 'HEAD') as reader:
+            changed = reader.changed_posts(first)
+            self.assertEqual(['aa/2026-03-02-10-00-00_aa_X.html', 'bb/2026-03-02-11-00-00_bb_X.html'],
+                             [path for path, _ in changed])  # the deleted post is not listed
+            self.assertEqual(
+                [[Reading('aa', 'X', 42.0, '2026-03-02-10-00-00')], [Reading('bb', 'X', -5.0, '2026-03-02-11-00-00')]],
+                [readings for _, readings in reader.read_posts(changed)]
+            )
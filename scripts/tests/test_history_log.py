@@ -0,0 +1,40 @@
+from json import loads
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from history_log import append_entry, read_log, write_view
+
+
+class TestHistoryLog(TestCase):
+
+    def setUp(self) -> None:
+        self.folder = TemporaryDirectory()
+        self.log = Path(self.folder.name) / 'history.jsonl'
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_append_only(self) -> None:
+        self.assertEqual({}, read_log(self.log))
+        append_entry(self.log, '2026-03-01', {'Freezer': -10.25})
+        first = self.log.read_text()
+        append_entry(self.log, '2026-03-08', {'Freezer': -11.0, 'Fridge': 38.0})
+        self.assertTrue(self.log.read_text().startswith(first))
+        self.assertEqual(2, len(self.log.read_text().splitlines()))
+
+    def test_later_entry_replaces_the_same_date(self) -> None:
+        append_entry(self.log, '2026-03-01', {'Freezer': -10.25})
+        append_entry(self.log, '2026-03-08', {'Freezer': -11.0})
+        append_entry(self.log, '2026-03-01', {'Freezer': -9.5})
+        self.assertEqual({'2026-03-01': {'Freezer': -9.5}, '2026-03-08': {'Freezer': -11.0}}, read_log(self.log))
+
+    def test_view_is_newest_first_and_rounded(self) -> None:
+        view = Path(self.folder.name) / 'history.json'
+        write_view({'2026-03-01': {'b': 1.006, 'a': 2.0}, '2026-03-08': {'a': -1.0}}, view)
+        self.assertEqual(
+            [{'date': '2026-03-08', 'averages': {'a': -1.0}},
+             {'date': '2026-03-01', 'averages': {'a': 2.0, 'b': 1.01}}],
+            loads(view.read_text())
+        )
+        self.assertEqual(['history.json'], [path.name for path in view.parent.iterdir()])  # no partial file is left
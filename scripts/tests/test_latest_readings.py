@@ -0,0 +1,44 @@
+from json import loads
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from latest_readings import add_readings, parse_latest, read_latest, update_latest
+from posts import Reading
+
+
+def reading(sensor_id: str, measurement_time: str, temperature: float) -> Reading:
+    return Reading(sensor_id, 'X', temperature, measurement_time)
+
+
+class TestLatestReadings(TestCase):
+
+    def setUp(self) -> None:
+        self.folder = TemporaryDirectory()
+        self.root = Path(self.folder.name) / 'latest'
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_add_readings(self) -> None:
+        ring = [reading('aa', '2026-03-01-12-00-00', 3.0), reading('aa', '2026-03-01-11-00-00', 2.0)]
+        new_readings = [reading('aa', '2026-03-01-13-00-00', 4.0), reading('aa', '2026-03-01-11-00-00', 9.0),
+                        reading('aa', '2026-03-01-10-00-00', 1.0)]
+        added = add_readings(ring, new_readings, count=3)
+        self.assertEqual([4.0, 3.0, 9.0], [r.temperature for r in added])  # newest first, the repeat replaced
+
+    def test_rings_are_written_and_read(self) -> None:
+        self.assertEqual([], read_latest(self.root, 'aa'))
+        changed = update_latest(self.root, [reading('bb', '2026-03-01-10-00-00', -5.0),
+                                            reading('aa', '2026-03-01-10-00-00', 40.0),
+                                            reading('aa', '2026-03-01-11-00-00', 41.0)])
+        self.assertEqual(['aa', 'bb'], changed)
+        self.assertEqual([reading('aa', '2026-03-01-11-00-00', 41.0), reading('aa', '2026-03-01-10-00-00', 40.0)],
+                         read_latest(self.root, 'aa'))
+        self.assertEqual('aa', loads((self.root / 'aa.json').read_text())['sensor_id'])
+        self.assertEqual([], update_latest(self.root, [reading('aa', '2026-03-01-10-00-00', 40.0)]))
+        self.assertEqual([], list(self.root.glob('*.partial')))
+
+    def test_malformed_ring(self) -> None:
+        self.assertEqual([], parse_latest(b'garbage'))
+        self.assertEqual([], parse_latest(b'{"sensor_id": "aa", "readings": [{"temperature": 1.0}]}'))
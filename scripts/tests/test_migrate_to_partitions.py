@@ -0,0 +1,62 @@
+from contextlib import redirect_stdout
+from io import StringIO
+from json import loads
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from migrate_to_partitions import migrate
+from posts import partition_folder
+
+
+def post_text(measurement_time: str, temperature: float) -> str:
+    return (f"---\nsensor_id: aa\nsensor_name: X\ntemperature: {temperature}\nmeasurement_time: {measurement_time}\n"
+            f"---\n{{}}\n")
+
+
+def segment_text(*readings: tuple[str, float]) -> str:
+    return ''.join(
+        f'{{"sensor_id": "aa", "sensor_name": "X", "temperature": {temperature}, '
+        f'"measurement_time": "{measurement_time}"}}\n' for measurement_time, temperature in readings
+    )
+
+
+class TestMigrateToPartitions(TestCase):
+
+    def setUp(self) -> None:
+        self.folder = TemporaryDirectory()
+        self.root = Path(self.folder.name)
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def write(self, relative: str, contents: str) -> Path:
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(contents)
+        return path
+
+    def test_flat_files_are_moved_or_merged(self) -> None:
+        day = partition_folder('aa', '2026-01-02')
+        self.write('aa/2026-01-02_aa.jsonl', segment_text(('2026-01-02-01-00-00', 1.0), ('2026-01-02-02-00-00', 2.0)))
+        self.write(f"{day}/2026-01-02_aa.jsonl",
+                   segment_text(('2026-01-02-02-00-00', 9.0), ('2026-01-02-03-00-00', 3.0)))
+        self.write('aa/2026-01-02-04-00-00_aa_X.html', post_text('2026-01-02-04-00-00', 4.0))
+        self.write(f"{day}/2026-01-02-04-00-00_aa_X.html", post_text('2026-01-02-04-00-00', 4.0))
+        self.write('aa/2026-01-03-04-00-00_aa_X.html', post_text('2026-01-03-04-00-00', 5.0))
+        self.write('aa/2026-01-05_aa.jsonl', "garbage")
+        self.write('aa/latest_aa_X.html', post_text('2026-01-06-04-00-00', 6.0))
+        self.write(f"{partition_folder('aa', '2026-01-05')}/2026-01-05_aa.jsonl", segment_text())
+        with redirect_stdout(StringIO()) as output:
+            self.assertEqual(3, migrate(self.root))
+        self.assertIn("2026-01-05_aa.jsonl already exists", output.getvalue())
+        self.assertIn("latest_aa_X.html, its name does not start with a measurement time", output.getvalue())
+        merged = [loads(line) for line in (self.root / day / '2026-01-02_aa.jsonl').read_text().splitlines()]
+        self.assertEqual([1.0, 9.0, 3.0], [reading['temperature'] for reading in merged])
+        self.assertFalse((self.root / 'aa' / '2026-01-02-04-00-00_aa_X.html').exists())
+        self.assertTrue((self.root / partition_folder('aa', '2026-01-03') / '2026-01-03-04-00-00_aa_X.html').exists())
+        self.assertTrue((self.root / 'aa' / '2026-01-05_aa.jsonl').exists())  # unreadable, so left in place
+        self.assertTrue((self.root / 'aa' / 'latest_aa_X.html').exists())  # no time in its name, so left in place
+        self.assertEqual([], list(self.root.glob('aa/*/*/*/latest_aa_X.html')))
+        with redirect_stdout(StringIO()):
+            self.assertEqual(0, migrate(self.root))
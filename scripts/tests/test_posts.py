@@ -0,0 +1,71 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from posts import Reading, file_time, list_files, parse_header, parse_segment, partition_folder, read_file
+
+POST = (b"---\nsensor_id: 2887bb81e3813ccd\nsensor_name: P_Garage_Freezer\ntemperature: -13.5\n"
+        b"measurement_time: 2026-02-24-10-30-02\n---\n{}\n")
+READING = Reading('2887bb81e3813ccd', 'P_Garage_Freezer', -13.5, '2026-02-24-10-30-02')
+
+
+class TestParseHeader(TestCase):
+
+    def test_post(self) -> None:
+        self.assertEqual(READING, parse_header(POST))
+
+    def test_crlf_line_endings(self) -> None:
+        self.assertEqual(READING, parse_header(POST.replace(b"\n", b"\r\n")))
+
+    def test_missing_key(self) -> None:
+        self.assertIsNone(parse_header(POST.replace(b"temperature: -13.5\n", b"")))
+        self.assertIsNone(parse_header(POST.replace(b"sensor_id:", b"sensor:")))
+
+    def test_truncated_front_matter(self) -> None:
+        self.assertIsNone(parse_header(POST[:POST.index(b"\n---")]))  # no closing line
+        self.assertIsNone(parse_header(POST[:40]))
+        self.assertIsNone(parse_header(b""))
+
+    def test_not_a_post(self) -> None:
+        self.assertIsNone(parse_header(b"<html>" + POST))
+        self.assertIsNone(parse_header(POST.replace(b"-13.5", b"cold")))
+
+    def test_key_must_start_a_line(self) -> None:
+        post = POST.replace(b"P_Garage_Freezer", b"temperature: 99")
+        self.assertEqual(READING._replace(sensor_name='temperature: 99'), parse_header(post))
+
+
+class TestSegments(TestCase):
+
+    def test_parse_segment(self) -> None:
+        line = b'{"sensor_id": "ab", "sensor_name": "X", "temperature": 1.5, "measurement_time": "2026-01-02-03-04-05"}'
+        self.assertEqual([Reading('ab', 'X', 1.5, '2026-01-02-03-04-05')] * 2, parse_segment(line + b"\n\n" + line))
+        self.assertIsNone(parse_segment(line + b'\n{"sensor_id": "ab"}'))
+        self.assertIsNone(parse_segment(b"not json"))
+
+    def test_file_time(self) -> None:
+        self.assertEqual('2026-02-24-10-30-02', file_time('ab/2026/02/24/2026-02-24-10-30-02_ab_X.html'))
+        self.assertEqual('2026-02-24-23-59-59', file_time('2026-02-24_ab.jsonl'))
+
+
+class TestListFiles(TestCase):
+
+    def setUp(self) -> None:
+        self.folder = TemporaryDirectory()
+        self.root = Path(self.folder.name)
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_partitions_are_pruned(self) -> None:
+        for t in ('2026-01-31-23-00-00', '2026-02-01-00-00-00', '2026-03-01-00-00-00'):
+            folder = self.root / partition_folder('ab', t)
+            folder.mkdir(parents=True)
+            (folder / f"{t}_ab_X.html").write_bytes(POST)
+        (self.root / 'ab' / '2025-12-31-00-00-00_ab_X.html').write_bytes(POST)  # from before the partitions
+        (self.root / 'ab' / 'notes.html').write_bytes(b"")  # no time, so always listed
+        names = sorted(path.name for path in list_files(self.root, '2026-02-01', '2026-02-28'))
+        self.assertEqual(['2026-02-01-00-00-00_ab_X.html', 'notes.html'], names)
+        self.assertEqual(5, len(list_files(self.root)))
+        self.assertEqual([], list_files(self.root, sensor_ids=['cd']))
+        self.assertEqual([READING], read_file(self.root / 'ab' / '2025-12-31-00-00-00_ab_X.html'))
@@ -0,0 +1,97 @@
+from argparse import ArgumentTypeError
+from datetime import datetime, UTC
+from unittest import TestCase
+
+from analytics import ReadingFrame
+from query import parse_time, query_rows, select_sensors
+
+CONFIG = {
+    'sensors': {
+        'readme': "ignored",
+        '01': {'hex': 'aa', 'active': True, 'short_name': 'F01', 'nice_name': 'Garage Freezer',
+               'sensor_location': 'Garage'},
+        '02': {'hex': 'bb', 'active': True, 'short_name': 'R02', 'nice_name': 'Pantry Fridge',
+               'sensor_location': 'Pantry'},
+        '03': {'hex': 'cc', 'active': False, 'short_name': 'F03', 'nice_name': 'Old Freezer',
+               'sensor_location': 'Garage'},
+    }
+}
+
+
+def epoch(year: int, month: int, day: int, hour: int = 0, minute: int = 0, second: int = 0) -> int:
+    return int(datetime(year, month, day, hour, minute, second, tzinfo=UTC).timestamp())
+
+
+class TestParseTime(TestCase):
+
+    def test_partial_times(self) -> None:
+        self.assertEqual(epoch(2026, 10, 13), parse_time('2026-10-13'))
+        self.assertEqual(epoch(2026, 10, 13, 6), parse_time('2026-10-13-06'))
+        self.assertEqual(epoch(2026, 10, 13, 6, 30), parse_time('2026-10-13T06:30'))
+        self.assertEqual(epoch(2026, 10, 13, 6, 30, 15), parse_time('2026-10-13 06:30:15'))
+
+    def test_end_times_include_the_whole_period(self) -> None:
+        self.assertEqual(epoch(2026, 10, 13, 23, 59, 59), parse_time('2026-10-13', end=True))
+        self.assertEqual(epoch(2026, 10, 13, 6, 59, 59), parse_time('2026-10-13-06', end=True))
+        self.assertEqual(epoch(2026, 10, 13, 6, 30, 59), parse_time('2026-10-13-06-30', end=True))
+        self.assertEqual(epoch(2026, 10, 13, 6, 30, 15), parse_time('2026-10-13-06-30-15', end=True))
+
+    def test_bad_times(self) -> None:
+        for text in ('2026-10', '2026-10-13-06-30-15-01', '2026-02-30', 'yesterday'):
+            with self.assertRaises(ArgumentTypeError):
+                parse_time(text)
+
+
+class TestSelectSensors(TestCase):
+
+    def test_every_active_sensor_by_default(self) -> None:
+        self.assertEqual(['aa', 'bb'], select_sensors(CONFIG, [], []))
+
+    def test_by_name_and_location(self) -> None:
+        self.assertEqual(['bb', 'aa'], select_sensors(CONFIG, ['02', 'garage freezer'], []))
+        self.assertEqual(['aa', 'cc'], select_sensors(CONFIG, ['aa', 'f01'], ['Garage']))
+        self.assertEqual(['cc'], select_sensors(CONFIG, ['F03'], []))
+
+    def test_no_match(self) -> None:
+        with self.assertRaises(ValueError):
+            select_sensors(CONFIG, ['99'], [])
+        with self.assertRaises(ValueError):
+            select_sensors(CONFIG, [], ['Attic'])
+
+
+class TestQueryRows(TestCase):
+
+    def setUp(self) -> None:
+        self.frame = ReadingFrame.from_readings([
+            ('aa', '2026-10-13-06-10-00', 1.0), ('aa', '2026-10-13-06-50-00', 3.0),
+            ('aa', '2026-10-13-07-10-00', 8.0), ('bb', '2026-10-13-06-20-00', 40.0),
+        ])
+
+    def test_raw(self) -> None:
+        columns, rows = query_rows(self.frame, 'raw')
+        self.assertEqual(['sensor_id', 'measurement_time', 'temperature'], columns)
+        self.assertEqual(['aa', '2026-10-13-06-10-00', 1.0], rows[0])
+        self.assertEqual(['bb', '2026-10-13-06-20-00', 40.0], rows[-1])
+
+    def test_summary(self) -> None:
+        columns, rows = query_rows(self.frame, 'summary')
+        self.assertEqual(['sensor_id', 'count', 'min', 'max', 'mean', 'p95'], columns)
+        self.assertEqual([['aa', 3, 1.0, 8.0, 4.0, 8.0], ['bb', 1, 40.0, 40.0, 40.0, 40.0]], rows)
+
+    def test_buckets(self) -> None:
+        columns, rows = query_rows(self.frame, 'hourly')
+        self.assertEqual(['sensor_id', 'start', 'count', 'min', 'max', 'mean', 'p95'], columns)
+        self.assertEqual([
+            ['aa', '2026-10-13-06-00-00', 2, 1.0, 3.0, 2.0, 3.0],
+            ['aa', '2026-10-13-07-00-00', 1, 8.0, 8.0, 8.0, 8.0],
+            ['bb', '2026-10-13-06-00-00', 1, 40.0, 40.0, 40.0, 40.0],
+        ], rows)
+        _, rows = query_rows(self.frame, 'weekly')
+        self.assertEqual([['aa', '2026-10-12-00-00-00', 3, 1.0, 8.0, 4.0, 8.0],
+                          ['bb', '2026-10-12-00-00-00', 1, 40.0, 40.0, 40.0, 40.0]], rows)  # the week starts Monday
+
+    def test_no_readings(self) -> None:
+        empty = ReadingFrame.from_readings([])
+        self.assertEqual([], query_rows(empty, 'raw')[1])
+        self.assertEqual([], query_rows(empty, 'summary')[1])
+        self.assertEqual([], query_rows(empty, 'daily')[1])
@@ -0,0 +1,53 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from reading_archive import SensorArchive, append_readings, load_months, measurement_epoch, pack_sensor, save_months, \
+    unpack_sensor
+
+
+class TestReadingArchive(TestCase):
+
+    def setUp(self) -> None:
+        self.folder = TemporaryDirectory()
+        self.root = Path(self.folder.name)
+        self.archive = self.root / 'archive'
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def columns(self, archive_root: Path) -> tuple[list[int], list[float]]:
+        with SensorArchive(archive_root, 'aa') as archive:
+            return list(archive.epochs), list(archive.temperatures)
+
+    def test_late_readings_are_merged_into_place(self) -> None:
+        self.assertEqual(2, append_readings(self.archive, 'aa', [(10, 1.0), (30, 3.0)]))
+        self.assertEqual(2, append_readings(self.archive, 'aa', [(40, 4.0), (20, 2.0), (30, 9.0)]))
+        self.assertEqual(1, append_readings(self.archive, 'aa', [(5, 0.5)]))
+        self.assertEqual(0, append_readings(self.archive, 'aa', [(10, 1.0)]))
+        self.assertEqual(([5, 10, 20, 30, 40], [0.5, 1.0, 2.0, 3.0, 4.0]), self.columns(self.archive))
+        with SensorArchive(self.archive, 'aa') as archive:
+            epochs, temperatures = archive.window(10, 31)
+            self.assertEqual([10, 20, 30], list(epochs))
+            epochs.release()
+            temperatures.release()
+
+    def test_missing_sensor_is_empty(self) -> None:
+        with SensorArchive(self.archive, 'zz') as archive:
+            self.assertEqual(0, len(archive))
+
+    def test_pack_round_trip(self) -> None:
+        append_readings(self.archive, 'aa', [(100, 1.5), (160, -2.25)])
+        self.assertEqual(2, unpack_sensor(self.root / 'copy', 'aa', pack_sensor(self.archive, 'aa')))
+        self.assertEqual(self.columns(self.archive), self.columns(self.root / 'copy'))
+
+    def test_months_only_rewrite_what_changed(self) -> None:
+        months = self.root / 'months'
+        epochs = [measurement_epoch(t) for t in ('2025-12-31-23-59-59', '2026-01-01-00-00-00', '2026-02-15-00-00-00')]
+        append_readings(self.archive, 'aa', [(epoch, 1.5) for epoch in epochs])
+        self.assertEqual(['aa/2025-12.tsc', 'aa/2026-01.tsc', 'aa/2026-02.tsc'], save_months(self.archive, months))
+        self.assertEqual([], save_months(self.archive, months))
+        append_readings(self.archive, 'aa', [(epochs[2] + 60, 2.5)])
+        self.assertEqual(['aa/2026-02.tsc'], save_months(self.archive, months))
+        self.assertEqual(4, load_months(months, self.root / 'rebuilt'))
+        self.assertEqual(self.columns(self.archive), self.columns(self.root / 'rebuilt'))
@@ -0,0 +1,75 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from posts import partition_folder
+from reading_index import ReadingIndex
+
+
+def write_post(data_root: Path, sensor_id: str, measurement_time: str, temperature: float) -> Path:
+    folder = data_root / partition_folder(sensor_id, measurement_time)
+    folder.mkdir(parents=True, exist_ok=True)
+    post = folder / f"{measurement_time}_{sensor_id}_X.html"
+    post.write_text(f"---\nsensor_id: {sensor_id}\nsensor_name: X\ntemperature: {temperature}\n"
+                    f"measurement_time: {measurement_time}\n---\n{{}}\n")
+    return post
+
+
+class TestReadingIndex(TestCase):
+
+    def setUp(self) -> None:
+        self.folder = TemporaryDirectory()
+        self.root = Path(self.folder.name) / 'data'
+        self.index = ReadingIndex()
+
+    def tearDown(self) -> None:
+        self.index.close()
+        self.folder.cleanup()
+
+    def test_ingest_only_reads_new_files(self) -> None:
+        write_post(self.root, 'aa', '2026-03-01-10-00-00', 40.0)
+        write_post(self.root, 'aa', '2026-03-02-10-00-00', 41.0)
+        write_post(self.root, 'bb', '2026-03-02-11-00-00', -5.0)
+        self.assertEqual(3, self.index.ingest(self.root))
+        self.assertEqual(0, self.index.ingest(self.root))
+        write_post(self.root, 'aa', '2026-03-03-10-00-00', 42.0)
+        self.assertEqual(1, self.index.ingest(self.root, workers=2))
+        self.assertEqual([('2026-03-03-10-00-00', 42.0), ('2026-03-02-10-00-00', 41.0)], self.index.latest('aa', 2))
+        self.assertEqual({'aa': 2, 'bb': 1}, self.index.counts_since('2026-03-01-10-00-00'))
+        self.assertEqual(
+            [('bb', '2026-03-02-11-00-00', -5.0), ('aa', '2026-03-03-10-00-00', 42.0)],
+            list(self.index.readings_since('2026-03-02-10-00-00'))
+        )
+
+    def test_removed_files_are_dropped(self) -> None:
+        old = write_post(self.root, 'aa', '2026-03-01-10-00-00', 40.0)
+        write_post(self.root, 'aa', '2026-03-02-10-00-00', 41.0)
+        self.index.ingest(self.root)
+        old.unlink()
+        self.index.ingest(self.root)
+        self.assertEqual([('2026-03-02-10-00-00', 41.0)], self.index.latest('aa', 5))
+
+    def test_since_leaves_older_days_alone(self) -> None:
+        old = write_post(self.root, 'aa', '2026-03-01-10-00-00', 40.0)
+        self.index.ingest(self.root)
+        old.unlink()
+        write_post(self.root, 'aa', '2026-03-05-10-00-00', 45.0)
+        self.assertEqual(1, self.index.ingest(self.root, since='2026-03-04-00-00-00'))
+        self.assertEqual(2, len(self.index.latest('aa', 5)))  # the older day was not looked at, so nothing was dropped
+
+    def test_latest_skips_malformed_posts(self) -> None:
+        write_post(self.root, 'aa', '2026-03-01-10-00-00', 40.0)
+        write_post(self.root, 'aa', '2026-03-02-10-00-00', 41.0)
+        write_post(self.root, 'aa', '2026-03-03-10-00-00', 42.0).write_text("garbage")
+        self.assertEqual(2, self.index.ingest(self.root, latest=1))
+        self.assertEqual([('2026-03-02-10-00-00', 41.0)], self.index.latest('aa', 5))
+
+    def test_segment_and_post_hold_the_same_reading(self) -> None:
+        post = write_post(self.root, 'aa', '2026-03-01-10-00-00', 40.0)
+        self.index.ingest(self.root)
+        (post.parent / '2026-03-01_aa.jsonl').write_text(
+            '{"sensor_id": "aa", "sensor_name": "X", "temperature": 40.0, "measurement_time": "2026-03-01-10-00-00"}\n'
+        )
+        post.unlink()
+        self.index.ingest(self.root)
+        self.assertEqual([('2026-03-01-10-00-00', 40.0)], self.index.latest('aa', 5))
@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from robust_stats import TemperatureSketch
+
+
+def sketch_of(temperatures: list[float]) -> TemperatureSketch:
+    sketch = TemperatureSketch()
+    for temperature in temperatures:
+        sketch.add(temperature)
+    return sketch
+
+
+class TestTemperatureSketch(TestCase):
+
+    def test_quantiles_use_the_nearest_rank(self) -> None:
+        sketch = sketch_of([40.0, 50.0])
+        self.assertEqual(40.0, sketch.quantile(0.0))
+        self.assertEqual(40.0, sketch.median())
+        self.assertEqual(50.0, sketch.quantile(0.95))
+        self.assertEqual(50.0, sketch.quantile(1.0))
+        sketch = sketch_of([float(t) for t in range(1, 21)])
+        self.assertEqual(10.0, sketch.median())
+        self.assertEqual(19.0, sketch.quantile(0.95))
+        self.assertEqual(7.5, sketch_of([7.5]).quantile(0.95))
+
+    def test_trimmed_mean(self) -> None:
+        readings = [38.0] * 78 + [-40.0, 120.0]
+        self.assertAlmostEqual(38.0, sketch_of(readings).trimmed_mean())  # trims 2 from each end of 80
+        self.assertAlmostEqual(38.05, sketch_of(readings).trimmed_mean(0.0))
+        self.assertAlmostEqual(41.0, sketch_of([40.0, 42.0]).trimmed_mean())
+
+    def test_merge_and_json_round_trip(self) -> None:
+        first = sketch_of([1.0, 2.0, 2.0])
+        second = sketch_of([2.0, -3.115])
+        first.merge(second)
+        self.assertEqual(5, first.count)
+        copy = TemperatureSketch.from_json(first.to_json())
+        self.assertEqual(first.counts, copy.counts)
+        self.assertEqual(5, copy.count)
+        self.assertEqual(-3.12, copy.quantile(0.0))
+
+    def test_empty_sketch(self) -> None:
+        with self.assertRaises(ValueError):
+            TemperatureSketch().quantile(0.5)
+        with self.assertRaises(ValueError):
+            TemperatureSketch().trimmed_mean()
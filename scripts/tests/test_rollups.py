@@ -0,0 +1,72 @@
+from datetime import datetime, UTC
+from unittest import TestCase
+
+from reading_index import ReadingIndex
+from rollups import empty_rollups, tier_rows, update_rollups
+
+
+class TestRollups(TestCase):
+
+    def setUp(self) -> None:
+        self.index = ReadingIndex()
+
+    def tearDown(self) -> None:
+        self.index.close()
+
+    def add(self, *readings: tuple[str, float]) -> None:
+        with self.index.connection:
+            self.index.connection.executemany(
+                "INSERT OR REPLACE INTO readings VALUES ('aa', ?, ?, 'X')", readings
+            )
+
+    def test_buckets(self) -> None:
+        rollups = empty_rollups()
+        self.assertEqual(0, update_rollups(rollups, self.index))
+        self.add(('2026-03-02-10-00-00', 40.0), ('2026-03-02-10-30-00', 50.0), ('2026-03-02-11-00-00', 45.0))
+        self.assertEqual(4, update_rollups(rollups, self.index))  # two hours, a day and a week
+        self.assertEqual('2026-03-02-11-00-00', rollups['watermark'])
+        hourly = tier_rows(rollups, 'hourly', 'aa')
+        self.assertEqual([2, 1], [row.num_readings for row in hourly])
+        self.assertEqual((40.0, 50.0, 45.0, 50.0), (hourly[0].min, hourly[0].max, hourly[0].mean, hourly[0].p95))
+        weekly = tier_rows(rollups, 'weekly', 'aa')
+        self.assertEqual(0, datetime.fromtimestamp(weekly[0].start, UTC).weekday())  # weeks start on Monday
+        self.assertEqual(0, update_rollups(rollups, self.index))
+
+    def test_late_readings_are_rolled_up(self) -> None:
+        rollups = empty_rollups()
+        self.add(('2026-03-02-10-00-00', 40.0), ('2026-03-03-10-00-00', 41.0))
+        update_rollups(rollups, self.index)
+        self.add(('2026-03-02-12-00-00', 60.0))  # measured before the watermark, but posted after the last update
+        self.assertEqual(3, update_rollups(rollups, self.index))  # a new hour, and the day and week it falls in
+        self.assertEqual([2, 1], [row.num_readings for row in tier_rows(rollups, 'daily', 'aa')])
+        self.assertEqual('2026-03-03-10-00-00', rollups['watermark'])
+
+    def test_cleaned_up_buckets_keep_their_figures(self) -> None:
+        rollups = empty_rollups()
+        self.add(('2026-03-02-10-00-00', 40.0), ('2026-03-02-10-30-00', 50.0))
+        update_rollups(rollups, self.index)
+        with self.index.connection:
+            self.index.connection.execute("DELETE FROM readings WHERE measurement_time = '2026-03-02-10-00-00'")
+        self.add(('2026-03-09-10-00-00', 30.0))
+        update_rollups(rollups, self.index)
+        self.assertEqual([2, 1], [row.num_readings for row in tier_rows(rollups, 'daily', 'aa')])
+
+    def test_weeks_keep_days_cleaned_up_before_the_week_ended(self) -> None:
+        rollups = empty_rollups()
+        week = [(f"2026-03-0{day}-10-00-00", float(day)) for day in range(2, 8)]  # Monday to Saturday
+        self.add(*week)
+        update_rollups(rollups, self.index)
+        self.assertEqual([6], [row.num_readings for row in tier_rows(rollups, 'weekly', 'aa')])
+        with self.index.connection:  # the cleanup reaches Monday to Wednesday before Sunday is rolled up
+            self.index.connection.execute("DELETE FROM readings WHERE measurement_time < '2026-03-05'")
+        self.add(('2026-03-08-10-00-00', 50.0))
+        self.assertEqual(3, update_rollups(rollups, self.index))  # Sunday's hour and day, and the week
+        weekly = tier_rows(rollups, 'weekly', 'aa')
+        self.assertEqual([(7, 2.0, 50.0, 11.0, 50.0)], [row[1:] for row in weekly])
+        self.assertEqual(7, len(tier_rows(rollups, 'daily', 'aa')))
+        with self.index.connection:
+            self.index.connection.execute("DELETE FROM readings")
+        self.add(('2026-03-09-10-00-00', 30.0))
+        update_rollups(rollups, self.index)
+        self.assertEqual(['1773014400'], list(rollups['days']['aa']))  # only the days of the new week are kept
+        self.assertEqual([7, 1], [row.num_readings for row in tier_rows(rollups, 'weekly', 'aa')])
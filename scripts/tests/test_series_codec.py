@@ -0,0 +1,35 @@
+from unittest import TestCase
+
+from series_codec import MAGIC, decode, decode_numpy, encode
+
+EPOCHS = [1_772_323_200, 1_772_323_260, 1_772_323_321, 1_772_323_380, 1_772_330_000, 1_772_330_001]
+TEMPERATURES = [-13.5, -13.39, -13.5, 40.1, 40.1, -16.8]
+
+
+class TestSeriesCodec(TestCase):
+
+    def test_round_trip(self) -> None:
+        payload = encode(EPOCHS, TEMPERATURES)
+        self.assertTrue(payload.startswith(MAGIC))
+        for epochs, temperatures in (decode(payload), decode_numpy(payload)):
+            self.assertEqual(EPOCHS, list(epochs))
+            self.assertEqual(TEMPERATURES, [round(t, 2) for t in temperatures])
+
+    def test_steady_readings_are_small(self) -> None:
+        epochs = [1_772_323_200 + 60 * i for i in range(1000)]
+        self.assertLess(len(encode(epochs, [38.25] * 1000)), 2 * 1000 + 20)
+
+    def test_empty_series(self) -> None:
+        payload = encode([], [])
+        self.assertEqual(0, len(decode(payload)[0]))
+        self.assertEqual(0, len(decode_numpy(payload)[0]))
+
+    def test_bad_payloads(self) -> None:
+        payload = encode(EPOCHS, TEMPERATURES)
+        for bad in (b'JUNK' + payload[4:], payload[:-1] + b'\x80', payload[:-2]):
+            with self.assertRaises(ValueError):
+                decode(bad)
+            with self.assertRaises(ValueError):
+                decode_numpy(bad)
+        with self.assertRaises(ValueError):
+            encode(EPOCHS, TEMPERATURES[:-1])